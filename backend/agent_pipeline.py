@@ -5,10 +5,55 @@ between different agents to process user queries.
 """
 
 import os
+import time
+import asyncio
 import logging
+import contextvars
+import threading
 import pandas as pd
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple
 
-from agents import IntentEvaluator, AnalyticsAgent
+from langchain_core.callbacks import BaseCallbackHandler
+
+from agents import IntentClassifier, IntentEvaluator, AnalyticsAgent
+from answer_cache import ANSWER_CACHE_PATH, AnswerCache
+from concurrency import bind_cancel_event, get_speculative_executor
+from dataset_registry import DatasetRegistry, get_registry
+
+
+class SpeculationCancelled(Exception):
+    """Raised inside a speculative analytics run once the intent is rejected."""
+
+
+class CancelOnEvent(BaseCallbackHandler):
+    """Callback that aborts a synchronous agent run when an event is set.
+    
+    The check runs before every LLM call and tool call, so a cancelled run
+    stops at its next step instead of finishing the whole ReAct loop.
+    """
+    
+    raise_error = True
+    
+    def __init__(self, event: threading.Event) -> None:
+        """Initialize the callback.
+        
+        Args:
+            event: Event that signals cancellation.
+        """
+        self.event = event
+    
+    def _check(self) -> None:
+        if self.event.is_set():
+            raise SpeculationCancelled("Speculative analytics run cancelled")
+    
+    def on_chat_model_start(self, *args, **kwargs) -> None:
+        self._check()
+    
+    def on_llm_start(self, *args, **kwargs) -> None:
+        self._check()
+    
+    def on_tool_start(self, *args, **kwargs) -> None:
+        self._check()
 
 
 class AgentPipeline:
@@ -20,31 +65,60 @@ class AgentPipeline:
     The Analytics Agent now has built-in code evaluation capabilities via
     the evaluate_generated_code tool, so no separate CodeEvaluator is needed.
     
+    In speculative mode the analytics run starts at the same time as the
+    intent check instead of after it. Allowed queries (almost all of them)
+    then save the intent round-trip; rejected ones cancel the analytics run
+    and discard its output. Tools only ever see a copy of the DataFrame, so
+    a discarded run leaves nothing behind.
+    
+    With an answer cache, answers to questions already asked on the same
+    dataset version are returned before any agent runs.
+    
     Attributes:
         intent_evaluator: Agent for evaluating user intent.
         analytics_agent: Agent for data analysis (with built-in code evaluation).
+        speculative: Whether intent and analytics run concurrently.
+        answer_cache: Optional cache of answers.
+        dataset_version: Version of the analyzed dataset, part of cache keys.
         logger: Logger instance for the pipeline.
     """
     
     def __init__(
         self,
         llm: any,
-        dataframe: pd.DataFrame
+        dataframe: pd.DataFrame,
+        speculative: bool = False,
+        catalog: Optional[Dict[str, Any]] = None,
+        answer_cache: Optional[AnswerCache] = None,
+        dataset_version: Optional[str] = None
     ) -> None:
         """Initialize the Agent Pipeline.
         
         Args:
             llm: Language model instance to use for all agents.
             dataframe: The pandas DataFrame to analyze.
+            speculative: Start the analytics run before the intent check
+                finishes.
+            catalog: Column catalog, used by the local intent classifier and
+                the code validator.
+            answer_cache: Optional cache of answers.
+            dataset_version: Version of ``dataframe``; without it nothing is
+                cached.
         """
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.speculative = speculative
+        self.answer_cache = answer_cache
+        self.dataset_version = dataset_version
         
         # Initialize agents
-        self.intent_evaluator = IntentEvaluator(llm)
-        self.analytics_agent = AnalyticsAgent(llm, dataframe)
+        self.intent_evaluator = IntentEvaluator(
+            llm, IntentClassifier.from_dataframe(dataframe, catalog)
+        )
+        self.analytics_agent = AnalyticsAgent(llm, dataframe, dataset_version, catalog)
         
         self.logger.info(
             f"Initialized AgentPipeline with {dataframe.shape[0]} rows"
+            f"{' (speculative mode)' if speculative else ''}"
         )
     
     def process_query(self, query: str) -> str:
@@ -60,13 +134,19 @@ class AgentPipeline:
         Returns:
             Final processed response.
         """
-        import time
         start_time = time.time()
         
         self.logger.info("="*80)
         self.logger.info(f"🚀 PIPELINE START | Query: '{query[:50]}...'")
         self.logger.info("="*80)
         
+        cached = self._cached_answer(query, start_time)
+        if cached is not None:
+            return cached
+        
+        if self.speculative:
+            return self._process_speculative(query, start_time)
+        
         # Step 1: Intent Evaluation
         self.logger.info("📋 STEP 1/2: Intent Evaluation")
         intent_start = time.time()
@@ -91,6 +171,7 @@ class AgentPipeline:
         analytics_start = time.time()
         response = self.analytics_agent.invoke(query)
         analytics_duration = time.time() - analytics_start
+        self._store_answer(query, response)
         
         self.logger.info(
             f"✅ Analytics complete | "
@@ -106,6 +187,542 @@ class AgentPipeline:
         self.logger.info("="*80)
         
         return response
+    
+    async def aprocess_query(self, query: str) -> str:
+        """Process a query through the pipeline without blocking the event loop.
+        
+        Same flow as process_query, but LLM calls are awaited and tool
+        work runs in the bounded tool pool.
+        
+        Args:
+            query: The user query to process.
+            
+        Returns:
+            Final processed response.
+        """
+        start_time = time.time()
+        
+        self.logger.info("="*80)
+        self.logger.info(f"🚀 PIPELINE START (async) | Query: '{query[:50]}...'")
+        self.logger.info("="*80)
+        
+        cached = self._cached_answer(query, start_time)
+        if cached is not None:
+            return cached
+        
+        if self.speculative:
+            return await self._aprocess_speculative(query, start_time)
+        
+        # Step 1: Intent Evaluation
+        self.logger.info("📋 STEP 1/2: Intent Evaluation")
+        intent_start = time.time()
+        intent_result = await self.intent_evaluator.ainvoke(query)
+        intent_duration = time.time() - intent_start
+        
+        if intent_result.strip() != "ALLOWED":
+            self.logger.warning(
+                f"❌ Query BLOCKED by intent evaluator | "
+                f"Duration: {intent_duration:.2f}s"
+            )
+            self.logger.info(f"Response: {intent_result[:100]}...")
+            self.logger.info("="*80)
+            return intent_result
+        
+        self.logger.info(
+            f"✅ Query ALLOWED | Duration: {intent_duration:.2f}s"
+        )
+        
+        # Step 2: Analytics (with built-in code evaluation)
+        self.logger.info("📊 STEP 2/2: Analytics Processing (with code evaluation)")
+        analytics_start = time.time()
+        response = await self.analytics_agent.ainvoke(query)
+        analytics_duration = time.time() - analytics_start
+        self._store_answer(query, response)
+        
+        self.logger.info(
+            f"✅ Analytics complete | "
+            f"Duration: {analytics_duration:.2f}s | "
+            f"Response length: {len(response)} chars"
+        )
+        
+        total_duration = time.time() - start_time
+        self.logger.info("="*80)
+        self.logger.info(
+            f"🏁 PIPELINE COMPLETE | Total duration: {total_duration:.2f}s"
+        )
+        self.logger.info("="*80)
+        
+        return response
+    
+    async def astream_query(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a query through the pipeline as incremental events.
+        
+        Emits an ``intent_checked`` stage, then the analytics agent's tool
+        stages and answer tokens, and finally a ``done`` event with the
+        full answer (or the rejection message).
+        
+        Args:
+            query: The user query to process.
+            
+        Yields:
+            Event dictionaries (see agents.streaming).
+        """
+        self.logger.info(f"🚀 PIPELINE STREAM START | Query: '{query[:50]}...'")
+        
+        cached = self._cached_answer(query, time.time())
+        if cached is not None:
+            yield {"type": "done", "content": cached}
+            return
+        
+        if self.speculative:
+            async for event in self._astream_speculative(query):
+                yield event
+            return
+        
+        intent_result = await self.intent_evaluator.ainvoke(query)
+        allowed = intent_result.strip() == "ALLOWED"
+        yield {"type": "stage", "stage": "intent_checked", "allowed": allowed}
+        
+        if not allowed:
+            self.logger.warning("❌ Query BLOCKED by intent evaluator")
+            yield {"type": "done", "content": intent_result}
+            return
+        
+        async for event in self.analytics_agent.astream(query):
+            self._store_streamed_answer(query, event)
+            yield event
+    
+    def warm_cache(self, questions: Iterable[str]) -> int:
+        """Answer questions that are not cached yet, filling the answer cache.
+        
+        Args:
+            questions: Questions to warm (e.g. from QUERIES.md).
+            
+        Returns:
+            Number of questions answered and stored.
+        """
+        if self.answer_cache is None or self.dataset_version is None:
+            return 0
+        
+        warmed = 0
+        for question in questions:
+            if self.answer_cache.has(question, self.dataset_version):
+                continue
+            self.process_query(question)
+            if self.answer_cache.has(question, self.dataset_version):
+                warmed += 1
+        self.logger.info(f"🔥 Answer cache warmed with {warmed} answers")
+        return warmed
+    
+    def _cached_answer(self, query: str, start_time: float) -> Optional[str]:
+        """Look up a cached answer for the query.
+        
+        Args:
+            query: The user query.
+            start_time: Pipeline start timestamp.
+            
+        Returns:
+            The cached answer, or None on a miss or without a cache.
+        """
+        if self.answer_cache is None or self.dataset_version is None:
+            return None
+        
+        answer = self.answer_cache.get(query, self.dataset_version)
+        if answer is not None:
+            self.logger.info(
+                f"💾 ANSWER CACHE HIT | Duration: {time.time() - start_time:.3f}s"
+            )
+        return answer
+    
+    def _store_answer(self, query: str, response: str) -> None:
+        """Store an analytics answer in the cache, if there is one."""
+        if self.answer_cache is not None and self.dataset_version is not None:
+            self.answer_cache.put(query, self.dataset_version, response)
+    
+    def _store_streamed_answer(self, query: str, event: Dict[str, Any]) -> None:
+        """Store the final answer of a streamed analytics run."""
+        if event.get("type") == "done":
+            self._store_answer(query, event["content"])
+    
+    def _process_speculative(self, query: str, start_time: float) -> str:
+        """Run intent evaluation and analytics concurrently (sync path).
+        
+        The analytics agent runs in a worker thread while the intent check
+        runs in the caller's thread. On rejection the run is stopped at its
+        next LLM or tool step and its result is dropped. A tool call that is
+        already running (and its sandbox execution) finishes, but its
+        outcome is not remembered or cached (see concurrency.run_cancelled).
+        
+        Args:
+            query: The user query to process.
+            start_time: Pipeline start timestamp.
+            
+        Returns:
+            Final processed response.
+        """
+        self.logger.info("⚡ Speculative mode: intent evaluation and analytics started together")
+        cancel = threading.Event()
+        context = contextvars.copy_context()
+        context.run(bind_cancel_event, cancel)
+        analytics_future = get_speculative_executor().submit(
+            context.run,
+            self._timed,
+            self.analytics_agent.invoke,
+            query,
+            callbacks=[CancelOnEvent(cancel)]
+        )
+        
+        try:
+            intent_result, intent_duration = self._timed(
+                self.intent_evaluator.invoke, query
+            )
+        except BaseException:
+            cancel.set()
+            raise
+        
+        if intent_result.strip() != "ALLOWED":
+            cancel.set()
+            analytics_future.cancel()
+            self._log_rejected(intent_result, intent_duration)
+            return intent_result
+        
+        self.logger.info(f"✅ Query ALLOWED | Duration: {intent_duration:.2f}s")
+        response, analytics_duration = analytics_future.result()
+        self._store_answer(query, response)
+        self._log_speculative_timings(
+            start_time, intent_duration, analytics_duration, response
+        )
+        return response
+    
+    async def _aprocess_speculative(self, query: str, start_time: float) -> str:
+        """Run intent evaluation and analytics concurrently (async path).
+        
+        Both agents run as tasks on the event loop; on rejection the
+        analytics task is cancelled. A tool call that is already running in
+        the tool pool (and its sandbox execution) cannot be interrupted; it
+        finishes, but its outcome is not remembered or cached (see
+        concurrency.run_cancelled).
+        
+        Args:
+            query: The user query to process.
+            start_time: Pipeline start timestamp.
+            
+        Returns:
+            Final processed response.
+        """
+        self.logger.info("⚡ Speculative mode: intent evaluation and analytics started together")
+        cancel = threading.Event()
+        
+        async def analytics() -> Tuple[str, float]:
+            bind_cancel_event(cancel)
+            return await self._atimed(self.analytics_agent.ainvoke(query))
+        
+        analytics_task = asyncio.create_task(analytics())
+        
+        try:
+            intent_result, intent_duration = await self._atimed(
+                self.intent_evaluator.ainvoke(query)
+            )
+        except BaseException:
+            cancel.set()
+            analytics_task.cancel()
+            raise
+        
+        if intent_result.strip() != "ALLOWED":
+            cancel.set()
+            analytics_task.cancel()
+            self._log_rejected(intent_result, intent_duration)
+            return intent_result
+        
+        self.logger.info(f"✅ Query ALLOWED | Duration: {intent_duration:.2f}s")
+        response, analytics_duration = await analytics_task
+        self._store_answer(query, response)
+        self._log_speculative_timings(
+            start_time, intent_duration, analytics_duration, response
+        )
+        return response
+    
+    async def _astream_speculative(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a query with the analytics run started speculatively.
+        
+        Analytics events are buffered until the intent check passes, so
+        clients never see output of a run that ends up rejected. As in
+        _aprocess_speculative, a tool call already running at rejection
+        finishes without its outcome being remembered or cached.
+        
+        Args:
+            query: The user query to process.
+            
+        Yields:
+            Event dictionaries (see agents.streaming).
+        """
+        start_time = time.time()
+        buffer: asyncio.Queue = asyncio.Queue()
+        cancel = threading.Event()
+        
+        async def produce() -> None:
+            bind_cancel_event(cancel)
+            try:
+                async for event in self.analytics_agent.astream(query):
+                    await buffer.put(event)
+            finally:
+                buffer.put_nowait(None)
+        
+        producer = asyncio.create_task(produce())
+        try:
+            intent_result, intent_duration = await self._atimed(
+                self.intent_evaluator.ainvoke(query)
+            )
+            allowed = intent_result.strip() == "ALLOWED"
+            yield {"type": "stage", "stage": "intent_checked", "allowed": allowed}
+            
+            if not allowed:
+                cancel.set()
+                producer.cancel()
+                self._log_rejected(intent_result, intent_duration)
+                yield {"type": "done", "content": intent_result}
+                return
+            
+            self.logger.info(f"✅ Query ALLOWED | Duration: {intent_duration:.2f}s")
+            while (event := await buffer.get()) is not None:
+                self._store_streamed_answer(query, event)
+                yield event
+            
+            self.logger.info(
+                f"🏁 PIPELINE STREAM COMPLETE | Intent: {intent_duration:.2f}s | "
+                f"Total: {time.time() - start_time:.2f}s"
+            )
+        finally:
+            # No-op when finished; stops the run if the client went away
+            if not producer.done():
+                cancel.set()
+            producer.cancel()
+    
+    @staticmethod
+    def _timed(func: Callable[..., str], *args, **kwargs) -> Tuple[str, float]:
+        """Call a function and measure its duration.
+        
+        Returns:
+            Tuple of (return value, duration in seconds).
+        """
+        start = time.time()
+        result = func(*args, **kwargs)
+        return result, time.time() - start
+    
+    @staticmethod
+    async def _atimed(awaitable: Awaitable[str]) -> Tuple[str, float]:
+        """Await a coroutine and measure its duration.
+        
+        Returns:
+            Tuple of (result, duration in seconds).
+        """
+        start = time.time()
+        result = await awaitable
+        return result, time.time() - start
+    
+    def _log_rejected(self, intent_result: str, intent_duration: float) -> None:
+        """Log a rejection that discarded a speculative analytics run."""
+        self.logger.warning(
+            f"❌ Query BLOCKED by intent evaluator | "
+            f"Duration: {intent_duration:.2f}s"
+        )
+        self.logger.info("🗑️  Speculative analytics run cancelled and discarded")
+        self.logger.info(f"Response: {intent_result[:100]}...")
+        self.logger.info("="*80)
+    
+    def _log_speculative_timings(
+        self,
+        start_time: float,
+        intent_duration: float,
+        analytics_duration: float,
+        response: str
+    ) -> None:
+        """Log per-stage timings and the time saved by running them together."""
+        total_duration = time.time() - start_time
+        saved = intent_duration + analytics_duration - total_duration
+        self.logger.info(
+            f"✅ Analytics complete | "
+            f"Duration: {analytics_duration:.2f}s | "
+            f"Response length: {len(response)} chars"
+        )
+        self.logger.info("="*80)
+        self.logger.info(
+            f"🏁 PIPELINE COMPLETE (speculative) | "
+            f"Intent: {intent_duration:.2f}s | "
+            f"Analytics: {analytics_duration:.2f}s | "
+            f"Total: {total_duration:.2f}s | "
+            f"Saved vs serial: {max(saved, 0.0):.2f}s"
+        )
+        self.logger.info("="*80)
+
+
+class PipelineProvider:
+    """Keeps one long-lived AgentPipeline per process.
+    
+    The pipeline, its LLM client (and HTTP connection pool) and the
+    compiled LangGraph graphs are built once and reused across queries.
+    The pipeline is rebuilt when the dataset version changes, and the LLM
+    client only when its configuration (model, temperature, API key)
+    changes. Swaps are atomic: queries already running keep the pipeline
+    they started with.
+    
+    Attributes:
+        registry: Dataset registry the pipeline analyzes.
+        logger: Logger instance for the provider.
+    """
+    
+    def __init__(self, registry: Optional[DatasetRegistry] = None) -> None:
+        """Initialize the provider without building anything.
+        
+        Args:
+            registry: Dataset registry (defaults to the process-wide one).
+        """
+        self.registry = registry or get_registry()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._setup_done = False
+        self._llm = None
+        self._llm_config: Optional[Tuple[str, float, str]] = None
+        self._pipeline: Optional[AgentPipeline] = None
+        self._pipeline_key: Optional[Tuple] = None
+        self._answer_cache: Optional[AnswerCache] = None
+    
+    def get(self) -> Optional[AgentPipeline]:
+        """Get the current pipeline, building or swapping it if needed.
+        
+        Returns:
+            The pipeline, or None if GOOGLE_API_KEY is not configured.
+        """
+        self._setup()
+        
+        config = self._read_llm_config()
+        if config is None:
+            self.logger.error("❌ GOOGLE_API_KEY not found in environment")
+            return None
+        
+        key = (self.registry.version, config)
+        pipeline = self._pipeline
+        if pipeline is not None and self._pipeline_key == key:
+            return pipeline
+        
+        with self._lock:
+            if self._pipeline is None or self._pipeline_key != key:
+                self._pipeline = self._build(config)
+                self._pipeline_key = key
+            return self._pipeline
+    
+    def invalidate(self) -> None:
+        """Drop the pipeline and LLM client so the next query rebuilds them."""
+        with self._lock:
+            self._pipeline = None
+            self._pipeline_key = None
+            self._llm = None
+            self._llm_config = None
+    
+    def _setup(self) -> None:
+        """Configure logging and load the .env file once per process."""
+        if self._setup_done:
+            return
+        from dotenv import load_dotenv
+        from logging_config import setup_logging
+        
+        log_level = os.environ.get("LOG_LEVEL", "DEBUG")  # Changed to DEBUG temporarily
+        setup_logging(level=log_level, use_colors=True)
+        load_dotenv()
+        self._setup_done = True
+        self.logger.info("🔧 Analytics response system initialized")
+    
+    @staticmethod
+    def _read_llm_config() -> Optional[Tuple[str, float, str]]:
+        """Read the LLM configuration from the environment.
+        
+        Returns:
+            Tuple of (model, temperature, API key), or None without a key.
+        """
+        api_key = os.environ.get("GOOGLE_API_KEY")
+        if not api_key:
+            return None
+        return (
+            os.environ.get("GEMINI_MODEL", "gemini-2.0-flash-exp"),
+            float(os.environ.get("GEMINI_TEMPERATURE", "0.3")),
+            api_key,
+        )
+    
+    def _build(self, config: Tuple[str, float, str]) -> AgentPipeline:
+        """Build a pipeline, reusing the LLM client when its config is unchanged.
+        
+        Args:
+            config: LLM configuration from _read_llm_config.
+            
+        Returns:
+            The new pipeline.
+        """
+        if self._llm is None or self._llm_config != config:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            
+            model, temperature, api_key = config
+            self.logger.info(f"🤖 Initializing LLM ({model})...")
+            self._llm = ChatGoogleGenerativeAI(
+                model=model,
+                temperature=temperature,
+                google_api_key=api_key
+            )
+            self._llm_config = config
+            self.logger.info("✅ LLM initialized")
+        
+        # Shared dataset, loaded once per process by the registry
+        version, df = self.registry.get_versioned()
+        self.logger.info(f"🔄 Creating agent pipeline for dataset version {version}...")
+        speculative = os.environ.get("SPECULATIVE_INTENT", "false").lower() == "true"
+        return AgentPipeline(
+            self._llm,
+            df,
+            speculative=speculative,
+            catalog=self.registry.catalog,
+            answer_cache=self._get_answer_cache(),
+            dataset_version=version
+        )
+    
+    def _get_answer_cache(self) -> Optional[AnswerCache]:
+        """Open the answer cache once; it is shared by every pipeline.
+        
+        Configured with ANSWER_CACHE_PATH (empty disables the cache),
+        ANSWER_CACHE_TTL (seconds), ANSWER_CACHE_MAX_ENTRIES and
+        ANSWER_CACHE_SIMILARITY (near-duplicate threshold, unset disables).
+        
+        Returns:
+            The cache, or None if disabled.
+        """
+        if self._answer_cache is None and ANSWER_CACHE_PATH:
+            similarity = os.environ.get("ANSWER_CACHE_SIMILARITY")
+            self._answer_cache = AnswerCache(
+                ANSWER_CACHE_PATH,
+                ttl=float(os.environ.get("ANSWER_CACHE_TTL", str(24 * 3600))),
+                max_entries=int(os.environ.get("ANSWER_CACHE_MAX_ENTRIES", "1000")),
+                similarity_threshold=float(similarity) if similarity else None
+            )
+        return self._answer_cache
+
+
+_provider: Optional[PipelineProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_pipeline() -> Optional[AgentPipeline]:
+    """Get the process-wide long-lived pipeline.
+    
+    Returns:
+        The pipeline, or None if GOOGLE_API_KEY is not configured.
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = PipelineProvider()
+    return _provider.get()
+
+
+MISSING_API_KEY_MESSAGE = "Erro: GOOGLE_API_KEY não encontrada. Configure a variável de ambiente."
 
 
 def get_analytics_response(query: str) -> str:
@@ -120,55 +737,43 @@ def get_analytics_response(query: str) -> str:
     Returns:
         Processed response.
     """
-    # Import dependencies
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    import pandas as pd
-    from dotenv import load_dotenv
-    from logging_config import setup_logging
-    
-    # Setup logging (only once)
-    log_level = os.environ.get("LOG_LEVEL", "DEBUG")  # Changed to DEBUG temporarily
-    setup_logging(level=log_level, use_colors=True)
-    
-    logger = logging.getLogger(__name__)
-    logger.info("🔧 Initializing analytics response system...")
-    
-    # Load environment variables
-    load_dotenv()
-    
-    # Check for API key
-    if "GOOGLE_API_KEY" not in os.environ:
-        logger.error("❌ GOOGLE_API_KEY not found in environment")
-        return "Erro: GOOGLE_API_KEY não encontrada. Configure a variável de ambiente."
-    
-    logger.info("✅ API key found")
-    
-    # Load data
-    DATA_PATH = '../data/train.csv'
-    if os.path.exists(DATA_PATH):
-        logger.info(f"📂 Loading data from {DATA_PATH}...")
-        df = pd.read_csv(DATA_PATH)
-        if 'Order Date' in df.columns:
-            df['Order Date'] = pd.to_datetime(df['Order Date'], dayfirst=True)
-        logger.info(f"✅ Data loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-    else:
-        logger.warning(f"⚠️  Data file not found at {DATA_PATH}, using empty DataFrame")
-        df = pd.DataFrame()
-    
-    # Initialize LLM
-    logger.info("🤖 Initializing LLM (Gemini 2.0 Flash)...")
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash-exp",
-        temperature=0.3,
-        google_api_key=os.environ.get("GOOGLE_API_KEY")
-    )
-    logger.info("✅ LLM initialized")
-    
-    # Create pipeline and process
-    logger.info("🔄 Creating agent pipeline...")
-    pipeline = AgentPipeline(llm, df)
+    pipeline = get_pipeline()
+    if pipeline is None:
+        return MISSING_API_KEY_MESSAGE
     
     return pipeline.process_query(query)
 
 
+async def aget_analytics_response(query: str) -> str:
+    """Async variant of get_analytics_response.
+    
+    Args:
+        query: User query to process.
+        
+    Returns:
+        Processed response.
+    """
+    # A swap after a dataset or config change builds agents; not on the loop
+    pipeline = await asyncio.to_thread(get_pipeline)
+    if pipeline is None:
+        return MISSING_API_KEY_MESSAGE
+    
+    return await pipeline.aprocess_query(query)
 
+
+async def astream_analytics_response(query: str) -> AsyncIterator[Dict[str, Any]]:
+    """Streaming variant of get_analytics_response.
+    
+    Args:
+        query: User query to process.
+        
+    Yields:
+        Event dictionaries (see agents.streaming).
+    """
+    pipeline = await asyncio.to_thread(get_pipeline)
+    if pipeline is None:
+        yield {"type": "error", "content": MISSING_API_KEY_MESSAGE}
+        return
+    
+    async for event in pipeline.astream_query(query):
+        yield event
@@ -6,12 +6,14 @@ data analysis pipeline.
 
 from .base import SimpleAgent
 from .tools import DataTools
+from .intent_classifier import IntentClassifier
 from .intent_evaluator import IntentEvaluator
 from .analytics_agent import AnalyticsAgent
 
 __all__ = [
     "SimpleAgent",
     "DataTools",
+    "IntentClassifier",
     "IntentEvaluator",
     "AnalyticsAgent",
 ]
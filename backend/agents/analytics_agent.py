@@ -3,6 +3,8 @@
 This module provides the main analytics agent with data tools.
 """
 
+from typing import Any, Dict, Optional
+
 import pandas as pd
 from .base import SimpleAgent
 from .tools import DataTools
@@ -36,14 +38,28 @@ AVAILABLE DATA:
 - You DO NOT need to load, read or import anything
 
 AVAILABLE TOOLS:
-1. **get_csv_metadata**: Get structure and preview of data
+1. **get_csv_metadata**: Get the profile of the data (dtypes, ranges, top values)
    - Use FIRST to see which columns exist
+   - Pass a list of columns to get only those
    - Call directly, do not ask the user
    
-2. **execute_python_analysis**: Execute Python code for analysis
+2. **search_text_values**: Find exact product, customer or city values
+   - Use when the user names a product, customer or city (even partially)
+   - Filter on the EXACT values/IDs returned, never with str.contains
+   
+3. **query_sales_cube**: Sales totals, counts or averages without code
+   - By year/quarter/month and/or Category, Sub-Category, Region, Segment, Ship Mode
+   - Filters as 'Column=value' (e.g. ["Region=West", "year=2017"])
+   - Prefer it over code for these rollups
+   
+4. **execute_python_analysis**: Execute Python code for analysis
    - The DataFrame `df` is already available in the code
    - Store result in variable `result`
    - Example: result = df['Sales'].mean()
+   - Large tables are cut to their first rows; prefer aggregated results
+   
+5. **fetch_result_rows**: Get more rows of a truncated result by its handle
+   - Only if the rows shown are not enough to answer
    
 
 
@@ -107,14 +123,23 @@ Question: {{input}}
 Thought:{{agent_scratchpad}}'''
 
 
-    def __init__(self, llm, dataframe: pd.DataFrame):
+    def __init__(
+        self,
+        llm,
+        dataframe: pd.DataFrame,
+        dataset_version: Optional[str] = None,
+        catalog: Optional[Dict[str, Any]] = None
+    ):
         """Initialize the Analytics Agent.
         
         Args:
             llm: Language model instance.
             dataframe: The pandas DataFrame to analyze.
+            dataset_version: Version of ``dataframe``, used to memoize code
+                execution results.
+            catalog: Column catalog, used to validate generated code.
         """
-        self.data_tools = DataTools(dataframe)
+        self.data_tools = DataTools(dataframe, dataset_version, catalog)
         
         super().__init__(
             llm=llm,
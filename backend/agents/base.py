@@ -4,11 +4,14 @@ This module provides a minimal base class that leverages LangChain's
 built-in agent functionality instead of reimplementing features.
 """
 
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 import logging
 from langchain_core.messages import SystemMessage, HumanMessage
 from langgraph.prebuilt import create_react_agent
 
+from tool_output import prune_tool_outputs
+from .streaming import stream_agent_events
+
 
 class SimpleAgent:
     """Simplified agent that uses LangGraph's create_react_agent.
@@ -68,32 +71,34 @@ class SimpleAgent:
         # Create agent using LangGraph
         # We don't pass system_prompt here because we prepend it as a SystemMessage in invoke()
         # This avoids compatibility issues with different langgraph versions (state_modifier vs messages_modifier)
-        self.agent = create_react_agent(self.llm, self.tools)
+        # Earlier tool outputs are compacted before each LLM call
+        self.agent = create_react_agent(
+            self.llm, self.tools, pre_model_hook=prune_tool_outputs
+        )
         
         self.logger.info(
             f"Initialized {self.__class__.__name__} with {len(self.tools)} tools"
         )
     
-    def invoke(self, user_message: str) -> str:
+    def invoke(self, user_message: str, callbacks: Optional[List] = None) -> str:
         """Invoke the agent with a user message.
         
         Args:
             user_message: The user's query.
+            callbacks: Optional LangChain callback handlers for the run.
             
         Returns:
             The agent's response as a string.
         """
+        config = {"recursion_limit": 50}
+        if callbacks:
+            config["callbacks"] = callbacks
+        
         try:
-            # Prepare messages with system prompt
-            messages = [
-                SystemMessage(content=self.system_prompt),
-                HumanMessage(content=user_message)
-            ]
-            
             # Invoke agent
             result = self.agent.invoke(
-                {"messages": messages},
-                config={"recursion_limit": 50}
+                {"messages": self._build_messages(user_message)},
+                config=config
             )
             
             # Extract last message content
@@ -101,37 +106,116 @@ class SimpleAgent:
             if not messages_list:
                 return "Desculpe, não consegui processar sua solicitação."
             
-            # Get last message with content
-            content = None
-            for msg in reversed(messages_list):
-                msg_content = getattr(msg, 'content', '')
-                if msg_content and msg_content != "None" and msg_content.strip():
-                    content = msg_content
-                    break
+            content = self._last_content(messages_list)
             
             # If no content found, force agent to generate final response
             if not content:
                 self.logger.warning("Agent stopped without final response, forcing continuation...")
-                messages_list.append(
-                    HumanMessage(content="Por favor, gere uma resposta final em texto para o usuário com base nos resultados das ferramentas.")
-                )
+                messages_list.append(self._continuation_message())
                 
                 # Invoke again
                 result = self.agent.invoke(
+                    {"messages": messages_list},
+                    config=config
+                )
+                content = self._last_content(result.get("messages", []))
+            
+            return content if content else "Desculpe, não consegui gerar uma resposta."
+            
+        except Exception as e:
+            self.logger.error(f"Error invoking agent: {str(e)}")
+            return f"Erro ao processar: {str(e)}"
+    
+    async def ainvoke(self, user_message: str) -> str:
+        """Invoke the agent asynchronously with a user message.
+        
+        LLM calls are awaited instead of blocking the event loop; tools run
+        through their async path.
+        
+        Args:
+            user_message: The user's query.
+            
+        Returns:
+            The agent's response as a string.
+        """
+        try:
+            result = await self.agent.ainvoke(
+                {"messages": self._build_messages(user_message)},
+                config={"recursion_limit": 50}
+            )
+            
+            messages_list = result.get("messages", [])
+            if not messages_list:
+                return "Desculpe, não consegui processar sua solicitação."
+            
+            content = self._last_content(messages_list)
+            
+            if not content:
+                self.logger.warning("Agent stopped without final response, forcing continuation...")
+                messages_list.append(self._continuation_message())
+                result = await self.agent.ainvoke(
                     {"messages": messages_list},
                     config={"recursion_limit": 50}
                 )
-                
-                # Try to extract content again
-                new_messages = result.get("messages", [])
-                for msg in reversed(new_messages):
-                    msg_content = getattr(msg, 'content', '')
-                    if msg_content and msg_content != "None" and msg_content.strip():
-                        content = msg_content
-                        break
+                content = self._last_content(result.get("messages", []))
             
             return content if content else "Desculpe, não consegui gerar uma resposta."
             
         except Exception as e:
             self.logger.error(f"Error invoking agent: {str(e)}")
             return f"Erro ao processar: {str(e)}"
+    
+    async def astream(self, user_message: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the agent run as stage, token and done events.
+        
+        Args:
+            user_message: The user's query.
+            
+        Yields:
+            Event dictionaries (see agents.streaming).
+        """
+        async for event in stream_agent_events(
+            self.agent,
+            self._build_messages(user_message),
+            self._final_content
+        ):
+            yield event
+    
+    def _final_content(self, messages_list: List) -> str:
+        """Final answer text for a finished streamed run."""
+        return self._last_content(messages_list) or "Desculpe, não consegui gerar uma resposta."
+    
+    def _build_messages(self, user_message: str) -> List:
+        """Prepare the initial messages with the system prompt.
+        
+        Args:
+            user_message: The user's query.
+            
+        Returns:
+            List with the system and user messages.
+        """
+        return [
+            SystemMessage(content=self.system_prompt),
+            HumanMessage(content=user_message)
+        ]
+    
+    @staticmethod
+    def _continuation_message() -> HumanMessage:
+        """Message asking the agent for a final text response."""
+        return HumanMessage(content="Por favor, gere uma resposta final em texto para o usuário com base nos resultados das ferramentas.")
+    
+    @staticmethod
+    def _last_content(messages_list: List) -> Optional[str]:
+        """Get the content of the last message that has any.
+        
+        Args:
+            messages_list: Messages returned by the agent.
+            
+        Returns:
+            The message content, or None if no message has content.
+        """
+        for msg in reversed(messages_list):
+            msg_content = getattr(msg, 'content', '')
+            if msg_content and msg_content != "None" and msg_content.strip():
+                return msg_content
+        return None
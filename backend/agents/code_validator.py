@@ -0,0 +1,267 @@
+"""Static pre-flight validation of generated analysis code.
+
+This module provides the CodeValidator class, which parses the code sent
+to the analysis tools and rejects, without executing it, code that would
+fail in predictable ways:
+
+    - syntax errors;
+    - references to columns that do not exist in the dataset;
+    - a missing ``result`` assignment;
+    - file, network or process I/O (``pd.read_csv``, ``open``, ``os``...);
+    - names that are never defined or imported (``np`` without an import).
+
+The feedback is short and precise, so the agent can fix the code in one
+iteration instead of paying for a failed full-data execution.
+"""
+
+import ast
+import builtins
+import difflib
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+# Modules generated code must not import
+FORBIDDEN_MODULES = {
+    'os', 'sys', 'subprocess', 'shutil', 'socket', 'pathlib', 'glob', 'io',
+    'pickle', 'requests', 'urllib', 'http', 'ctypes', 'multiprocessing',
+    'threading', 'importlib', 'builtins',
+}
+
+# Builtins generated code must not call
+FORBIDDEN_CALLS = {
+    'open', 'eval', 'exec', 'compile', '__import__', 'input', 'breakpoint',
+    'exit', 'quit', 'globals', 'locals', 'vars',
+}
+
+# DataFrame writers that touch the filesystem when given a target
+WRITER_METHODS = {
+    'to_csv', 'to_excel', 'to_parquet', 'to_json', 'to_pickle', 'to_sql',
+    'to_feather', 'to_hdf', 'to_stata', 'to_orc', 'to_clipboard',
+}
+
+# Imports suggested for common undefined names
+IMPORT_HINTS = {
+    'np': 'import numpy as np',
+    'numpy': 'import numpy as np',
+    'datetime': 'from datetime import datetime',
+    'timedelta': 'from datetime import timedelta',
+    'math': 'import math',
+    'stats': 'from scipy import stats',
+}
+
+# Methods whose keyword arguments name new columns
+_COLUMN_CREATING_METHODS = {'assign', 'agg', 'aggregate'}
+
+_BUILTIN_NAMES = set(dir(builtins))
+
+
+class CodeValidator:
+    """Validates generated code against the dataset schema.
+
+    Attributes:
+        columns: Column names of the dataset.
+        catalog: Column catalog, used to describe suggested columns.
+        namespace: Names the execution environment provides (e.g. df, pd).
+    """
+
+    def __init__(
+        self,
+        columns: Iterable[Any],
+        catalog: Optional[Dict[str, Any]] = None,
+        namespace: Iterable[str] = ('df', 'pd')
+    ) -> None:
+        """Initialize the validator.
+
+        Args:
+            columns: Column names of the dataset.
+            catalog: Column catalog (``data/catalog.json``).
+            namespace: Names available to the code without imports.
+        """
+        self.columns = [str(column) for column in columns]
+        self.catalog = catalog or {}
+        self.namespace = set(namespace)
+        self._columns_by_lower = {column.lower(): column for column in self.columns}
+
+    def validate(self, code: str) -> List[str]:
+        """Check code without executing it.
+
+        Args:
+            code: Python source.
+
+        Returns:
+            Human-readable problems; empty if the code may be executed.
+        """
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            return [f"Syntax error on line {e.lineno}: {e.msg}."]
+
+        bound = self._bound_names(tree)
+        issues = self._io_issues(tree)
+        issues += self._undefined_name_issues(tree, bound)
+        if 'df' not in bound:
+            issues += self._column_issues(tree)
+        if 'result' not in bound:
+            issues.append(
+                "The final value is never assigned to 'result' "
+                "(e.g. `result = df['Sales'].sum()`)."
+            )
+        return issues
+
+    def _bound_names(self, tree: ast.AST) -> Set[str]:
+        """Names assigned, imported or defined anywhere in the code."""
+        bound = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+                bound.add(node.id)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                for alias in node.names:
+                    bound.add(alias.asname or alias.name.split('.')[0])
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                bound.add(node.name)
+            elif isinstance(node, ast.arg):
+                bound.add(node.arg)
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                bound.add(node.name)
+            elif isinstance(node, (ast.Global, ast.Nonlocal)):
+                bound.update(node.names)
+        return bound
+
+    def _io_issues(self, tree: ast.AST) -> List[str]:
+        """Imports and calls that read or write outside the DataFrame."""
+        issues = []
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                modules = [alias.name for alias in node.names]
+                if isinstance(node, ast.ImportFrom) and node.module:
+                    modules = [node.module]
+                for module in modules:
+                    if module.split('.')[0] in FORBIDDEN_MODULES:
+                        issues.append(f"Importing `{module}` is not allowed.")
+            elif isinstance(node, ast.Call):
+                func = node.func
+                if isinstance(func, ast.Name) and func.id in FORBIDDEN_CALLS:
+                    issues.append(f"Calling `{func.id}()` is not allowed.")
+                elif isinstance(func, ast.Attribute):
+                    if func.attr.startswith('read_'):
+                        issues.append(
+                            f"`{func.attr}()` is not allowed: the data is already "
+                            "loaded as `df`."
+                        )
+                    elif func.attr in WRITER_METHODS and (node.args or node.keywords):
+                        issues.append(f"Writing files with `{func.attr}()` is not allowed.")
+        return issues
+
+    def _undefined_name_issues(self, tree: ast.AST, bound: Set[str]) -> List[str]:
+        """Names read but never defined, imported or provided."""
+        known = bound | self.namespace | _BUILTIN_NAMES
+        issues = []
+        seen = set()
+        for node in ast.walk(tree):
+            if (
+                isinstance(node, ast.Name)
+                and isinstance(node.ctx, ast.Load)
+                and node.id not in known
+                and node.id not in seen
+            ):
+                seen.add(node.id)
+                hint = IMPORT_HINTS.get(node.id)
+                issues.append(
+                    f"`{node.id}` is not defined"
+                    + (f"; add `{hint}`." if hint else ".")
+                )
+        return issues
+
+    def _column_issues(self, tree: ast.AST) -> List[str]:
+        """References to columns of ``df`` that do not exist."""
+        created = self._created_columns(tree)
+        issues = []
+        seen = set()
+        for name in self._referenced_columns(tree):
+            if name in self.columns or name in created or name in seen:
+                continue
+            seen.add(name)
+            issues.append(self._unknown_column_message(name))
+        return issues
+
+    def _referenced_columns(self, tree: ast.AST) -> List[str]:
+        """String column names read from ``df`` directly.
+
+        Covers ``df['A']``, ``df[['A', 'B']]``, ``df.groupby('A')``,
+        ``df.groupby(by=[...])`` and ``df.sort_values('A')``.
+        """
+        names = []
+        for node in ast.walk(tree):
+            if (
+                isinstance(node, ast.Subscript)
+                and isinstance(node.ctx, ast.Load)
+                and _is_df(node.value)
+            ):
+                names += _string_constants(node.slice)
+            elif (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr in ('groupby', 'sort_values')
+                and _is_df(node.func.value)
+            ):
+                if node.args:
+                    names += _string_constants(node.args[0])
+                for keyword in node.keywords:
+                    if keyword.arg == 'by':
+                        names += _string_constants(keyword.value)
+        return names
+
+    def _created_columns(self, tree: ast.AST) -> Set[str]:
+        """Column names the code creates itself."""
+        created = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Subscript) and isinstance(node.ctx, ast.Store):
+                created.update(_string_constants(node.slice))
+            elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+                if node.func.attr in _COLUMN_CREATING_METHODS:
+                    created.update(k.arg for k in node.keywords if k.arg)
+                elif node.func.attr == 'rename':
+                    for argument in list(node.args) + [k.value for k in node.keywords]:
+                        if isinstance(argument, ast.Dict):
+                            for value in argument.values:
+                                created.update(_string_constants(value))
+                for keyword in node.keywords:
+                    if keyword.arg == 'name':
+                        created.update(_string_constants(keyword.value))
+        return created
+
+    def _unknown_column_message(self, name: str) -> str:
+        """Feedback for a missing column, with the closest real column."""
+        match = self._columns_by_lower.get(name.lower())
+        if match is None:
+            close = difflib.get_close_matches(name, self.columns, n=1, cutoff=0.6)
+            match = close[0] if close else None
+
+        if match is None:
+            return (
+                f"Column '{name}' does not exist. Available columns: "
+                f"{', '.join(self.columns)}."
+            )
+        description = self.catalog.get(match, {}).get('short description')
+        return (
+            f"Column '{name}' does not exist. Did you mean '{match}'"
+            + (f" ({description})" if description else "")
+            + "?"
+        )
+
+
+def _is_df(node: ast.AST) -> bool:
+    """Whether the node is the name ``df``."""
+    return isinstance(node, ast.Name) and node.id == 'df'
+
+
+def _string_constants(node: ast.AST) -> List[str]:
+    """String constants of a node that is a string or a list/tuple of them."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [
+            element.value for element in node.elts
+            if isinstance(element, ast.Constant) and isinstance(element.value, str)
+        ]
+    return []
@@ -0,0 +1,305 @@
+"""Local fast-path intent classifier.
+
+This module provides the IntentClassifier, a lexicon-based classifier that
+runs in-process before the LLM-backed IntentEvaluator. Messages that are
+clearly about the data (they mention columns, category values or analysis
+terms) or clearly off-topic (jokes, recipes, small talk) are decided in
+microseconds; everything else is reported as ambiguous and left to the LLM.
+
+Accuracy can be benchmarked offline against the labelled set that ships
+next to this module:
+
+    python -m agents.intent_classifier [path/to/labels.jsonl]
+"""
+
+import os
+import json
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import pandas as pd
+
+from text_utils import normalize_text, tokenize
+
+
+ALLOWED = "allowed"
+REJECTED = "rejected"
+AMBIGUOUS = "ambiguous"
+
+LABELS_PATH = os.path.join(os.path.dirname(__file__), 'intent_labels.jsonl')
+
+# Analysis vocabulary (Portuguese and English, without accents)
+ANALYTICS_TERMS = {
+    'venda', 'vendas', 'vendido', 'vendidos', 'sales', 'sale', 'sold',
+    'faturamento', 'receita', 'revenue', 'lucro', 'profit', 'margem', 'margin',
+    'media', 'mean', 'average', 'mediana', 'median', 'moda', 'mode',
+    'soma', 'sum', 'total', 'totais', 'contagem', 'count', 'quantos', 'quantas',
+    'quantidade', 'numero', 'maximo', 'minimo', 'max', 'min',
+    'variancia', 'variance', 'desvio', 'std', 'percentual', 'porcentagem',
+    'percentage', 'percent', 'proporcao', 'share', 'distribuicao', 'distribution',
+    'estatistica', 'estatisticas', 'statistics', 'metrica', 'metricas', 'metrics',
+    'kpi', 'kpis', 'ranking', 'top', 'maiores', 'menores', 'melhores', 'piores',
+    'best', 'worst', 'highest', 'lowest', 'tendencia', 'tendencias', 'trend',
+    'trends', 'crescimento', 'growth', 'sazonalidade', 'seasonality',
+    'mensal', 'monthly', 'anual', 'yearly', 'annual', 'trimestre', 'quarter',
+    'comparar', 'compare', 'comparacao', 'comparison', 'correlacao', 'correlation',
+    'agrupado', 'agrupar', 'group', 'groupby', 'analise', 'analisar', 'analysis',
+    'analyze', 'dados', 'data', 'dataset', 'tabela', 'table', 'relatorio',
+    'report', 'grafico', 'chart', 'pedido', 'pedidos', 'order', 'orders',
+    'cliente', 'clientes', 'customer', 'customers', 'produto', 'produtos',
+    'product', 'products', 'categoria', 'categorias', 'category', 'categories',
+    'regiao', 'regioes', 'region', 'regions', 'segmento', 'segmentos', 'segment',
+    'estado', 'estados', 'cidade', 'cidades', 'city', 'cities', 'envio',
+    'entrega', 'shipping', 'ship', 'desconto', 'discount', 'ticket',
+}
+
+# Metric, aggregation and period words. A message needs at least one to be
+# allowed locally: dataset values alone ("first class tickets to paris",
+# "home office chairs") do not make a question about the data.
+ANALYTIC_CUES = {
+    'venda', 'vendas', 'vendido', 'vendidos', 'vende', 'vendem', 'sales', 'sale',
+    'sold', 'faturamento', 'revenue', 'lucro', 'profit', 'margem', 'margin',
+    'desconto', 'discount', 'valor', 'value',
+    'media', 'medio', 'mean', 'average', 'avg', 'mediana', 'median',
+    'soma', 'sum', 'total', 'totais', 'contagem', 'count', 'quantos', 'quantas',
+    'quantidade', 'many', 'numero', 'maximo', 'minimo', 'max', 'min',
+    'maior', 'menor', 'maiores', 'menores', 'highest', 'lowest', 'top', 'ranking',
+    'variancia', 'variance', 'desvio', 'std', 'percentual', 'porcentagem',
+    'percentage', 'percent', 'proporcao', 'share', 'distribuicao', 'distribution',
+    'comparar', 'compare', 'comparacao', 'comparison', 'correlacao', 'correlation',
+    'estatistica', 'estatisticas', 'statistics', 'metrica', 'metricas', 'metrics',
+    'kpi', 'kpis', 'agrupar', 'group', 'groupby',
+    'mensal', 'mensais', 'monthly', 'anual', 'anuais', 'annual', 'yearly',
+    'trimestre', 'trimestral', 'quarter', 'quarterly', 'semanal', 'weekly',
+    'tendencia', 'tendencias', 'trend', 'trends', 'crescimento', 'growth',
+    'sazonalidade', 'seasonality',
+}
+
+# Clearly off-topic vocabulary, weighted higher than a single on-topic hit
+OFF_TOPIC_TERMS = {
+    'piada', 'piadas', 'joke', 'jokes', 'poema', 'poem', 'poesia', 'poetry',
+    'historia', 'story', 'conto', 'musica', 'song', 'cancao', 'lyrics',
+    'filme', 'filmes', 'movie', 'movies', 'serie', 'novela', 'futebol',
+    'football', 'soccer', 'jogo', 'game', 'receita', 'recipe', 'bolo', 'cake',
+    'horoscopo', 'horoscope', 'signo', 'clima', 'weather', 'previsao',
+    'namorada', 'namorado', 'amor', 'love', 'politica', 'politics',
+    'presidente', 'president', 'traduza', 'traduzir', 'translate',
+    'oi', 'ola', 'hello', 'hi', 'hey', 'obrigado', 'obrigada', 'thanks',
+    'tchau', 'bye', 'charada', 'riddle', 'viagem', 'ferias', 'vacation',
+}
+
+# Words with an on-topic and an off-topic meaning (receita: revenue/recipe,
+# moda: mode/fashion, ...) are not counted either way
+AMBIGUOUS_TERMS = {'receita', 'previsao', 'historia', 'serie', 'moda'}
+
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'por', 'para', 'com', 'dos', 'das', 'que',
+    'row', 'code', 'name', 'id',
+}
+
+
+def is_analytic_cue(token: str) -> bool:
+    """Whether a token is a metric, aggregation or period word (or a year)."""
+    return token in ANALYTIC_CUES or (len(token) == 4 and token.isdigit() and token[:2] in ('19', '20'))
+
+
+class IntentDecision(NamedTuple):
+    """Result of a fast-path classification.
+
+    Attributes:
+        label: ``allowed``, ``rejected`` or ``ambiguous``.
+        confidence: Confidence of the label, between 0 and 1.
+    """
+
+    label: str
+    confidence: float
+
+
+class IntentClassifier:
+    """Lexicon-based classifier deciding obvious intents without an LLM.
+
+    Each message is scored by the on-topic words it contains (analysis
+    terms plus the dataset's column names and categorical values) minus the
+    off-topic words, weighted double. The confidence is ``1 - 0.5 ** |score|``
+    and messages below ``threshold`` are ambiguous, as are on-topic
+    messages without an analytic cue (see ANALYTIC_CUES).
+
+    Attributes:
+        vocabulary: Tokens taken from the dataset schema and values.
+        threshold: Minimum confidence for a decision.
+        logger: Logger instance for the classifier.
+    """
+
+    OFF_TOPIC_WEIGHT = 2
+
+    def __init__(self, vocabulary: Iterable[str] = (), threshold: float = 0.75) -> None:
+        """Initialize the classifier.
+
+        Args:
+            vocabulary: Dataset tokens counted as on-topic.
+            threshold: Minimum confidence for a decision.
+        """
+        self.vocabulary = {
+            token for token in vocabulary
+            if len(token) > 2 and token not in STOPWORDS
+        }
+        self.threshold = threshold
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._counts = {ALLOWED: 0, REJECTED: 0, AMBIGUOUS: 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        df: pd.DataFrame,
+        catalog: Optional[Dict[str, Any]] = None,
+        max_values: int = 50,
+        threshold: float = 0.75
+    ) -> "IntentClassifier":
+        """Build the vocabulary from a dataset and its column catalog.
+
+        Args:
+            df: Dataset the questions are about.
+            catalog: Column catalog (``data/catalog.json``).
+            max_values: Largest number of distinct values for a text column
+                to contribute its values.
+            threshold: Minimum confidence for a decision.
+
+        Returns:
+            The classifier.
+        """
+        vocabulary = set()
+        for column in list(df.columns) + list(catalog or {}):
+            vocabulary.update(tokenize(str(column)))
+
+        for column in df.columns:
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                values = series.cat.categories
+            elif pd.api.types.is_string_dtype(series) and series.nunique() <= max_values:
+                values = series.dropna().unique()
+            else:
+                continue
+            for value in values:
+                vocabulary.update(tokenize(str(value)))
+
+        return cls(vocabulary, threshold)
+
+    def classify(self, message: str) -> IntentDecision:
+        """Classify a message.
+
+        Args:
+            message: The user's message.
+
+        Returns:
+            The decision; ambiguous decisions should go to the LLM.
+        """
+        score = 0
+        has_cue = False
+        for token in tokenize(message):
+            if token in self.vocabulary or (
+                (token in ANALYTICS_TERMS or token in ANALYTIC_CUES)
+                and token not in AMBIGUOUS_TERMS
+            ):
+                score += 1
+            elif token in OFF_TOPIC_TERMS and token not in AMBIGUOUS_TERMS:
+                score -= self.OFF_TOPIC_WEIGHT
+            if is_analytic_cue(token):
+                has_cue = True
+
+        confidence = 1 - 0.5 ** abs(score)
+        if score == 0 or confidence < self.threshold:
+            label = AMBIGUOUS
+        elif score > 0:
+            label = ALLOWED if has_cue else AMBIGUOUS
+        else:
+            label = REJECTED
+
+        with self._lock:
+            self._counts[label] += 1
+        self.logger.debug(f"Fast-path intent: {label} ({confidence:.2f})")
+        return IntentDecision(label, confidence)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the decision counters.
+
+        Returns:
+            Dictionary with the count per label, the total and the hit rate
+            (share of messages decided without the LLM).
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        decided = counts[ALLOWED] + counts[REJECTED]
+        return {
+            **counts,
+            "total": total,
+            "hit_rate": decided / total if total else 0.0,
+        }
+
+
+def load_labelled_set(path: str = LABELS_PATH) -> List[Dict[str, str]]:
+    """Read a labelled set of messages.
+
+    Args:
+        path: JSON Lines file with ``text`` and ``label`` fields.
+
+    Returns:
+        List of samples.
+    """
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def benchmark(
+    classifier: IntentClassifier,
+    samples: List[Dict[str, str]]
+) -> Dict[str, Any]:
+    """Measure coverage and accuracy of the fast path on labelled samples.
+
+    Args:
+        classifier: Classifier to evaluate.
+        samples: Samples with ``text`` and ``label`` (allowed/rejected).
+
+    Returns:
+        Dictionary with coverage (share decided locally), accuracy over
+        the decided samples and the misclassified samples.
+    """
+    decided = 0
+    correct = 0
+    errors = []
+    for sample in samples:
+        decision = classifier.classify(sample["text"])
+        if decision.label == AMBIGUOUS:
+            continue
+        decided += 1
+        if decision.label == sample["label"]:
+            correct += 1
+        else:
+            errors.append({**sample, "predicted": decision.label})
+    return {
+        "samples": len(samples),
+        "coverage": decided / len(samples) if samples else 0.0,
+        "accuracy": correct / decided if decided else 0.0,
+        "errors": errors,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    from dataset_registry import get_registry
+
+    registry = get_registry()
+    classifier = IntentClassifier.from_dataframe(
+        registry.get_dataframe(), registry.catalog
+    )
+    report = benchmark(
+        classifier,
+        load_labelled_set(sys.argv[1] if len(sys.argv) > 1 else LABELS_PATH)
+    )
+    print(f"Samples:  {report['samples']}")
+    print(f"Coverage: {report['coverage']:.1%}")
+    print(f"Accuracy: {report['accuracy']:.1%}")
+    for error in report["errors"]:
+        print(f"  ✗ [{error['label']} → {error['predicted']}] {error['text']}")
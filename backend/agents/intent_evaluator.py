@@ -1,18 +1,28 @@
 """Simplified Intent Evaluator using native LangChain.
 
-This module provides intent evaluation using a simple agent.
+This module provides intent evaluation using a simple agent, with an
+optional local classifier that decides obvious cases without the LLM.
 """
 
+from typing import Optional
+
 from .base import SimpleAgent
+from .intent_classifier import ALLOWED, REJECTED, IntentClassifier
 
 
 class IntentEvaluator(SimpleAgent):
     """Evaluates user intent to filter irrelevant queries.
     
     This agent determines if a query is related to data analysis
-    or should be rejected.
+    or should be rejected. When a classifier is given, it runs first and
+    only ambiguous queries reach the LLM.
+    
+    Attributes:
+        classifier: Optional local fast-path classifier.
     """
     
+    REJECTION_MESSAGE = "Desculpe, sou especializado em análise de dados. Posso ajudá-lo com estatísticas, métricas e insights sobre os dados disponíveis."
+    
     SYSTEM_PROMPT = """Você é um filtro de intenção para um sistema de análise de dados.
 
 SUA FUNÇÃO:
@@ -45,14 +55,66 @@ User: "Conte uma piada"
 Você: "Desculpe, sou especializado em análise de dados. Posso ajudá-lo com estatísticas, métricas e insights sobre os dados disponíveis."
 """
     
-    def __init__(self, llm):
+    def __init__(self, llm, classifier: Optional[IntentClassifier] = None):
         """Initialize the Intent Evaluator.
         
         Args:
             llm: Language model instance.
+            classifier: Optional local classifier consulted before the LLM.
         """
+        self.classifier = classifier
         super().__init__(
             llm=llm,
             system_prompt=self.SYSTEM_PROMPT,
             tools=[]  # No tools needed for intent evaluation
         )
+    
+    def invoke(self, user_message: str, callbacks=None) -> str:
+        """Evaluate a query, using the fast path when it is conclusive.
+        
+        Args:
+            user_message: The user's query.
+            callbacks: Optional LangChain callback handlers for the LLM run.
+            
+        Returns:
+            "ALLOWED" or a rejection message.
+        """
+        decided = self._fast_path(user_message)
+        if decided is not None:
+            return decided
+        return super().invoke(user_message, callbacks=callbacks)
+    
+    async def ainvoke(self, user_message: str) -> str:
+        """Evaluate a query asynchronously, using the fast path when conclusive.
+        
+        Args:
+            user_message: The user's query.
+            
+        Returns:
+            "ALLOWED" or a rejection message.
+        """
+        decided = self._fast_path(user_message)
+        if decided is not None:
+            return decided
+        return await super().ainvoke(user_message)
+    
+    def _fast_path(self, user_message: str) -> Optional[str]:
+        """Decide the query locally if the classifier is confident.
+        
+        Args:
+            user_message: The user's query.
+            
+        Returns:
+            The evaluator's answer, or None if the LLM must decide.
+        """
+        if self.classifier is None:
+            return None
+        
+        decision = self.classifier.classify(user_message)
+        if decision.label == ALLOWED:
+            self.logger.info(f"⚡ Fast-path ALLOWED (confidence {decision.confidence:.2f})")
+            return "ALLOWED"
+        if decision.label == REJECTED:
+            self.logger.info(f"⚡ Fast-path REJECTED (confidence {decision.confidence:.2f})")
+            return self.REJECTION_MESSAGE
+        return None
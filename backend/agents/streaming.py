@@ -0,0 +1,99 @@
+"""Streaming of agent runs as client-facing events.
+
+This module translates LangGraph's ``astream_events`` output into a small
+set of JSON-serializable events that the API pushes to clients over SSE
+or WebSocket:
+
+    {"type": "stage", "stage": "intent_checked", "allowed": true}
+    {"type": "stage", "stage": "tool_called", "tool": "..."}
+    {"type": "stage", "stage": "code_executed", "tool": "..."}
+    {"type": "stage", "stage": "tool_finished", "tool": "..."}
+    {"type": "token", "content": "..."}
+    {"type": "done", "content": "..."}
+    {"type": "error", "content": "..."}
+"""
+
+from typing import Any, AsyncIterator, Callable, Dict, List
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# Tools whose completion is reported as the "code_executed" stage
+CODE_EXECUTION_TOOLS = {"execute_python_analysis", "execute_python_analysis_tool"}
+
+
+def chunk_text(content: Any) -> str:
+    """Extract the text of a (possibly multimodal) message chunk.
+
+    Args:
+        content: Chunk content, either a string or a list of blocks.
+
+    Returns:
+        The concatenated text.
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for block in content:
+            if isinstance(block, dict) and block.get('type', 'text') == 'text':
+                parts.append(block.get('text', ''))
+            elif isinstance(block, str):
+                parts.append(block)
+        return ''.join(parts)
+    return ''
+
+
+async def stream_agent_events(
+    graph: Any,
+    messages: List,
+    extract_response: Callable[[List], str],
+    config: Dict[str, Any] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run a LangGraph agent and yield client-facing events.
+
+    Args:
+        graph: Compiled LangGraph agent.
+        messages: Initial messages (system prompt and user query).
+        extract_response: Function turning the final message list into the
+            answer text sent with the ``done`` event.
+        config: Optional run config (defaults to recursion_limit=50).
+
+    Yields:
+        Event dictionaries as described in the module docstring.
+    """
+    config = config or {"recursion_limit": 50}
+    final_messages: List = []
+
+    try:
+        async for event in graph.astream_events(
+            {"messages": messages}, config=config, version="v2"
+        ):
+            kind = event["event"]
+
+            if kind == "on_chat_model_stream":
+                text = chunk_text(getattr(event["data"].get("chunk"), "content", ""))
+                if text:
+                    yield {"type": "token", "content": text}
+
+            elif kind == "on_tool_start":
+                yield {"type": "stage", "stage": "tool_called", "tool": event["name"]}
+
+            elif kind == "on_tool_end":
+                stage = (
+                    "code_executed" if event["name"] in CODE_EXECUTION_TOOLS
+                    else "tool_finished"
+                )
+                yield {"type": "stage", "stage": stage, "tool": event["name"]}
+
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                output = event["data"].get("output") or {}
+                if isinstance(output, dict):
+                    final_messages = output.get("messages", [])
+
+        yield {"type": "done", "content": extract_response(final_messages)}
+
+    except Exception as e:
+        logger.error(f"Error streaming agent: {str(e)}")
+        yield {"type": "error", "content": f"Erro ao processar: {str(e)}"}
@@ -7,6 +7,20 @@ from langchain_core.tools import tool
 from langchain_core.messages import SystemMessage, HumanMessage
 from dotenv import load_dotenv
 import logging
+from typing import List, Optional
+
+from dataset_registry import get_registry
+from code_cache import NO_RESULT, get_execution_cache
+from dataset_profile import format_profile, get_profile_cache
+from concurrency import offload_tool
+from sandbox import get_sandbox_pool
+from text_index import format_matches, get_text_index
+from tool_output import fetch_rows, format_result, prune_tool_outputs
+from value_index import get_value_index
+from export import parse_filters
+from sales_cube import format_answer, get_sales_cube
+from agents.code_validator import CodeValidator
+from agents.streaming import stream_agent_events
 
 load_dotenv()
 
@@ -18,31 +32,31 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # 1. Dados Iniciais (Setup)
-DATA_PATH = '../data/train.csv'
-if os.path.exists(DATA_PATH):
-    df = pd.read_csv(DATA_PATH)
-    # Ensure date column is datetime
-    if 'Order Date' in df.columns:
-        df['Order Date'] = pd.to_datetime(df['Order Date'], dayfirst=True)
-else:
-    print(f"Warning: Data file not found at {DATA_PATH}")
-    df = pd.DataFrame()
+# Shared dataset, loaded once per process by the registry. Tools fetch it
+# again on every call so they follow dataset reloads.
+df = get_registry().get_dataframe()
 
 # 2. Ferramentas (Tools)
 @tool
-def get_csv_metadata() -> str:
+def get_csv_metadata(columns: Optional[List[str]] = None) -> str:
     """
-    Used to get the format, columns, and data types (dtypes) of the DataFrame.
+    Used to get the columns of the DataFrame with their dtypes, nulls, distinct counts, ranges, top values and descriptions.
     The Agent MUST use this tool as the first action to understand the data structure before writing any analysis code.
+    
+    Args:
+        columns: Optional list of columns to describe (default: all columns)
     """
-    logger.info("Tool called: get_csv_metadata")
+    logger.info(f"Tool called: get_csv_metadata(columns={columns})")
+    registry = get_registry()
+    version, df = registry.get_versioned()
     logger.debug(f"DataFrame shape: {df.shape}, columns: {list(df.columns)}")
-    return f"Head:\n{df.head().to_markdown()}\n\nDtypes:\n{df.dtypes.to_markdown()}"
+    profile = get_profile_cache().get(df, version, registry.catalog)
+    return format_profile(profile, columns)
 
 @tool
-def get_unique_values(column_name: str) -> str:
+def get_unique_values(column_name: str, offset: int = 0, limit: int = 50) -> str:
     """
-    Used to get the unique values of a specific DataFrame column.
+    Used to get the unique values of a specific DataFrame column, most frequent first, with their counts.
     
     IMPORTANT:
     - Use this tool BEFORE creating filters to ensure EXACT spelling of values.
@@ -52,35 +66,119 @@ def get_unique_values(column_name: str) -> str:
     
     Args:
         column_name: Exact column name (case-sensitive)
+        offset: Number of values to skip, to page through columns with many values
+        limit: Maximum number of values to return (default 50)
     
     Returns:
-        List of unique values found in the column
+        List of unique values found in the column, with their counts
     """
-    logger.info(f"Tool called: get_unique_values(column_name='{column_name}')")
+    logger.info(
+        f"Tool called: get_unique_values(column_name='{column_name}', offset={offset}, limit={limit})"
+    )
+    index = get_value_index()
     
     try:
-        if column_name not in df.columns:
-            available_columns = ', '.join(df.columns)
+        if column_name not in index.df.columns:
+            available_columns = ', '.join(index.df.columns)
             logger.warning(f"Column '{column_name}' not found. Available: {available_columns}")
             return f"ERROR: Column '{column_name}' does not exist. Available columns: {available_columns}"
         
-        unique_vals = df[column_name].unique()
-        unique_count = len(unique_vals)
+        offset = max(offset, 0)
+        limit = max(limit, 1)
+        page, unique_count = index.values(column_name, offset, limit)
+        logger.info(f"Column '{column_name}' has {unique_count} unique values (returning {len(page)})")
         
-        # Limit output for readability
-        if unique_count > 50:
-            sample_vals = unique_vals[:50]
-            logger.info(f"Column '{column_name}' has {unique_count} unique values (showing first 50)")
-            return f"Column '{column_name}' has {unique_count} unique values.\n\nFirst 50 values:\n{list(sample_vals)}\n\n(Use these EXACT values when creating filters)"
-        else:
-            logger.info(f"Column '{column_name}' has {unique_count} unique values")
-            return f"Column '{column_name}' has {unique_count} unique values:\n\n{list(unique_vals)}\n\n(Use these EXACT values when creating filters)"
+        lines = [f"- {value!r} ({count})" for value, count in page]
+        header = (
+            f"Column '{column_name}' has {unique_count} unique values "
+            f"(showing {offset + 1}-{offset + len(page)}, most frequent first, with counts):"
+            if page else
+            f"Column '{column_name}' has {unique_count} unique values (none after offset {offset})."
+        )
+        footer = "(Use these EXACT values when creating filters)"
+        if offset + len(page) < unique_count:
+            footer = f"(Call again with offset={offset + len(page)} for more values)\n" + footer
+        return "\n".join([header, ""] + lines + ["", footer])
     
     except Exception as e:
         logger.error(f"Error getting unique values: {str(e)}")
         return f"Error getting unique values: {str(e)}"
 
 
+@tool
+def search_text_values(column_name: str, query: str, limit: int = 10) -> str:
+    """
+    Used to find the EXACT values (and IDs) of free-text columns that match a fuzzy description.
+    Indexed columns: Product Name (with Product ID), Customer Name (with Customer ID) and City.
+    
+    IMPORTANT:
+    - Use this tool when the user mentions a product, customer or city by (part of) its name,
+      e.g. "Bush Somerset bookcases" -> search_text_values("Product Name", "bush somerset bookcases").
+    - Then filter in execute_python_analysis on the EXACT keys returned (isin / ==),
+      instead of str.contains or regex scans.
+    
+    Args:
+        column_name: Product Name, Customer Name or City
+        query: Free text to look for (typos and plurals are tolerated)
+        limit: Maximum number of matches (default 10)
+    
+    Returns:
+        Matching values, best first, with their IDs and row counts
+    """
+    logger.info(f"Tool called: search_text_values(column_name='{column_name}', query='{query}')")
+    index = get_text_index()
+    
+    if column_name not in index.columns:
+        indexed = ', '.join(index.columns)
+        logger.warning(f"Column '{column_name}' is not text-indexed. Indexed: {indexed}")
+        return f"ERROR: Column '{column_name}' is not indexed for text search. Indexed columns: {indexed}"
+    
+    matches = index.search(column_name, query, max(limit, 1))
+    logger.info(f"{len(matches)} values of '{column_name}' match '{query}'")
+    return format_matches(column_name, query, matches, index.columns[column_name])
+
+
+@tool
+def query_sales_cube(
+    by: Optional[List[str]] = None,
+    time: Optional[str] = None,
+    filters: Optional[List[str]] = None,
+    agg: str = "sum",
+    measure: str = "Sales"
+) -> str:
+    """
+    Used to answer rollups of Sales (totals, counts, averages) by period and category-like columns
+    INSTANTLY from a pre-aggregated cube, without writing code.
+    Pre-aggregated: Sales by year / quarter / month x Category, Sub-Category, Region, Segment, Ship Mode.
+    Other columns (e.g. State, City) or measures also work, computed on the full dataset.
+    
+    IMPORTANT:
+    - Prefer this tool over execute_python_analysis for "Sales by X (per year/quarter/month)" questions.
+    - Period keys are strings: year '2017', quarter '2017Q4', month '2017-11'.
+    - Filters are 'Column=value' strings; repeat a column for alternatives, e.g.
+      ["Region=West", "Region=East", "year=2017"].
+    
+    Args:
+        by: Columns to group by (e.g. ["Category", "Region"]); empty for a grand total
+        time: Period to group by: 'year', 'quarter', 'month' or None
+        filters: 'Column=value' filters (columns or year/quarter/month)
+        agg: 'sum' (default), 'count' (number of order lines) or 'mean'
+        measure: Numeric column to aggregate (default Sales)
+    
+    Returns:
+        The aggregated table
+    """
+    logger.info(f"Tool called: query_sales_cube(by={by}, time={time}, filters={filters}, agg={agg})")
+    try:
+        result = get_sales_cube().query(by or [], time, parse_filters(filters or []), agg, measure)
+        logger.info(f"Cube query answered from the {result.source} ({len(result.table)} rows)")
+        return format_answer(result)
+    except KeyError as e:
+        return f"ERROR: Unknown column(s): {e.args[0]}. Use get_csv_metadata to see the columns."
+    except ValueError as e:
+        return f"ERROR: {str(e)}"
+
+
 @tool
 def execute_python_analysis(code: str) -> str:
     """
@@ -99,26 +197,38 @@ def execute_python_analysis(code: str) -> str:
     logger.info("-"*80)
     
     try:
-        # Sandbox execution with common libraries available
-        from datetime import datetime
-        import numpy as np
-        import pandas as pd
+        registry = get_registry()
+        version, df = registry.get_versioned()
         
-        local_vars = {
-            'df': df, 
-            'pd': pd,
-            'datetime': datetime,
-            'np': np
-        }
-        exec(code, globals(), local_vars)  
+        # Pre-flight: reject predictable failures without executing
+        issues = CodeValidator(
+            df.columns, registry.catalog, namespace=('df', 'pd', 'datetime', 'np')
+        ).validate(code)
+        if issues:
+            logger.warning(f"CODE REJECTED BY PRE-FLIGHT: {issues}")
+            return (
+                "Pre-flight validation failed, the code was NOT executed:\n- "
+                + "\n- ".join(issues)
+                + "\nFix the code and run it again."
+            )
+        
+        # Runs in a sandbox worker with common libraries available; identical
+        # code on the same dataset version reuses the cached result
+        result = get_execution_cache().run(
+            code,
+            version,
+            lambda: get_sandbox_pool().execute(
+                code, df, version, names=('pd', 'datetime', 'np')
+            ),
+            scope=__name__
+        )
         # Check for result variable (convention)
-        if 'result' in local_vars:
-            result = local_vars['result']
+        if result is not NO_RESULT:
             logger.info(f"CODE EXECUTION: SUCCESS")
             logger.info(f"RESULT TYPE: {type(result).__name__}")
             logger.info(f"RESULT VALUE: {str(result)[:500]}")
             logger.info("-"*80)
-            return f"Analysis result: {result}. \n\n"#BASED ON THIS RESULT, GENERATE AN EXPLANATORY TEXT SUMMARY FOR THE USER."
+            return f"Analysis result: {format_result(result)}. \n\n"#BASED ON THIS RESULT, GENERATE AN EXPLANATORY TEXT SUMMARY FOR THE USER."
         
         logger.warning("CODE EXECUTION: Code executed but 'result' variable not defined")
         return "Code executed successfully, but the 'result' variable was not defined. Please rewrite the code to store the final result in 'result'."
@@ -129,7 +239,33 @@ def execute_python_analysis(code: str) -> str:
         logger.debug(f"Failed code:\n{code}")
         return f"Error executing code: {str(e)}"
 
-tools = [get_csv_metadata, get_unique_values, execute_python_analysis]
+@tool
+def fetch_result_rows(handle: str, offset: int = 0, limit: int = 20) -> str:
+    """
+    Used to get more rows of a large analysis result that was truncated.
+    execute_python_analysis shows only the first rows of large tables and gives a handle (e.g. 'r3').
+    Only call this if the rows shown are not enough to answer the question.
+    
+    Args:
+        handle: Handle of the truncated result (e.g. 'r3')
+        offset: First row to return
+        limit: Maximum number of rows to return (default 20)
+    
+    Returns:
+        The requested rows as CSV
+    """
+    logger.info(f"Tool called: fetch_result_rows(handle='{handle}', offset={offset}, limit={limit})")
+    return fetch_rows(handle, offset, limit)
+
+
+# Async agent runs execute the tools in the bounded tool pool
+tools = [
+    offload_tool(t)
+    for t in (
+        get_csv_metadata, get_unique_values, search_text_values,
+        query_sales_cube, execute_python_analysis, fetch_result_rows
+    )
+]
 
 # 3. LLM
 # Ensure GOOGLE_API_KEY is set
@@ -157,7 +293,7 @@ CRITICAL INSTRUCTIONS:
 1. DO NOT ask the user for clarification unless the question is completely ambiguous.
 2. DO NOT stop after getting metadata. Proceed IMMEDIATELY to analysis.
 3. IF you have the metadata, USE IT to write and execute python code to answer the question.
-4. Your workflow must be: get_csv_metadata -> [get_unique_values if filtering] -> execute_python_analysis -> Final Answer.
+4. Your workflow must be: get_csv_metadata -> [get_unique_values / search_text_values if filtering] -> query_sales_cube or execute_python_analysis -> Final Answer.
 5. NEVER say "I need to understand what you want". Assume the user wants the answer to their question.
 6. ALWAYS include appropriate units in your answers:
    - Currency: $ (Dolars) with thousand separators (e.g., $ 1.234,56)
@@ -179,6 +315,8 @@ ABSOLUTE RULES - NO EXCEPTIONS:
 13. Do NOT use your general knowledge to fill gaps - stick to the dataset ONLY.
 14. When generating Python code, INCLUDE necessary imports (datetime, numpy, etc) if needed.
 15. BEFORE creating filters on categorical columns (Category, Segment, Region, etc), ALWAYS use get_unique_values to verify the EXACT spelling of values.
+16. To filter by a product, customer or city named by the user, use search_text_values and filter on the EXACT values/IDs it returns. DO NOT use str.contains or regex on Product Name, Customer Name or City.
+17. For totals, counts or averages of Sales by period (year/quarter/month) and/or Category, Sub-Category, Region, Segment or Ship Mode, use query_sales_cube instead of writing code.
 
 When you have all responses ready, GENERATE AN EXPLANATORY TEXT SUMMARY FOR THE USER.
 Example of CORRECT behavior:
@@ -228,7 +366,55 @@ final_prompt = f"DATA CATALOG:\n{catalog}\n\n{final_prompt}"
 
 # Create agent using LangGraph
 # We don't pass state_modifier here to avoid version issues, we pass it in invoke
-agent = create_react_agent(llm, tools)
+# Earlier tool outputs are compacted before each LLM call
+agent = create_react_agent(llm, tools, pre_model_hook=prune_tool_outputs)
+
+def _extract_response(messages_list: list) -> str:
+    """
+    Extracts the final text answer from the messages returned by the agent.
+    """
+    logger.debug(f"Agent returned {len(messages_list)} messages")
+    
+    if not messages_list:
+        logger.warning("No messages returned from agent")
+        return "Sorry, I couldn't process your request."
+    
+    # Get last message with content
+    for msg in reversed(messages_list):
+        # Log reasoning/thinking if available (Gemini 2.5 Pro feature)
+        if hasattr(msg, 'thinking_content') and msg.thinking_content:
+            logger.info("="*80)
+            logger.info("MODEL REASONING (Thinking):")
+            logger.info(f"{msg.thinking_content}")
+            logger.info("="*80)
+        
+        content = getattr(msg, 'content', '')
+        
+        # Handle list content (multimodal models)
+        if isinstance(content, list):
+            # Extract text from list of content blocks
+            text_parts = []
+            for block in content:
+                if isinstance(block, dict) and 'text' in block:
+                    text_parts.append(block['text'])
+                elif isinstance(block, str):
+                    text_parts.append(block)
+            content = ' '.join(text_parts)
+        
+        # Convert to string and check if valid
+        content_str = str(content) if content else ''
+        if content_str and content_str != "None" and content_str.strip():
+            logger.info("="*80)
+            logger.info("AGENT RESPONSE: SUCCESS")
+            logger.info(f"Response length: {len(content_str)} characters, {len(content_str.split())} words")
+            # logger.info(f"Response preview (first 300 chars):\n{content_str[:300]}...")
+            logger.info(f"Full response:\n{content_str}")
+            logger.info("="*80)
+            return content_str
+    
+    logger.warning("No valid content found in agent messages")
+    return "Sorry, I couldn't generate a response."
+
 
 def get_analytics_response(query: str) -> str:
     """
@@ -250,52 +436,55 @@ def get_analytics_response(query: str) -> str:
             {"messages": messages},
             config={"recursion_limit": 50}
         )
-        
-        logger.debug(f"Agent returned {len(result.get('messages', []))} messages")
-        
-        # Extract last message content
-        messages_list = result.get("messages", [])
-        if not messages_list:
-            logger.warning("No messages returned from agent")
-            return "Sorry, I couldn't process your request."
-        print("AQUI")
-        print(len(messages_list))
-        # Get last message with content
-        for msg in reversed(messages_list):
-            # Log reasoning/thinking if available (Gemini 2.5 Pro feature)
-            if hasattr(msg, 'thinking_content') and msg.thinking_content:
-                logger.info("="*80)
-                logger.info("MODEL REASONING (Thinking):")
-                logger.info(f"{msg.thinking_content}")
-                logger.info("="*80)
+        return _extract_response(result.get("messages", []))
             
-            content = getattr(msg, 'content', '')
-            
-            # Handle list content (multimodal models)
-            if isinstance(content, list):
-                # Extract text from list of content blocks
-                text_parts = []
-                for block in content:
-                    if isinstance(block, dict) and 'text' in block:
-                        text_parts.append(block['text'])
-                    elif isinstance(block, str):
-                        text_parts.append(block)
-                content = ' '.join(text_parts)
-            
-            # Convert to string and check if valid
-            content_str = str(content) if content else ''
-            if content_str and content_str != "None" and content_str.strip():
-                logger.info("="*80)
-                logger.info("AGENT RESPONSE: SUCCESS")
-                logger.info(f"Response length: {len(content_str)} characters, {len(content_str.split())} words")
-                # logger.info(f"Response preview (first 300 chars):\n{content_str[:300]}...")
-                logger.info(f"Full response:\n{content_str}")
-                logger.info("="*80)
-                return content_str
+    except Exception as e:
+        logger.error(f"AGENT RESPONSE: FAILED - {str(e)}", exc_info=True)
+        return f"Error processing your request: {str(e)}"
+
+
+async def aget_analytics_response(query: str) -> str:
+    """
+    Processes a user query without blocking the event loop.
+    
+    LLM round-trips are awaited and tool calls run in the bounded tool pool.
+    """
+    logger.info("="*80)
+    logger.info(f"USER INPUT: {query}")
+    logger.info("="*80)
+    
+    try:
+        messages = [
+            SystemMessage(content=final_prompt),
+            HumanMessage(content=query)
+        ]
         
-        logger.warning("No valid content found in agent messages")
-        return "Sorry, I couldn't generate a response."
+        logger.debug("Invoking agent (async)...")
+        result = await agent.ainvoke(
+            {"messages": messages},
+            config={"recursion_limit": 50}
+        )
+        return _extract_response(result.get("messages", []))
             
     except Exception as e:
         logger.error(f"AGENT RESPONSE: FAILED - {str(e)}", exc_info=True)
         return f"Error processing your request: {str(e)}"
+
+
+async def astream_analytics_response(query: str):
+    """
+    Streams the agent run for a user query as stage, token and done events.
+    
+    Events are dictionaries as described in agents.streaming; the final
+    answer is sent with the "done" event.
+    """
+    logger.info("="*80)
+    logger.info(f"USER INPUT (stream): {query}")
+    logger.info("="*80)
+    
+    messages = [
+        SystemMessage(content=final_prompt),
+        HumanMessage(content=query)
+    ]
+    async for event in stream_agent_events(agent, messages, _extract_response):
+        yield event
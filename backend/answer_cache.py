@@ -0,0 +1,310 @@
+"""Persistent cache of analytics answers.
+
+This module provides the AnswerCache class, which stores the answers of
+the agent pipeline keyed on a normalized form of the question plus the
+dataset version, so repeated questions ("total sales by category", "top 10
+customers") are answered without any LLM call. Answers are kept in a
+SQLite file with a time-to-live and least-recently-used eviction.
+
+Optionally, near-duplicate questions ("total de vendas por categoria?" vs
+"vendas totais por categoria") are matched with a character-trigram
+similarity index over the cached questions of the current dataset version.
+
+The cache can be warmed with the questions documented in QUERIES.md:
+
+    python answer_cache.py
+"""
+
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from text_utils import tokenize
+
+
+ANSWER_CACHE_PATH = os.environ.get(
+    "ANSWER_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), '../data/answer_cache.sqlite3')
+)
+
+QUERIES_PATH = os.path.join(os.path.dirname(__file__), 'QUERIES.md')
+
+# Answers that signal a failed run and must not be cached
+_FAILURE_PREFIXES = ("Erro", "Desculpe, não consegui")
+
+_QUESTION_RE = re.compile(r'^\*\*Pergunta:\*\*\s*"?(.+?)"?\s*$', re.MULTILINE)
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question for cache lookups.
+
+    Case, accents, punctuation and spacing are ignored.
+
+    Args:
+        question: The user's question.
+
+    Returns:
+        Normalized question.
+    """
+    return ' '.join(tokenize(question))
+
+
+def _trigrams(normalized: str) -> FrozenSet[str]:
+    """Character trigrams of a normalized question."""
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _numbers(normalized: str) -> FrozenSet[str]:
+    """Numbers in a normalized question ("top 10" must not match "top 5")."""
+    return frozenset(token for token in normalized.split() if token.isdigit())
+
+
+def load_warm_queries(path: str = QUERIES_PATH) -> List[str]:
+    """Read the questions documented in QUERIES.md.
+
+    Args:
+        path: Markdown file with ``**Pergunta:** "..."`` lines.
+
+    Returns:
+        The questions, in document order.
+    """
+    with open(path, encoding='utf-8') as f:
+        return _QUESTION_RE.findall(f.read())
+
+
+class AnswerCache:
+    """On-disk cache of pipeline answers with TTL and LRU eviction.
+
+    Attributes:
+        path: SQLite database file.
+        ttl: Seconds an answer stays valid.
+        max_entries: Maximum number of stored answers.
+        similarity_threshold: Minimum trigram similarity for a
+            near-duplicate match, or None to match exact questions only.
+        stats: Hit, near-duplicate hit and miss counters.
+        logger: Logger instance for the cache.
+    """
+
+    def __init__(
+        self,
+        path: str = ANSWER_CACHE_PATH,
+        ttl: float = 24 * 3600,
+        max_entries: int = 1000,
+        similarity_threshold: Optional[float] = None
+    ) -> None:
+        """Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file.
+            ttl: Seconds an answer stays valid.
+            max_entries: Maximum number of stored answers.
+            similarity_threshold: Minimum similarity (0-1) for near-duplicate
+                matches; None disables them.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0}
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        # Near-duplicate index for a single dataset version:
+        # (version, {key: (trigrams, numbers)})
+        self._index: Optional[Tuple[str, Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]]]] = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                question TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS answers_last_access ON answers (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(normalized: str, version: str) -> str:
+        """Cache key of a normalized question for a dataset version."""
+        return hashlib.sha1(f"{version}\0{normalized}".encode('utf-8')).hexdigest()
+
+    def get(self, question: str, version: str) -> Optional[str]:
+        """Look up the answer to a question.
+
+        Args:
+            question: The user's question.
+            version: Current dataset version.
+
+        Returns:
+            The cached answer, or None.
+        """
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+
+        with self._lock:
+            key = self.make_key(normalized, version)
+            answer = self._read(key)
+            if answer is not None:
+                self.stats["hits"] += 1
+                return answer
+
+            if self.similarity_threshold is not None:
+                near_key = self._nearest(normalized, version)
+                if near_key is not None:
+                    answer = self._read(near_key)
+                    if answer is not None:
+                        self.stats["near_hits"] += 1
+                        return answer
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, question: str, version: str, answer: str) -> None:
+        """Store the answer to a question.
+
+        Failed runs (error messages) are not stored.
+
+        Args:
+            question: The user's question.
+            version: Dataset version the answer was computed on.
+            answer: The pipeline's answer.
+        """
+        normalized = normalize_question(question)
+        if not normalized or not answer or answer.startswith(_FAILURE_PREFIXES):
+            return
+
+        now = time.time()
+        with self._lock:
+            key = self.make_key(normalized, version)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, version, question, normalized, answer, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+            if self._index is not None and self._index[0] == version:
+                self._index[1][key] = (_trigrams(normalized), _numbers(normalized))
+
+    def has(self, question: str, version: str) -> bool:
+        """Whether a fresh answer to exactly this question is stored.
+
+        Args:
+            question: The user's question.
+            version: Dataset version.
+
+        Returns:
+            True if ``get`` would return an exact hit.
+        """
+        key = self.make_key(normalize_question(question), version)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and row[0] >= time.time() - self.ttl
+
+    def clear(self) -> None:
+        """Delete every stored answer."""
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.commit()
+            self._index = None
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _read(self, key: str) -> Optional[str]:
+        """Read a fresh answer and mark it as recently used."""
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT answer, created_at FROM answers WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        answer, created_at = row
+        if created_at < now - self.ttl:
+            self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+            self._conn.commit()
+            if self._index is not None:
+                self._index[1].pop(key, None)
+            return None
+        self._conn.execute(
+            "UPDATE answers SET last_access = ? WHERE key = ?", (now, key)
+        )
+        self._conn.commit()
+        return answer
+
+    def _evict(self, now: float) -> None:
+        """Drop expired answers, then the least recently used above the limit."""
+        changes = self._conn.total_changes
+        self._conn.execute(
+            "DELETE FROM answers WHERE created_at < ?", (now - self.ttl,)
+        )
+        self._conn.execute(
+            """DELETE FROM answers WHERE key IN (
+                SELECT key FROM answers ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_entries,)
+        )
+        if self._conn.total_changes != changes:
+            # Rebuilt from the table on the next near-duplicate lookup
+            self._index = None
+
+    def _nearest(self, normalized: str, version: str) -> Optional[str]:
+        """Find the most similar cached question above the threshold.
+
+        Args:
+            normalized: Normalized question.
+            version: Current dataset version.
+
+        Returns:
+            Key of the best match, or None.
+        """
+        if self._index is None or self._index[0] != version:
+            self._index = (version, {
+                key: (_trigrams(cached), _numbers(cached))
+                for key, cached in self._conn.execute(
+                    "SELECT key, normalized FROM answers WHERE version = ?", (version,)
+                )
+            })
+
+        grams = _trigrams(normalized)
+        numbers = _numbers(normalized)
+        best_key, best_score = None, 0.0
+        for key, (cached_grams, cached_numbers) in self._index[1].items():
+            if cached_numbers != numbers:
+                continue
+            score = len(grams & cached_grams) / len(grams | cached_grams)
+            if score > best_score:
+                best_key, best_score = key, score
+
+        if best_score >= self.similarity_threshold:
+            self.logger.debug(f"Near-duplicate match (similarity {best_score:.2f})")
+            return best_key
+        return None
+
+
+if __name__ == "__main__":
+    from agent_pipeline import get_pipeline
+
+    pipeline = get_pipeline()
+    if pipeline is None:
+        raise SystemExit("GOOGLE_API_KEY not configured")
+    warmed = pipeline.warm_cache(load_warm_queries())
+    print(f"Warmed {warmed} answers")
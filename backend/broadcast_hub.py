@@ -0,0 +1,289 @@
+"""WebSocket fan-out with per-connection send queues.
+
+This module provides the BroadcastHub class. A broadcast serializes the
+message once and puts the text on a bounded queue per connection; each
+connection has its own writer task draining its queue. The caller never
+awaits a socket, so one slow client delays neither the other clients nor
+the HTTP response that triggered the broadcast.
+
+When a connection's queue is full, the slow-consumer policy applies:
+    drop_oldest: discard the oldest queued message to make room;
+    disconnect: close the connection.
+
+Dropped messages are not redelivered. Chat messages stay in the history
+and can be read with /api/chat/history from the last id a client has, but
+the frontend's useChat only does so when it mounts (on a page load) and
+does not reconnect a closed chat socket. The dashboard client reconnects
+and asks for a fresh snapshot.
+
+Configured through environment variables:
+    WS_QUEUE_SIZE: Messages queued per connection (default 64).
+    WS_SLOW_POLICY: ``drop_oldest`` (default) or ``disconnect``.
+    WS_SEND_TIMEOUT: Seconds a single send may take (default 10).
+"""
+
+import os
+import json
+import uuid
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket
+
+
+WS_QUEUE_SIZE = int(os.environ.get("WS_QUEUE_SIZE", "64"))
+WS_SLOW_POLICY = os.environ.get("WS_SLOW_POLICY", "drop_oldest")
+WS_SEND_TIMEOUT = float(os.environ.get("WS_SEND_TIMEOUT", "10"))
+
+SLOW_POLICIES = ("drop_oldest", "disconnect")
+
+
+class Connection:
+    """A WebSocket registered with a hub.
+
+    Attributes:
+        id: Opaque id clients use to refer to their own connection (e.g.
+            to keep it out of the broadcast of a reply they stream over HTTP).
+        websocket: The socket.
+        session_id: Session whose broadcasts the socket receives.
+        queue: Serialized messages waiting to be sent.
+        sent: Messages sent.
+        dropped: Messages discarded because the client was too slow.
+        task: Writer task draining the queue.
+    """
+
+    def __init__(self, websocket: WebSocket, session_id: Optional[str], queue_size: int) -> None:
+        self.id = uuid.uuid4().hex
+        self.websocket = websocket
+        self.session_id = session_id
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.sent = 0
+        self.dropped = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class BroadcastHub:
+    """Fan-out of messages to WebSocket connections.
+
+    Attributes:
+        name: Name used in log messages and metrics.
+        queue_size: Messages queued per connection.
+        policy: Slow-consumer policy (see SLOW_POLICIES).
+        send_timeout: Seconds a single send may take.
+        logger: Logger instance for the hub.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        queue_size: int = WS_QUEUE_SIZE,
+        policy: str = WS_SLOW_POLICY,
+        send_timeout: float = WS_SEND_TIMEOUT
+    ) -> None:
+        """Initialize a hub without connections.
+
+        Args:
+            name: Name used in log messages and metrics.
+            queue_size: Messages queued per connection.
+            policy: Slow-consumer policy (see SLOW_POLICIES).
+            send_timeout: Seconds a single send may take.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in SLOW_POLICIES:
+            raise ValueError(f"Unknown slow-consumer policy '{policy}' (expected one of {SLOW_POLICIES})")
+        self.name = name
+        self.queue_size = queue_size
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._connections: Dict[WebSocket, Connection] = {}
+        self._stats = {"broadcasts": 0, "sent": 0, "dropped": 0, "disconnected_slow": 0, "send_errors": 0}
+
+    def connect(self, websocket: WebSocket, session_id: Optional[str] = None) -> Connection:
+        """Register an accepted socket and start its writer task.
+
+        Args:
+            websocket: The accepted socket.
+            session_id: Session whose broadcasts it receives (None: all).
+
+        Returns:
+            The registered connection.
+        """
+        connection = Connection(websocket, session_id, self.queue_size)
+        connection.task = asyncio.create_task(self._writer(connection))
+        self._connections[websocket] = connection
+        self.logger.info(f"🔌 {self.name}: connection opened ({len(self._connections)} active)")
+        return connection
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        """Unregister a socket and stop its writer task."""
+        connection = self._connections.pop(websocket, None)
+        if connection is None:
+            return
+        self._record(connection)
+        if connection.task is not None and connection.task is not asyncio.current_task():
+            connection.task.cancel()
+        self.logger.info(f"🔌 {self.name}: connection closed ({len(self._connections)} active)")
+
+    def find(self, connection_id: Optional[str]) -> Optional[WebSocket]:
+        """Get the socket of a connection by its id.
+
+        Args:
+            connection_id: Id of a connection (see Connection.id), or None.
+
+        Returns:
+            The socket, or None if no open connection has that id.
+        """
+        if connection_id is None:
+            return None
+        for connection in self._connections.values():
+            if connection.id == connection_id:
+                return connection.websocket
+        return None
+
+    def send(self, websocket: WebSocket, payload: Any) -> bool:
+        """Queue a message for a single connection.
+
+        Messages queued this way keep their order relative to broadcasts.
+
+        Args:
+            websocket: A registered socket.
+            payload: JSON-serializable message.
+
+        Returns:
+            Whether the message was queued.
+        """
+        return self.send_text(websocket, json.dumps(payload, ensure_ascii=False))
+
+    def send_text(self, websocket: WebSocket, text: str) -> bool:
+        """Queue an already serialized (or plain text) message for one connection.
+
+        Args:
+            websocket: A registered socket.
+            text: Message sent as is.
+
+        Returns:
+            Whether the message was queued.
+        """
+        connection = self._connections.get(websocket)
+        if connection is None:
+            return False
+        return self._enqueue(connection, text)
+
+    def broadcast(
+        self,
+        payload: Any,
+        exclude: Optional[WebSocket] = None,
+        session_id: Optional[str] = None
+    ) -> int:
+        """Queue a message for every connection, without awaiting any socket.
+
+        Args:
+            payload: JSON-serializable message.
+            exclude: Socket that must not receive the message.
+            session_id: Only deliver to connections of this session (and to
+                connections not bound to a session); None delivers to all.
+
+        Returns:
+            Number of connections the message was queued for.
+        """
+        text = json.dumps(payload, ensure_ascii=False)
+        self._stats["broadcasts"] += 1
+        queued = 0
+        for connection in list(self._connections.values()):
+            if connection.websocket is exclude:
+                continue
+            if session_id is not None and connection.session_id not in (None, session_id):
+                continue
+            if self._enqueue(connection, text):
+                queued += 1
+        return queued
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the hub metrics.
+
+        Returns:
+            Dictionary with the totals and, per open connection, the queue
+            depth and the sent and dropped message counts.
+        """
+        stats = dict(self._stats)
+        connections = list(self._connections.values())
+        stats["sent"] += sum(c.sent for c in connections)
+        stats["dropped"] += sum(c.dropped for c in connections)
+        stats.update({
+            "name": self.name,
+            "policy": self.policy,
+            "queue_size": self.queue_size,
+            "active_connections": len(connections),
+            "connections": [
+                {
+                    "session_id": c.session_id,
+                    "queued": c.queue.qsize(),
+                    "sent": c.sent,
+                    "dropped": c.dropped,
+                }
+                for c in connections
+            ],
+        })
+        return stats
+
+    async def close(self) -> None:
+        """Stop every writer task and forget the connections."""
+        connections = list(self._connections.values())
+        for connection in connections:
+            self.disconnect(connection.websocket)
+        tasks = [c.task for c in connections if c.task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _enqueue(self, connection: Connection, text: str) -> bool:
+        """Queue a message, applying the slow-consumer policy when full."""
+        try:
+            connection.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == "disconnect":
+            self.logger.warning(f"🐢 {self.name}: disconnecting slow consumer")
+            self._stats["disconnected_slow"] += 1
+            self.disconnect(connection.websocket)
+            asyncio.create_task(self._close_socket(connection.websocket))
+            return False
+
+        connection.queue.get_nowait()
+        connection.dropped += 1
+        connection.queue.put_nowait(text)
+        return True
+
+    async def _writer(self, connection: Connection) -> None:
+        """Send queued messages of one connection until it goes away."""
+        try:
+            while True:
+                text = await connection.queue.get()
+                # asyncio.timeout, unlike wait_for, never swallows a cancellation
+                async with asyncio.timeout(self.send_timeout):
+                    await connection.websocket.send_text(text)
+                connection.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"⚠️ {self.name}: send failed, dropping connection: {str(e)}")
+            self._stats["send_errors"] += 1
+            self.disconnect(connection.websocket)
+
+    def _record(self, connection: Connection) -> None:
+        """Fold the counters of a closing connection into the totals."""
+        self._stats["sent"] += connection.sent
+        self._stats["dropped"] += connection.dropped
+        connection.sent = connection.dropped = 0
+
+    @staticmethod
+    async def _close_socket(websocket: WebSocket) -> None:
+        """Close a socket, ignoring errors from already closed ones."""
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
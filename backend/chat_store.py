@@ -0,0 +1,304 @@
+"""Persistent chat history.
+
+This module provides the ChatStore class, which keeps chat messages in a
+SQLite database (WAL mode, so history reads do not block writes),
+partitioned by session. Message ids are increasing integers that double as
+sync cursors: clients ask for the messages after the last id they have and
+only download what is new.
+
+Memory stays bounded in long-running processes: each session keeps at most
+CHAT_MAX_MESSAGES messages, messages older than CHAT_RETENTION_DAYS are
+purged, and only the most recent messages of a bounded number of sessions
+are cached in memory (ring buffers). Several worker processes may share the
+database, so a buffer is only served after checking the session's newest
+id in SQLite (its high-water mark); one that missed another process's
+messages is reloaded.
+
+Configured through environment variables:
+    CHAT_DB_PATH: SQLite database file (default ../data/chat_history.sqlite3).
+    CHAT_MAX_MESSAGES: Messages kept per session (default 1000).
+    CHAT_RETENTION_DAYS: Days a message is kept (default 30).
+    CHAT_RECENT_MESSAGES: Messages cached in memory per session (default 100).
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+CHAT_DB_PATH = os.environ.get(
+    "CHAT_DB_PATH",
+    os.path.join(os.path.dirname(__file__), '../data/chat_history.sqlite3')
+)
+CHAT_MAX_MESSAGES = int(os.environ.get("CHAT_MAX_MESSAGES", "1000"))
+CHAT_RETENTION_DAYS = float(os.environ.get("CHAT_RETENTION_DAYS", "30"))
+CHAT_RECENT_MESSAGES = int(os.environ.get("CHAT_RECENT_MESSAGES", "100"))
+
+DEFAULT_SESSION = "default"
+
+# Sessions whose recent messages are cached in memory
+_CACHED_SESSIONS = 64
+
+# Appends between two retention purges
+_PURGE_EVERY = 100
+
+
+class _RecentMessages:
+    """Ring buffer holding the newest messages of a session.
+
+    Attributes:
+        messages: The newest messages, oldest first.
+        floor: Id of the newest session message not in the buffer (0 if
+            the buffer holds the whole session).
+    """
+
+    def __init__(self, messages: List[Dict[str, Any]], floor: int, size: int) -> None:
+        self.messages: Deque[Dict[str, Any]] = deque(messages, maxlen=size)
+        self.floor = floor
+
+    @property
+    def newest(self) -> int:
+        """Id of the newest session message the buffer knows of."""
+        return int(self.messages[-1]["id"]) if self.messages else self.floor
+
+    def append(self, message: Dict[str, Any]) -> None:
+        """Add a message, moving the floor if the oldest one drops out."""
+        if len(self.messages) == self.messages.maxlen:
+            self.floor = int(self.messages[0]["id"])
+        self.messages.append(message)
+
+
+class ChatStore:
+    """SQLite-backed chat history with per-session retention.
+
+    Attributes:
+        path: SQLite database file.
+        max_messages: Messages kept per session.
+        retention: Seconds a message is kept.
+        recent_size: Messages cached in memory per session.
+        logger: Logger instance for the store.
+    """
+
+    def __init__(
+        self,
+        path: str = CHAT_DB_PATH,
+        max_messages: int = CHAT_MAX_MESSAGES,
+        retention_days: float = CHAT_RETENTION_DAYS,
+        recent_size: int = CHAT_RECENT_MESSAGES
+    ) -> None:
+        """Open (or create) the history database.
+
+        Args:
+            path: SQLite database file.
+            max_messages: Messages kept per session.
+            retention_days: Days a message is kept.
+            recent_size: Messages cached in memory per session.
+        """
+        self.path = path
+        self.max_messages = max_messages
+        self.retention = retention_days * 24 * 3600
+        # The buffer must not outlive the per-session limit
+        self.recent_size = min(recent_size, max_messages)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._recent: "OrderedDict[str, _RecentMessages]" = OrderedDict()
+        self._appends = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS messages_session ON messages (session, id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS messages_created_at ON messages (created_at)"
+        )
+        self._conn.commit()
+        self.purge()
+
+    def append(self, role: str, content: str, session: str = DEFAULT_SESSION) -> Dict[str, Any]:
+        """Store a message.
+
+        Args:
+            role: ``user`` or ``agent``.
+            content: Message text.
+            session: Session the message belongs to.
+
+        Returns:
+            The stored message (id, role, content, timestamp).
+        """
+        now = time.time()
+        timestamp = datetime.fromtimestamp(now).isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO messages (session, role, content, timestamp, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (session, role, content, timestamp, now)
+            )
+            message = {
+                "id": str(cursor.lastrowid),
+                "role": role,
+                "content": content,
+                "timestamp": timestamp,
+            }
+            # Drop the oldest messages of the session beyond the limit
+            self._conn.execute(
+                "DELETE FROM messages WHERE session = ? AND id <= ("
+                "SELECT id FROM messages WHERE session = ? "
+                "ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (session, session, self.max_messages)
+            )
+            self._conn.commit()
+
+            recent = self._recent.get(session)
+            if recent is not None:
+                if self._newest_id(session, before=cursor.lastrowid) == recent.newest:
+                    recent.append(message)
+                    self._recent.move_to_end(session)
+                else:
+                    # Another process wrote to the session; reload on demand
+                    del self._recent[session]
+
+            self._appends += 1
+            purge = self._appends % _PURGE_EVERY == 0
+
+        if purge:
+            self.purge()
+        return message
+
+    def history(
+        self,
+        session: str = DEFAULT_SESSION,
+        since: int = 0,
+        limit: int = 500
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Get the messages of a session after a cursor, oldest first.
+
+        Args:
+            session: Session to read.
+            since: Id of the last message the client has (0 for all).
+            limit: Maximum number of messages returned.
+
+        Returns:
+            Tuple of (messages, whether more messages follow them).
+        """
+        with self._lock:
+            recent = self._recent_messages(session)
+            if since >= recent.floor:
+                newer = [m for m in recent.messages if int(m["id"]) > since]
+            else:
+                rows = self._conn.execute(
+                    "SELECT id, role, content, timestamp FROM messages "
+                    "WHERE session = ? AND id > ? ORDER BY id LIMIT ?",
+                    (session, since, limit + 1)
+                ).fetchall()
+                newer = [self._to_message(row) for row in rows]
+        return newer[:limit], len(newer) > limit
+
+    def purge(self) -> int:
+        """Delete messages older than the retention period.
+
+        Returns:
+            Number of deleted messages.
+        """
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM messages WHERE created_at < ?",
+                (time.time() - self.retention,)
+            ).rowcount
+            self._conn.commit()
+            if deleted:
+                # Cached buffers may hold purged messages; reload on demand
+                self._recent.clear()
+                self.logger.info(f"🧹 Purged {deleted} expired chat messages")
+        return deleted
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _newest_id(self, session: str, before: Optional[int] = None) -> int:
+        """Highest message id of a session in the database (0 if empty).
+
+        Args:
+            session: Session to check.
+            before: Only consider ids below this one.
+        """
+        if before is None:
+            row = self._conn.execute(
+                "SELECT MAX(id) FROM messages WHERE session = ?", (session,)
+            ).fetchone()
+        else:
+            row = self._conn.execute(
+                "SELECT MAX(id) FROM messages WHERE session = ? AND id < ?",
+                (session, before)
+            ).fetchone()
+        return row[0] or 0
+
+    def _recent_messages(self, session: str) -> _RecentMessages:
+        """Get the ring buffer of a session, loading it on first use.
+
+        A cached buffer is reloaded when the database has newer messages
+        of the session, written by another process.
+        """
+        recent = self._recent.get(session)
+        if recent is not None and self._newest_id(session) == recent.newest:
+            self._recent.move_to_end(session)
+            return recent
+
+        rows = self._conn.execute(
+            "SELECT id, role, content, timestamp FROM messages "
+            "WHERE session = ? ORDER BY id DESC LIMIT ?",
+            (session, self.recent_size + 1)
+        ).fetchall()
+        floor = 0
+        if len(rows) > self.recent_size:
+            floor = rows.pop()[0]
+        messages = [self._to_message(row) for row in reversed(rows)]
+
+        recent = _RecentMessages(messages, floor, self.recent_size)
+        self._recent[session] = recent
+        while len(self._recent) > _CACHED_SESSIONS:
+            self._recent.popitem(last=False)
+        return recent
+
+    @staticmethod
+    def _to_message(row: Tuple) -> Dict[str, Any]:
+        """Convert a database row to a message."""
+        return {"id": str(row[0]), "role": row[1], "content": row[2], "timestamp": row[3]}
+
+
+_chat_store: Optional[ChatStore] = None
+_chat_store_lock = threading.Lock()
+
+
+def get_chat_store() -> ChatStore:
+    """Get the process-wide chat store.
+
+    Returns:
+        The shared ChatStore, opened on first use.
+    """
+    global _chat_store
+    if _chat_store is None:
+        with _chat_store_lock:
+            if _chat_store is None:
+                _chat_store = ChatStore()
+    return _chat_store
@@ -0,0 +1,244 @@
+"""Memoized execution of generated analysis code.
+
+This module provides the ExecutionCache class, which remembers the
+``result`` of code run by the analysis tools. Entries are keyed on a hash
+of the code's normalized AST (so whitespace, comments and quoting style do
+not matter) plus the dataset version, so the same aggregation is computed
+once per dataset version, whichever ReAct run or user asks for it.
+
+The cache is bounded by an estimated memory budget and evicts the least
+recently used results first. Code that depends on randomness or the
+current time is never cached. Every caller receives its own copy of a
+result, so changing it in place cannot alter later cache hits.
+
+The budget is configured with CODE_CACHE_MAX_BYTES (default 64 MiB).
+"""
+
+import os
+import ast
+import sys
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+CODE_CACHE_MAX_BYTES = int(os.environ.get("CODE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Names whose use makes a result non-deterministic
+NON_DETERMINISTIC_NAMES = {
+    'random', 'rand', 'randn', 'randint', 'shuffle', 'sample', 'choice',
+    'now', 'today', 'time', 'uuid', 'uuid4', 'input',
+}
+
+# Returned by executors when the code did not assign ``result``
+NO_RESULT = object()
+
+
+def code_fingerprint(code: str) -> Optional[str]:
+    """Hash the normalized AST of a code snippet.
+
+    Args:
+        code: Python source.
+
+    Returns:
+        Hex digest, or None if the code does not parse or is
+        non-deterministic (and so must not be cached).
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in NON_DETERMINISTIC_NAMES:
+            return None
+        if isinstance(node, ast.Attribute) and node.attr in NON_DETERMINISTIC_NAMES:
+            return None
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            modules = [alias.name for alias in node.names]
+            if isinstance(node, ast.ImportFrom) and node.module:
+                modules.append(node.module)
+            if any(m.split('.')[0] in NON_DETERMINISTIC_NAMES for m in modules):
+                return None
+
+    normalized = ast.dump(tree, annotate_fields=False, include_attributes=False)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory held by a result, in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+def copy_result(value: Any) -> Any:
+    """Copy a result so a caller cannot modify the cached value.
+
+    pandas and numpy objects are copied with their own ``copy``; other
+    mutable values (lists, dicts, ...) are deep-copied. Immutable scalars
+    and strings are returned as is.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index, np.ndarray)):
+        return value.copy()
+    if value is None or value is NO_RESULT or isinstance(value, (str, bytes, int, float, complex, bool)):
+        return value
+    return copy.deepcopy(value)
+
+
+class ExecutionCache:
+    """LRU cache of code execution results under a memory budget.
+
+    Concurrent runs of the same code on the same dataset version are
+    collapsed into a single execution. Exceptions are never cached.
+
+    Attributes:
+        max_bytes: Memory budget for cached results.
+        logger: Logger instance for the cache.
+    """
+
+    def __init__(self, max_bytes: int = CODE_CACHE_MAX_BYTES) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_bytes: Memory budget for cached results.
+        """
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._inflight: Dict[Tuple, Future] = {}
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "uncacheable": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        code: str,
+        version: Optional[str],
+        execute: Callable[[], Any],
+        scope: Hashable = None,
+        discard: Optional[Callable[[], bool]] = None
+    ) -> Any:
+        """Return the cached result of ``code`` or execute it.
+
+        Args:
+            code: Code whose result is requested.
+            version: Dataset version the code runs on; None disables caching.
+            execute: Runs the code and returns its ``result`` (or NO_RESULT).
+            scope: Distinguishes callers with different execution namespaces.
+            discard: Checked after executing; when it returns True the
+                result still goes to waiting callers but is not cached.
+
+        Returns:
+            The result, as a copy the caller may modify.
+        """
+        fingerprint = code_fingerprint(code) if version is not None else None
+        if fingerprint is None:
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return execute()
+
+        key = (scope, version, fingerprint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self.logger.debug(f"Execution cache hit {fingerprint[:12]}")
+            else:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    self._stats["misses"] += 1
+                    future = Future()
+                    self._inflight[key] = future
+                else:
+                    self._stats["hits"] += 1
+
+        # Copied outside the lock: callers get their own, mutable result
+        if entry is not None:
+            return copy_result(entry[0])
+        if not leader:
+            return copy_result(future.result())
+
+        try:
+            value = execute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            if discard is None or not discard():
+                self._store(key, value)
+            return copy_result(value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the cache metrics.
+
+        Returns:
+            Dictionary with hits, misses, uncacheable runs, evictions, the
+            hit rate, the number of entries and the bytes in use.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _store(self, key: Tuple, value: Any) -> None:
+        """Insert a result, evicting least recently used ones over budget."""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            self.logger.debug(f"Result of {size} bytes exceeds the cache budget")
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+
+_execution_cache: Optional[ExecutionCache] = None
+_execution_cache_lock = threading.Lock()
+
+
+def get_execution_cache() -> ExecutionCache:
+    """Get the process-wide execution cache.
+
+    Returns:
+        The shared ExecutionCache, created on first use.
+    """
+    global _execution_cache
+    if _execution_cache is None:
+        with _execution_cache_lock:
+            if _execution_cache is None:
+                _execution_cache = ExecutionCache()
+    return _execution_cache
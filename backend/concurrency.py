@@ -0,0 +1,196 @@
+"""Concurrency limits for agent execution.
+
+This module provides the shared primitives that keep chat requests off the
+event loop: a semaphore bounding how many agent runs are in flight, and
+dedicated, bounded thread pools for CPU-bound tool work (pandas code
+execution, metadata rendering, code robustness checks) and for the
+speculative analytics runs of synchronous queries. It also carries the
+cancellation event of a speculative run into the tool calls it makes, so
+tools can tell that their caller was cancelled (see run_cancelled).
+
+Limits are configured through environment variables:
+    CHAT_MAX_CONCURRENCY: Maximum concurrent agent runs (default 8).
+    TOOL_MAX_WORKERS: Threads available for tool execution (default 4).
+"""
+
+import os
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from langchain_core.tools import StructuredTool
+
+
+CHAT_MAX_CONCURRENCY = int(os.environ.get("CHAT_MAX_CONCURRENCY", "8"))
+TOOL_MAX_WORKERS = int(os.environ.get("TOOL_MAX_WORKERS", "4"))
+
+# Robustness checks of generated code run one per edge case
+CHECK_MAX_WORKERS = 3
+
+_tool_executor: Optional[ThreadPoolExecutor] = None
+_check_executor: Optional[ThreadPoolExecutor] = None
+_speculative_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_chat_semaphore: Optional[asyncio.Semaphore] = None
+
+# Cancellation event of the agent run the current code belongs to
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "cancel_event", default=None
+)
+
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    """Get the bounded thread pool used for tool execution.
+
+    Returns:
+        The shared ThreadPoolExecutor, created on first use.
+    """
+    global _tool_executor
+    if _tool_executor is None:
+        with _executor_lock:
+            if _tool_executor is None:
+                _tool_executor = ThreadPoolExecutor(
+                    max_workers=TOOL_MAX_WORKERS,
+                    thread_name_prefix="tool-worker"
+                )
+    return _tool_executor
+
+
+def get_check_executor() -> ThreadPoolExecutor:
+    """Get the thread pool running code robustness checks concurrently.
+    
+    Checks are submitted from tool threads, so they use their own pool
+    instead of waiting for a free tool worker.
+    
+    Returns:
+        The shared ThreadPoolExecutor, created on first use.
+    """
+    global _check_executor
+    if _check_executor is None:
+        with _executor_lock:
+            if _check_executor is None:
+                _check_executor = ThreadPoolExecutor(
+                    max_workers=CHECK_MAX_WORKERS,
+                    thread_name_prefix="check-worker"
+                )
+    return _check_executor
+
+
+def get_speculative_executor() -> ThreadPoolExecutor:
+    """Get the thread pool running speculative analytics of sync queries.
+    
+    Shared by every AgentPipeline, so replacing a pipeline does not leave
+    a pool of idle threads behind.
+    
+    Returns:
+        The shared ThreadPoolExecutor, created on first use.
+    """
+    global _speculative_executor
+    if _speculative_executor is None:
+        with _executor_lock:
+            if _speculative_executor is None:
+                _speculative_executor = ThreadPoolExecutor(
+                    max_workers=CHAT_MAX_CONCURRENCY,
+                    thread_name_prefix="speculative-analytics"
+                )
+    return _speculative_executor
+
+
+def shutdown_tool_executor() -> None:
+    """Shut down the tool thread pools, waiting for running tools."""
+    global _tool_executor, _check_executor, _speculative_executor
+    with _executor_lock:
+        if _tool_executor is not None:
+            _tool_executor.shutdown(wait=True)
+            _tool_executor = None
+        if _check_executor is not None:
+            _check_executor.shutdown(wait=True)
+            _check_executor = None
+        if _speculative_executor is not None:
+            _speculative_executor.shutdown(wait=True)
+            _speculative_executor = None
+
+
+def get_chat_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore bounding concurrent agent runs.
+
+    Returns:
+        The shared asyncio.Semaphore, created on first use.
+    """
+    global _chat_semaphore
+    if _chat_semaphore is None:
+        _chat_semaphore = asyncio.Semaphore(CHAT_MAX_CONCURRENCY)
+    return _chat_semaphore
+
+
+async def run_in_tool_executor(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking function in the tool thread pool.
+
+    Args:
+        func: Blocking callable.
+        *args: Positional arguments for ``func``.
+        **kwargs: Keyword arguments for ``func``.
+
+    Returns:
+        The function's return value.
+    """
+    loop = asyncio.get_running_loop()
+    # Run in a copy of the caller's context so run_cancelled() works there
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_tool_executor(), context.run, functools.partial(func, *args, **kwargs)
+    )
+
+
+def bind_cancel_event(event: threading.Event) -> None:
+    """Tie the current context to the cancellation event of an agent run.
+    
+    Call it at the start of the task (or inside the copied context) that
+    runs the agent; tool calls made from there inherit the binding.
+    
+    Args:
+        event: Event that is set once the run is cancelled.
+    """
+    _cancel_event.set(event)
+
+
+def run_cancelled() -> bool:
+    """Whether the agent run the current code belongs to was cancelled.
+    
+    Tool calls already running when a run is cancelled are not
+    interrupted; they check this to drop their results instead of
+    recording or caching them.
+    
+    Returns:
+        True once the bound cancellation event is set.
+    """
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+def offload_tool(sync_tool: StructuredTool) -> StructuredTool:
+    """Give a synchronous tool an async path that uses the tool pool.
+
+    LangGraph calls ``ainvoke`` on tools when the agent runs asynchronously;
+    without a coroutine LangChain would fall back to the loop's default
+    executor, which is shared with everything else.
+
+    Args:
+        sync_tool: Tool created with the ``@tool`` decorator.
+
+    Returns:
+        Equivalent tool whose coroutine runs the function in the tool pool.
+    """
+    async def coroutine(**kwargs):
+        return await run_in_tool_executor(sync_tool.func, **kwargs)
+
+    return StructuredTool(
+        name=sync_tool.name,
+        description=sync_tool.description,
+        args_schema=sync_tool.args_schema,
+        func=sync_tool.func,
+        coroutine=coroutine,
+    )
@@ -0,0 +1,172 @@
+"""Push-based dashboard updates.
+
+This module provides the DashboardFeed class, which publishes the cached
+dashboard data to WebSocket subscribers. A client receives the current
+snapshot once when it subscribes; afterwards, each time the dashboard cache
+is rebuilt for a new dataset version, subscribers get only the sections
+that changed. Server work therefore follows dataset changes, not the
+number of open dashboards.
+
+Messages sent to subscribers:
+    {"type": "snapshot", "version": v, "data": {...}}
+    {"type": "diff", "base": v0, "version": v1, "changes": {...}}
+
+``changes`` maps each changed section to ``{"order": keys, "upsert":
+items}``: the keys of the section items in their new order and the items
+that are new or modified. Items are keyed per section (SECTION_KEYS). A
+client applies a diff only on top of the ``base`` version it holds, and
+asks for a new snapshot (``{"type": "resync"}``) otherwise.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from broadcast_hub import BroadcastHub
+from versioned_cache import VersionedCache
+
+
+# Field identifying the items of each dashboard section
+SECTION_KEYS = {"metrics": "id", "chartData": "name", "recentActivity": "id"}
+
+
+def as_dict(data: Any) -> Dict[str, Any]:
+    """Convert dashboard data (pydantic model or dict) to a plain dict."""
+    return data.model_dump() if hasattr(data, "model_dump") else dict(data)
+
+
+def diff_dashboard(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute the changed sections between two dashboard payloads.
+
+    Args:
+        old: Dashboard data the client has.
+        new: Current dashboard data.
+
+    Returns:
+        Mapping of changed sections to their new item order and the new or
+        modified items; empty when nothing changed.
+    """
+    changes = {}
+    for section, key in SECTION_KEYS.items():
+        old_items = {item[key]: item for item in old.get(section, [])}
+        new_items = new.get(section, [])
+        order = [item[key] for item in new_items]
+        upsert = [item for item in new_items if old_items.get(item[key]) != item]
+        if upsert or order != list(old_items):
+            changes[section] = {"order": order, "upsert": upsert}
+    return changes
+
+
+def apply_diff(data: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the changes computed by diff_dashboard.
+
+    Args:
+        data: Dashboard data the diff is based on.
+        changes: Changed sections.
+
+    Returns:
+        New dashboard data; the input is not modified.
+    """
+    result = dict(data)
+    for section, change in changes.items():
+        key = SECTION_KEYS[section]
+        items = {item[key]: item for item in data.get(section, [])}
+        items.update((item[key], item) for item in change["upsert"])
+        result[section] = [items[k] for k in change["order"]]
+    return result
+
+
+class DashboardFeed:
+    """Publishes dashboard snapshots and diffs through a BroadcastHub.
+
+    Attributes:
+        hub: Hub holding the subscribed sockets.
+        cache: Dashboard cache whose rebuilds are published.
+        fallback: Function giving the data served when the cache is empty.
+        logger: Logger instance for the feed.
+    """
+
+    def __init__(
+        self,
+        hub: BroadcastHub,
+        cache: VersionedCache,
+        fallback: Optional[Callable[[], Any]] = None
+    ) -> None:
+        """Subscribe to the dashboard cache.
+
+        Args:
+            hub: Hub holding the subscribed sockets.
+            cache: Dashboard cache whose rebuilds are published.
+            fallback: Function giving the data served when the cache is empty.
+        """
+        self.hub = hub
+        self.cache = cache
+        self.fallback = fallback
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._published: Optional[Tuple[str, Dict[str, Any]]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        cache.subscribe(self._on_update)
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Set the event loop the hub runs on (None stops publishing)."""
+        self._loop = loop
+
+    def warm(self) -> None:
+        """Make sure a snapshot is available (blocks on the first build)."""
+        if self._published is None:
+            value = self.cache.get()
+            # The first build already published itself through the listener
+            if self._published is None:
+                self._on_update(self.cache.version, value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the snapshot message for a new subscriber.
+
+        Returns:
+            Snapshot of the last published version, or of the fallback data
+            (with a None version) when nothing was published yet.
+        """
+        published = self._published
+        if published is None:
+            data = as_dict(self.fallback()) if self.fallback else {}
+            return {"type": "snapshot", "version": None, "data": data}
+        return {"type": "snapshot", "version": published[0], "data": published[1]}
+
+    def subscribe(self, websocket: Any) -> None:
+        """Register an accepted socket and queue its snapshot.
+
+        Must run on the hub's event loop; diffs published later are queued
+        after the snapshot.
+        """
+        self.hub.connect(websocket)
+        self.hub.send(websocket, self.snapshot())
+
+    def _on_update(self, version: Optional[str], value: Any) -> None:
+        """Publish the diff to a rebuilt dashboard (runs on the rebuild thread)."""
+        data = as_dict(value)
+        with self._lock:
+            published = self._published
+            if published is None:
+                self._published = (version, data)
+                return
+            base, old = published
+            if version == base:
+                return
+            changes = diff_dashboard(old, data)
+            if not changes:
+                # Same data: clients keep the version they have
+                return
+            self._published = (version, data)
+
+        self.logger.info(f"📡 Dashboard changed ({', '.join(changes)}), pushing diff")
+        message = {"type": "diff", "base": base, "version": version, "changes": changes}
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self.hub.broadcast, message)
+        except RuntimeError:
+            # The loop is closed (shutting down)
+            pass
@@ -0,0 +1,227 @@
+"""Precomputed dataset profile for the agents' metadata tool.
+
+This module provides build_profile, which summarizes every column of the
+dataset (dtype, nulls, cardinality, numeric quantiles, date ranges, top
+values and the catalog description), format_profile, which renders it as
+one compact line per column, and the ProfileCache class, which computes
+the profile once per dataset version.
+
+The profile replaces the markdown head/dtypes dump the metadata tool used
+to rebuild on every call: it is cheaper to serve and carries more useful
+information per prompt token.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+
+# Most frequent values listed per text/categorical column
+TOP_VALUES = 5
+
+# Text columns with more distinct values than this share of rows (and than
+# TOP_VALUES) are treated as identifiers and only get examples, not frequencies
+IDENTIFIER_RATIO = 0.5
+
+# Longest value rendered before truncation
+MAX_VALUE_CHARS = 40
+
+
+def build_profile(df: pd.DataFrame, catalog: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Summarize a DataFrame column by column.
+
+    Args:
+        df: The DataFrame to profile.
+        catalog: Column catalog (``data/catalog.json``) with descriptions.
+
+    Returns:
+        Dictionary with ``rows`` and ``columns``, a mapping of column name
+        to its statistics.
+    """
+    catalog = catalog or {}
+    rows = len(df)
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        non_null = series.dropna()
+        stats: Dict[str, Any] = {
+            "dtype": str(series.dtype),
+            "nulls": int(rows - len(non_null)),
+            "distinct": int(non_null.nunique()),
+        }
+
+        if non_null.empty:
+            pass
+        elif pd.api.types.is_bool_dtype(series):
+            stats["top"] = _top_values(non_null)
+        elif pd.api.types.is_numeric_dtype(series):
+            quantiles = non_null.quantile([0.25, 0.5, 0.75]).tolist()
+            stats.update({
+                "min": non_null.min(),
+                "p25": quantiles[0],
+                "p50": quantiles[1],
+                "p75": quantiles[2],
+                "max": non_null.max(),
+                "mean": non_null.mean(),
+            })
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            stats["min"] = non_null.min()
+            stats["max"] = non_null.max()
+        elif stats["distinct"] > max(TOP_VALUES, rows * IDENTIFIER_RATIO):
+            stats["examples"] = [str(value) for value in non_null.unique()[:3]]
+        else:
+            stats["top"] = _top_values(non_null)
+
+        description = catalog.get(str(name), {}).get("short description")
+        if description:
+            stats["description"] = description
+        columns[str(name)] = stats
+
+    return {"rows": rows, "columns": columns}
+
+
+def format_profile(profile: Dict[str, Any], columns: Optional[Iterable[str]] = None) -> str:
+    """Render a profile as one compact line per column.
+
+    Args:
+        profile: Result of build_profile.
+        columns: Columns to include; all of them when omitted.
+
+    Returns:
+        The rendered profile. Unknown requested columns are reported
+        together with the available ones.
+    """
+    available = profile["columns"]
+    selected = list(available) if not columns else list(columns)
+    unknown = [name for name in selected if name not in available]
+
+    lines = [f"{profile['rows']} rows x {len(available)} columns"]
+    for name in selected:
+        if name in available:
+            lines.append(_format_column(name, available[name]))
+    if unknown:
+        lines.append(
+            f"Unknown columns: {', '.join(unknown)}. "
+            f"Available columns: {', '.join(available)}"
+        )
+    return "\n".join(lines)
+
+
+def _top_values(series: pd.Series) -> List[List[Any]]:
+    """Most frequent values of a series with their counts."""
+    counts = series.value_counts().head(TOP_VALUES)
+    return [[str(value), int(count)] for value, count in counts.items()]
+
+
+def _format_column(name: str, stats: Dict[str, Any]) -> str:
+    """Render the statistics of one column."""
+    parts = [name, stats["dtype"]]
+    if stats["nulls"]:
+        parts.append(f"nulls={stats['nulls']}")
+    parts.append(f"distinct={stats['distinct']}")
+
+    if "p50" in stats:
+        parts.append(" ".join(
+            f"{key}={_format_number(stats[key])}"
+            for key in ("min", "p25", "p50", "p75", "max", "mean")
+        ))
+    elif "min" in stats:
+        parts.append(f"range={stats['min']:%Y-%m-%d}..{stats['max']:%Y-%m-%d}")
+    elif "top" in stats:
+        parts.append("top=" + ", ".join(
+            f"{_truncate(value)} ({count})" for value, count in stats["top"]
+        ))
+    elif "examples" in stats:
+        parts.append("e.g. " + ", ".join(_truncate(value) for value in stats["examples"]))
+
+    if "description" in stats:
+        parts.append(stats["description"])
+    return " | ".join(parts)
+
+
+def _format_number(value: Any) -> str:
+    """Render a number with 4 significant digits (2 decimals if large)."""
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return f"{value:.4g}" if abs(value) < 1e4 else f"{value:.2f}"
+
+
+def _truncate(value: str) -> str:
+    """Shorten long values."""
+    if len(value) <= MAX_VALUE_CHARS:
+        return value
+    return value[:MAX_VALUE_CHARS - 3] + "..."
+
+
+class ProfileCache:
+    """Dataset profiles keyed by dataset version.
+
+    Attributes:
+        max_versions: Number of dataset versions kept.
+        logger: Logger instance for the cache.
+    """
+
+    def __init__(self, max_versions: int = 4) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_versions: Number of dataset versions kept.
+        """
+        self.max_versions = max_versions
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        df: pd.DataFrame,
+        version: Optional[str],
+        catalog: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get the profile of ``df``, building it once per version.
+
+        Args:
+            df: The dataset.
+            version: Dataset version of ``df``; None disables caching.
+            catalog: Column catalog with descriptions.
+
+        Returns:
+            The profile (see build_profile).
+        """
+        if version is None:
+            return build_profile(df, catalog)
+
+        # Profiles are cheap; holding the lock keeps one build per version
+        with self._lock:
+            profile = self._profiles.get(version)
+            if profile is None:
+                self.logger.info(f"📊 Building dataset profile for version {version}")
+                profile = build_profile(df, catalog)
+                self._profiles[version] = profile
+                while len(self._profiles) > self.max_versions:
+                    self._profiles.popitem(last=False)
+            else:
+                self._profiles.move_to_end(version)
+            return profile
+
+
+_profile_cache: Optional[ProfileCache] = None
+_profile_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> ProfileCache:
+    """Get the process-wide profile cache.
+
+    Returns:
+        The shared ProfileCache, created on first use.
+    """
+    global _profile_cache
+    if _profile_cache is None:
+        with _profile_cache_lock:
+            if _profile_cache is None:
+                _profile_cache = ProfileCache()
+    return _profile_cache
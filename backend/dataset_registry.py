@@ -0,0 +1,264 @@
+"""Process-wide dataset registry.
+
+This module provides the DatasetRegistry class which loads and prepares
+the sales dataset once per process and hands out read-only references to
+every consumer (API endpoints, DataTools, AgentPipeline).
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Copy-on-write makes the shallow copies handed out by the registry safe to
+# modify without touching the shared frame (always enabled from pandas 3.0).
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+DATA_PATH = os.environ.get(
+    "DATA_PATH", os.path.normpath(os.path.join(DATA_DIR, 'train.csv'))
+)
+
+# Columns parsed as dates (the CSV uses DD/MM/YYYY)
+DATE_COLUMNS = ['Order Date', 'Ship Date']
+
+# Low-cardinality dimensions stored as pandas categoricals
+CATEGORICAL_COLUMNS = [
+    'Ship Mode', 'Segment', 'Country', 'Region', 'Category', 'Sub-Category'
+]
+
+
+def prepare_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse dates and fix dtypes of a freshly read dataset.
+
+    Args:
+        df: DataFrame as returned by ``pd.read_csv``.
+
+    Returns:
+        The same DataFrame with typed columns.
+    """
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], dayfirst=True, errors='coerce')
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if 'Postal Code' in df.columns:
+        df['Postal Code'] = df['Postal Code'].astype('Int64')
+    return df
+
+
+def file_signature(path: str) -> str:
+    """Compute a cheap signature of a file from its size and mtime.
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        Short hex digest identifying the current file contents.
+    """
+    stat = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+
+class DatasetRegistry:
+    """Loads the dataset once and shares it across the process.
+
+    The registry keeps a single prepared DataFrame in memory and hands out
+    copy-on-write views of it, so consumers never modify the shared frame.
+    Each load is tagged with a version id derived from the source file
+    contents; consumers use it as a cache key. When pyarrow is installed the
+    data is read from a memory-mapped columnar snapshot (see
+    ``dataset_snapshot``) instead of the CSV.
+
+    Attributes:
+        data_path: Path to the source CSV file.
+        logger: Logger instance for the registry.
+    """
+
+    EMPTY_VERSION = "empty"
+
+    def __init__(self, data_path: str = DATA_PATH) -> None:
+        """Initialize the registry without loading any data.
+
+        Args:
+            data_path: Path to the source CSV file.
+        """
+        self.data_path = data_path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._df: Optional[pd.DataFrame] = None
+        self._version: Optional[str] = None
+        self._signature: Optional[str] = None
+        self._catalog: Dict[str, Any] = {}
+        self._row_index = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        """Version id of the currently loaded dataset."""
+        self._ensure_loaded()
+        return self._version
+
+    @property
+    def catalog(self) -> Dict[str, Any]:
+        """Column catalog (descriptions, samples) from data/catalog.json."""
+        self._ensure_loaded()
+        return self._catalog
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the dataset has been loaded."""
+        return self._df is not None
+
+    def load(self) -> str:
+        """Load (or reload) the dataset from disk.
+
+        Returns:
+            Version id of the loaded dataset.
+        """
+        with self._lock:
+            return self._load_locked()
+
+    def refresh(self) -> bool:
+        """Reload the dataset if the source file changed on disk.
+
+        Returns:
+            True if a new version was loaded.
+        """
+        with self._lock:
+            if self._df is not None and self._current_signature() == self._signature:
+                return False
+            previous = self._version
+            self._load_locked()
+            return self._version != previous
+
+    def get_dataframe(self) -> pd.DataFrame:
+        """Get a read-only reference to the prepared dataset.
+
+        Returns:
+            Copy-on-write view of the shared DataFrame.
+        """
+        self._ensure_loaded()
+        return self._df.copy(deep=False)
+
+    def get_versioned(self) -> Tuple[str, pd.DataFrame]:
+        """Get the dataset together with its version id.
+
+        Returns:
+            Tuple of (version, copy-on-write view of the DataFrame), taken
+            atomically with respect to reloads.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._version, self._df.copy(deep=False)
+
+    def read_rows(
+        self,
+        skip: int,
+        limit: int,
+        columns: Optional[List[str]] = None
+    ) -> Tuple[pd.DataFrame, int]:
+        """Read a page of rows by position.
+
+        Pages are served from the snapshot's row index when available, so
+        the cost does not depend on ``skip``.
+
+        Args:
+            skip: Position of the first row.
+            limit: Maximum number of rows.
+            columns: Columns to read (None for all).
+
+        Returns:
+            Tuple of (DataFrame with the page, total number of rows).
+
+        Raises:
+            KeyError: If a requested column does not exist.
+        """
+        self._ensure_loaded()
+        row_index, df = self._row_index, self._df
+        if columns is not None:
+            unknown = [c for c in columns if c not in df.columns]
+            if unknown:
+                raise KeyError(f"Unknown columns: {', '.join(unknown)}")
+        if row_index is not None:
+            return row_index.read(skip, limit, columns), row_index.num_rows
+        skip = max(skip, 0)
+        page = df.iloc[skip:skip + max(limit, 0)]
+        return (page[columns] if columns is not None else page), len(df)
+
+    def _ensure_loaded(self) -> None:
+        """Load the dataset on first access."""
+        if self._df is None:
+            with self._lock:
+                if self._df is None:
+                    self._load_locked()
+
+    def _current_signature(self) -> str:
+        """Signature of the source file, or EMPTY_VERSION if it is missing."""
+        if not os.path.exists(self.data_path):
+            return self.EMPTY_VERSION
+        return file_signature(self.data_path)
+
+    def _load_locked(self) -> str:
+        """Read and prepare the dataset. Caller must hold the lock."""
+        import dataset_snapshot
+
+        if not os.path.exists(self.data_path):
+            self.logger.warning(
+                f"⚠️  Data file not found at {self.data_path}, using empty DataFrame"
+            )
+            self._df = pd.DataFrame()
+            self._version = self.EMPTY_VERSION
+            self._signature = self.EMPTY_VERSION
+            self._catalog = {}
+            self._row_index = None
+            return self._version
+
+        signature = file_signature(self.data_path)
+        if dataset_snapshot.is_available():
+            df, version, catalog, row_index = dataset_snapshot.load_or_build(
+                self.data_path, signature
+            )
+        else:
+            self.logger.info(f"📂 Loading data from {self.data_path}...")
+            df = prepare_dataframe(pd.read_csv(self.data_path))
+            version = dataset_snapshot.file_hash(self.data_path)
+            catalog = dataset_snapshot.read_catalog(
+                dataset_snapshot.catalog_path_for(self.data_path)
+            )
+            row_index = None
+
+        self._df = df
+        self._version = version
+        self._signature = signature
+        self._catalog = catalog
+        self._row_index = row_index
+        self.logger.info(
+            f"✅ Data loaded: {df.shape[0]} rows, {df.shape[1]} columns "
+            f"(version {version})"
+        )
+        return version
+
+
+_registry: Optional[DatasetRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> DatasetRegistry:
+    """Get the process-wide dataset registry.
+
+    Returns:
+        The shared DatasetRegistry instance.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = DatasetRegistry()
+    return _registry
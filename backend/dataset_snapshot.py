@@ -0,0 +1,343 @@
+"""Columnar snapshot of the sales dataset.
+
+This module converts ``data/train.csv`` into a typed Arrow IPC file that
+sits next to it (``data/train.arrow``). The snapshot keeps the parsed
+dates, the categorical dimensions and the column catalog from
+``data/catalog.json``, and is opened memory-mapped, so loading it skips CSV
+text parsing entirely. The DataFrame is still converted from the mapped
+batches into process memory (one copy, with no parsing); the mapping itself
+serves the RowIndex page reads. The snapshot is rebuilt automatically when
+the CSV or the catalog changes.
+
+It can also be built ahead of time (e.g. during a deploy):
+
+    python dataset_snapshot.py [path/to/train.csv]
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+
+
+logger = logging.getLogger(__name__)
+
+# Rows per record batch; batches are the unit of random access in the file
+BATCH_SIZE = 65536
+
+SNAPSHOT_FORMAT_VERSION = "2"
+
+
+def is_available() -> bool:
+    """Whether pyarrow is installed and snapshots can be used."""
+    return pa is not None
+
+
+def snapshot_path_for(csv_path: str) -> str:
+    """Path of the snapshot file that belongs to a CSV file.
+
+    Args:
+        csv_path: Path to the source CSV.
+
+    Returns:
+        Path with the ``.arrow`` extension in the same directory.
+    """
+    return os.path.splitext(csv_path)[0] + '.arrow'
+
+
+def catalog_path_for(csv_path: str) -> str:
+    """Path of the column catalog that belongs to a CSV file."""
+    return os.path.join(os.path.dirname(csv_path), 'catalog.json')
+
+
+def file_hash(path: str) -> str:
+    """Compute a content hash of a file.
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        Short hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def read_catalog(catalog_path: str) -> Dict[str, Any]:
+    """Read the column catalog, returning an empty dict if it is missing."""
+    if not os.path.exists(catalog_path):
+        return {}
+    with open(catalog_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_metadata(snapshot_path: str) -> Optional[Dict[str, str]]:
+    """Read the snapshot's schema metadata without loading any data.
+
+    Args:
+        snapshot_path: Path to the snapshot file.
+
+    Returns:
+        Decoded metadata, or None if the file is missing or unreadable.
+    """
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        with pa.memory_map(snapshot_path, 'r') as source:
+            schema = pa.ipc.open_file(source).schema
+        return {
+            key.decode('utf-8'): value.decode('utf-8')
+            for key, value in (schema.metadata or {}).items()
+        }
+    except (pa.ArrowInvalid, OSError) as e:
+        logger.warning(f"⚠️  Ignoring unreadable snapshot {snapshot_path}: {str(e)}")
+        return None
+
+
+def write_snapshot(
+    df: pd.DataFrame,
+    snapshot_path: str,
+    metadata: Dict[str, str]
+) -> None:
+    """Write a DataFrame to an Arrow IPC file atomically.
+
+    Besides the given metadata, the file records its row count and the
+    starting row of every record batch, which RowIndex uses to seek.
+
+    Args:
+        df: Prepared DataFrame to store.
+        snapshot_path: Destination path.
+        metadata: Extra schema metadata (source hashes, catalog).
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    batches = table.to_batches(max_chunksize=BATCH_SIZE)
+    offsets = [0]
+    for batch in batches:
+        offsets.append(offsets[-1] + batch.num_rows)
+
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata.update({
+        key.encode('utf-8'): value.encode('utf-8')
+        for key, value in {
+            **metadata,
+            'num_rows': str(table.num_rows),
+            'batch_offsets': json.dumps(offsets),
+        }.items()
+    })
+    _write_batches(snapshot_path, table.schema.with_metadata(schema_metadata), batches)
+
+
+def _write_batches(
+    snapshot_path: str,
+    schema: "pa.Schema",
+    batches: Iterable["pa.RecordBatch"]
+) -> None:
+    """Write record batches to a uniquely named temporary file, then rename it.
+
+    Concurrent writers (e.g. several workers starting together) each write
+    their own file, and the last rename wins with a complete snapshot.
+    """
+    directory, name = os.path.split(os.path.abspath(snapshot_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory)
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, schema) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+        os.replace(tmp_path, snapshot_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def update_signature(snapshot_path: str, signature: str) -> None:
+    """Record a new source signature in an existing snapshot.
+
+    Arrow IPC files cannot be edited in place, so the mapped batches are
+    copied into a new file with the updated metadata (no CSV parsing).
+
+    Args:
+        snapshot_path: Path to the snapshot file.
+        signature: Current ``file_signature`` of the CSV.
+    """
+    reader = open_snapshot(snapshot_path)
+    schema_metadata = dict(reader.schema.metadata or {})
+    schema_metadata[b'source_signature'] = signature.encode('utf-8')
+    _write_batches(
+        snapshot_path,
+        reader.schema.with_metadata(schema_metadata),
+        (reader.get_batch(i) for i in range(reader.num_record_batches))
+    )
+
+
+def open_snapshot(snapshot_path: str) -> "pa.ipc.RecordBatchFileReader":
+    """Open a snapshot memory-mapped.
+
+    Args:
+        snapshot_path: Path to the snapshot file.
+
+    Returns:
+        File reader whose batches are backed by the memory map.
+    """
+    return pa.ipc.open_file(pa.memory_map(snapshot_path, 'r'))
+
+
+class RowIndex:
+    """Positional row access over a memory-mapped snapshot.
+
+    The batch offsets stored in the snapshot metadata map a row number to
+    its record batch with a binary search, so reading a page costs the same
+    whatever its position in the file.
+
+    Attributes:
+        reader: Memory-mapped snapshot reader.
+        num_rows: Total number of rows in the snapshot.
+    """
+
+    def __init__(self, reader: "pa.ipc.RecordBatchFileReader") -> None:
+        """Initialize the index from the snapshot metadata.
+
+        Args:
+            reader: Reader returned by ``open_snapshot``.
+        """
+        metadata = reader.schema.metadata or {}
+        self.reader = reader
+        self.num_rows = int(metadata[b'num_rows'])
+        self._offsets: List[int] = json.loads(metadata[b'batch_offsets'])
+
+    def read(self, skip: int, limit: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read a page of rows.
+
+        Args:
+            skip: Position of the first row.
+            limit: Maximum number of rows.
+            columns: Columns to read (None for all); the others are never
+                converted to pandas.
+
+        Returns:
+            DataFrame with the requested rows, typed like the full dataset.
+        """
+        skip = max(skip, 0)
+        end = min(skip + max(limit, 0), self.num_rows)
+        if skip >= end:
+            table = self.reader.schema.empty_table()
+            return (table.select(columns) if columns is not None else table).to_pandas()
+
+        pieces = []
+        batch_index = bisect_right(self._offsets, skip) - 1
+        position = skip
+        while position < end:
+            batch_start = self._offsets[batch_index]
+            batch = self.reader.get_batch(batch_index)
+            offset = position - batch_start
+            length = min(end - position, batch.num_rows - offset)
+            pieces.append(batch.slice(offset, length))
+            position += length
+            batch_index += 1
+
+        table = pa.Table.from_batches(pieces, schema=self.reader.schema)
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas()
+
+
+def load_or_build(
+    csv_path: str,
+    signature: str
+) -> Tuple[pd.DataFrame, str, Dict[str, Any], Optional[RowIndex]]:
+    """Load the dataset from its snapshot, rebuilding it if stale.
+
+    The snapshot is reused when the CSV's signature (size and mtime) is
+    unchanged, or when its content hash still matches, so a ``touch`` or a
+    fresh checkout does not force a rebuild. After a content-hash match
+    the new signature is written back, so later loads skip the hash.
+
+    The returned DataFrame is converted from the memory-mapped snapshot
+    into process memory; only the row index reads from the mapping.
+
+    Args:
+        csv_path: Path to the source CSV.
+        signature: Current ``file_signature`` of the CSV.
+
+    Returns:
+        Tuple of (prepared DataFrame, dataset version, catalog, row index).
+        The row index is None if the snapshot could not be written.
+    """
+    from dataset_registry import prepare_dataframe
+
+    snapshot_path = snapshot_path_for(csv_path)
+    catalog_path = catalog_path_for(csv_path)
+    catalog = read_catalog(catalog_path)
+    catalog_json = json.dumps(catalog, sort_keys=True, ensure_ascii=False)
+    catalog_hash = hashlib.sha256(catalog_json.encode('utf-8')).hexdigest()[:12]
+
+    metadata = read_metadata(snapshot_path)
+    if metadata and (
+        metadata.get('format_version') != SNAPSHOT_FORMAT_VERSION
+        or metadata.get('catalog_hash') != catalog_hash
+    ):
+        metadata = None
+
+    content_hash = None
+    if metadata and metadata.get('source_signature') != signature:
+        content_hash = file_hash(csv_path)
+        if metadata.get('source_hash') != content_hash:
+            metadata = None
+
+    if metadata:
+        if content_hash is not None:
+            try:
+                update_signature(snapshot_path, signature)
+            except OSError as e:
+                logger.warning(f"⚠️  Could not update snapshot signature {snapshot_path}: {str(e)}")
+        logger.info(f"📂 Loading snapshot {snapshot_path} (memory-mapped)...")
+        reader = open_snapshot(snapshot_path)
+        return reader.read_pandas(), metadata['source_hash'], catalog, RowIndex(reader)
+
+    content_hash = content_hash or file_hash(csv_path)
+    logger.info(f"📂 Parsing {csv_path} and building snapshot...")
+    df = prepare_dataframe(pd.read_csv(csv_path))
+    try:
+        write_snapshot(df, snapshot_path, {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'source_signature': signature,
+            'source_hash': content_hash,
+            'catalog_hash': catalog_hash,
+            'catalog': catalog_json,
+        })
+        logger.info(f"✅ Snapshot written to {snapshot_path}")
+    except OSError as e:
+        logger.warning(f"⚠️  Could not write snapshot {snapshot_path}: {str(e)}")
+        return df, content_hash, catalog, None
+    return df, content_hash, catalog, RowIndex(open_snapshot(snapshot_path))
+
+
+if __name__ == "__main__":
+    import sys
+    from dataset_registry import DATA_PATH, file_signature
+    from logging_config import setup_logging
+
+    setup_logging(level="INFO", use_colors=True)
+    if not is_available():
+        logger.error("❌ pyarrow is not installed")
+        sys.exit(1)
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    df, version, _, _ = load_or_build(path, file_signature(path))
+    logger.info(f"✅ Snapshot ready: {df.shape[0]} rows, version {version}")
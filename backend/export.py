@@ -0,0 +1,188 @@
+"""Streaming export of tables as CSV, NDJSON or Arrow IPC.
+
+This module turns a DataFrame (the dataset, a filtered or projected subset
+of it, or a stored analysis result) into a generator of encoded chunks of
+EXPORT_CHUNK_ROWS rows, meant for a ``StreamingResponse``. Only one chunk
+is encoded at a time, so memory does not grow with the number of rows
+exported; the rows are read from the in-memory frame of one dataset
+version, so a reload during the download does not mix versions.
+
+Filters are equality filters on column values, resolved through the
+ValueIndex codes instead of comparing the raw column.
+
+Configured through environment variables:
+    EXPORT_CHUNK_ROWS: Rows encoded per chunk (default 10000).
+"""
+
+import io
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import dataset_snapshot
+from value_index import ValueIndex
+
+if dataset_snapshot.is_available():
+    import pyarrow as pa
+    import pyarrow.ipc
+
+
+EXPORT_CHUNK_ROWS = int(os.environ.get("EXPORT_CHUNK_ROWS", "10000"))
+
+# Export formats and their media types
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def parse_filters(expressions: Iterable[str]) -> Dict[str, List[str]]:
+    """Parse ``Column=value`` filter expressions.
+
+    Values given for the same column are alternatives; different columns
+    must all match.
+
+    Args:
+        expressions: Filter expressions from the query string.
+
+    Returns:
+        Mapping of columns to accepted values (as text).
+
+    Raises:
+        ValueError: If an expression has no ``=``.
+    """
+    filters: Dict[str, List[str]] = {}
+    for expression in expressions:
+        column, sep, value = expression.partition("=")
+        if not sep or not column.strip():
+            raise ValueError(f"Invalid filter '{expression}' (expected Column=value)")
+        filters.setdefault(column.strip(), []).append(value)
+    return filters
+
+
+def _text_keys(value: Any) -> List[str]:
+    """Texts a filter value may use to match a column value."""
+    keys = [str(value)]
+    if isinstance(value, pd.Timestamp):
+        keys.append(value.isoformat())
+        if value == value.normalize():
+            keys.append(value.date().isoformat())
+    return keys
+
+
+def filter_positions(index: ValueIndex, filters: Dict[str, List[str]]) -> Optional[np.ndarray]:
+    """Find the rows matching every filter.
+
+    Args:
+        index: Value index of the frame being exported.
+        filters: Mapping of columns to accepted values (as text).
+
+    Returns:
+        Matching row positions, or None when there are no filters.
+
+    Raises:
+        KeyError: If a filtered column does not exist.
+    """
+    if not filters:
+        return None
+    mask = np.ones(len(index.df), dtype=bool)
+    for column, texts in filters.items():
+        wanted = set(texts)
+        lookup = index.encoding(column).lookup
+        values = [value for value in lookup if wanted.intersection(_text_keys(value))]
+        mask &= index.mask(column, values)
+    return np.flatnonzero(mask)
+
+
+def iter_chunks(
+    df: pd.DataFrame,
+    positions: Optional[np.ndarray] = None,
+    chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """Split a frame, or the given rows of it, into chunks.
+
+    Args:
+        df: The frame.
+        positions: Row positions to export (None for all rows).
+        chunk_rows: Rows per chunk.
+
+    Yields:
+        Consecutive chunks; at least one, possibly empty, so the encoders
+        always write a header or schema.
+    """
+    total = len(df) if positions is None else len(positions)
+    for start in range(0, max(total, 1), chunk_rows):
+        if positions is None:
+            yield df.iloc[start:start + chunk_rows]
+        else:
+            yield df.iloc[positions[start:start + chunk_rows]]
+
+
+def _encode_csv(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode chunks as CSV with a single header line."""
+    for i, chunk in enumerate(chunks):
+        yield chunk.to_csv(index=False, header=i == 0).encode("utf-8")
+
+
+def _encode_ndjson(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode chunks as one JSON object per line."""
+    for chunk in chunks:
+        if len(chunk):
+            text = chunk.to_json(orient="records", lines=True, date_format="iso", date_unit="s")
+            yield (text if text.endswith("\n") else text + "\n").encode("utf-8")
+
+
+def _encode_arrow(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode chunks as record batches of an Arrow IPC stream."""
+    sink = io.BytesIO()
+    writer = None
+    for chunk in chunks:
+        batch = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, batch.schema)
+        writer.write_batch(batch)
+        yield _take(sink)
+    if writer is not None:
+        writer.close()
+        yield _take(sink)
+
+
+def _take(sink: io.BytesIO) -> bytes:
+    """Return the bytes written to a sink so far and empty it."""
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def stream_table(
+    df: pd.DataFrame,
+    fmt: str,
+    positions: Optional[np.ndarray] = None,
+    chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """Encode a table chunk by chunk.
+
+    Args:
+        df: The table (already projected to the exported columns).
+        fmt: One of EXPORT_FORMATS.
+        positions: Row positions to export (None for all rows).
+        chunk_rows: Rows encoded per chunk.
+
+    Returns:
+        Generator of encoded bytes.
+
+    Raises:
+        ValueError: If the format is unknown or unavailable.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (expected one of {', '.join(EXPORT_FORMATS)})")
+    if fmt == "arrow" and not dataset_snapshot.is_available():
+        raise ValueError("Arrow export requires pyarrow")
+
+    chunks = iter_chunks(df, positions, chunk_rows)
+    encoders = {"csv": _encode_csv, "ndjson": _encode_ndjson, "arrow": _encode_arrow}
+    return encoders[fmt](chunks)
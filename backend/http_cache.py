@@ -0,0 +1,88 @@
+"""HTTP caching for dataset-derived responses.
+
+This module provides strong ETags derived from the dataset version and the
+request parameters, and the conditional GET check: when the client (or a
+reverse proxy) sends an ``If-None-Match`` matching the current ETag, the
+endpoint answers 304 Not Modified before reading any data.
+
+Configured through environment variables:
+    HTTP_CACHE_MAX_AGE: Seconds browsers and proxies may reuse a response
+        without revalidating it (default 5).
+"""
+
+import os
+import hashlib
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+
+HTTP_CACHE_MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", "5"))
+
+
+def make_etag(version: str, *parts: Any) -> str:
+    """Build a strong ETag for a resource of a dataset version.
+
+    Args:
+        version: Dataset version the response is built from.
+        *parts: Resource name and query parameters shaping the response.
+
+    Returns:
+        Quoted ETag value.
+    """
+    key = "|".join(str(part) for part in (version, *parts))
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an ``If-None-Match`` header against an ETag.
+
+    Uses the weak comparison required for ``If-None-Match``: a ``W/``
+    prefix on the client's tags is ignored.
+
+    Args:
+        if_none_match: Header value (comma-separated tags or ``*``).
+        etag: Current ETag of the resource.
+
+    Returns:
+        Whether the client already has the current representation.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str, max_age: int = HTTP_CACHE_MAX_AGE) -> Dict[str, str]:
+    """Headers letting browsers and proxies cache and revalidate a response.
+
+    Args:
+        etag: ETag of the response.
+        max_age: Seconds the response may be reused without revalidation.
+
+    Returns:
+        ETag and Cache-Control headers.
+    """
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max_age}, must-revalidate"}
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Answer a conditional GET whose ETag still matches.
+
+    Args:
+        request: Incoming request.
+        etag: Current ETag of the resource.
+
+    Returns:
+        A 304 response, or None if the full response must be sent.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
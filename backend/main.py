@@ -1,12 +1,64 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Union, Optional
 from datetime import datetime
 import json
-from analytics_agent import get_analytics_response
+import os
+import asyncio
+from agent_pipeline import aget_analytics_response, astream_analytics_response
+from dataset_registry import DatasetRegistry, get_registry
+from versioned_cache import VersionedCache, RefreshScheduler
+from concurrency import get_chat_semaphore, shutdown_tool_executor
+from sandbox import get_sandbox_pool, shutdown_sandbox_pool
+from code_cache import get_execution_cache
+from dataset_profile import get_profile_cache
+from chat_store import DEFAULT_SESSION, get_chat_store
+from broadcast_hub import BroadcastHub
+from dashboard_feed import DashboardFeed
+from http_cache import cache_headers, make_etag, not_modified
+from columnar import dumps, encode_columns
+from export import EXPORT_FORMATS, filter_positions, parse_filters, stream_table
+from tool_output import get_result_store
+from value_index import get_value_index
+from sales_cube import get_cube_cache
 
-app = FastAPI(title="Dashboard AI API")
+# Watches the dataset for changes and keeps derived caches warm
+refresh_scheduler = RefreshScheduler(
+    interval=float(os.environ.get("DATASET_REFRESH_INTERVAL", "30"))
+)
+
+# New dataset versions are sent to the sandbox from the scheduler thread,
+# so tool calls never have to rebind it
+sandbox_dataset = refresh_scheduler.register(VersionedCache("sandbox_dataset", lambda df: df))
+sandbox_dataset.subscribe(lambda version, df: get_sandbox_pool().start(df, version))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the shared dataset and warm caches before serving requests"""
+    # Dashboard diffs are published from the scheduler thread onto this loop
+    dashboard_feed.attach(asyncio.get_running_loop())
+    # Fork the code sandbox once the dataset is in memory and before any
+    # thread starts (the scheduler, the tool pools), so no lock is inherited
+    registry = get_registry()
+    version, df = registry.get_versioned()
+    get_sandbox_pool().start(df, version)
+    refresh_scheduler.start()
+    get_profile_cache().get(df, version, registry.catalog)
+    yield
+    refresh_scheduler.stop()
+    dashboard_feed.attach(None)
+    shutdown_tool_executor()
+    shutdown_sandbox_pool()
+    await chat_hub.close()
+    await dashboard_hub.close()
+
+
+app = FastAPI(title="Dashboard AI API", lifespan=lifespan)
 
 # CORS configuration
 app.add_middleware(
@@ -20,6 +72,9 @@ app.add_middleware(
 # Data models
 class ChatMessageRequest(BaseModel):
     message: str
+    session_id: str = DEFAULT_SESSION
+    # Sender's /ws/chat connection, which must not get the reply broadcast
+    connection_id: Optional[str] = None
 
 class ChatMessageResponse(BaseModel):
     message: str
@@ -56,9 +111,14 @@ class DashboardData(BaseModel):
     chartData: List[ChartDataPoint]
     recentActivity: List[ActivityItem]
 
-# In-memory storage (replace with database in production)
-chat_history: List[ChatMessage] = []
-active_connections: List[WebSocket] = []
+class ChatHistoryResponse(BaseModel):
+    messages: List[ChatMessage]
+    cursor: str
+    has_more: bool
+
+# Chat history is persisted by the chat store; sockets are fed by the hub
+chat_hub = BroadcastHub("chat")
+dashboard_hub = BroadcastHub("dashboard")
 
 # Root endpoint
 @app.get("/")
@@ -69,166 +129,220 @@ def read_root():
 def health_check():
     return {"status": "ok"}
 
+# Chat helpers
+def record_message(role: str, content: str, session_id: str = DEFAULT_SESSION) -> ChatMessage:
+    """Append a message to the session's chat history (blocking SQLite commit)"""
+    return ChatMessage(**get_chat_store().append(role, content, session_id))
+
+async def arecord_message(role: str, content: str, session_id: str = DEFAULT_SESSION) -> ChatMessage:
+    """Append a message to the chat history without blocking the event loop"""
+    return await run_in_threadpool(record_message, role, content, session_id)
+
+def broadcast_message(
+    message: ChatMessage,
+    exclude: Optional[WebSocket] = None,
+    session_id: str = DEFAULT_SESSION
+):
+    """Queue a chat message for the session's WebSocket connections"""
+    chat_hub.broadcast(message.model_dump(), exclude=exclude, session_id=session_id)
+
+async def stream_chat_events(
+    content: str,
+    exclude: Optional[WebSocket] = None,
+    session_id: str = DEFAULT_SESSION
+):
+    """Run the agent for a message, yielding stream events as they happen.
+    
+    The user and agent messages are recorded in the history and the final
+    answer is broadcast like a regular /api/chat reply.
+    """
+    await arecord_message("user", content, session_id)
+    
+    answer = None
+    async with get_chat_semaphore():
+        async for event in astream_analytics_response(content):
+            if event["type"] in ("done", "error"):
+                answer = event["content"]
+            yield event
+    
+    if answer is not None:
+        agent_message = await arecord_message("agent", answer, session_id)
+        broadcast_message(agent_message, exclude=exclude, session_id=session_id)
+
 # Chat endpoints
 @app.post("/api/chat", response_model=ChatMessageResponse)
 async def send_chat_message(request: ChatMessageRequest):
     """Send a message to the analytics agent"""
-    user_message = ChatMessage(
-        id=str(len(chat_history) + 1),
-        role="user",
-        content=request.message,
-        timestamp=datetime.now().isoformat()
-    )
-    chat_history.append(user_message)
+    await arecord_message("user", request.message, request.session_id)
     
-    # Get response from LLM agent
-    agent_response_content = get_analytics_response(request.message)
+    # Get response from LLM agent without blocking the event loop;
+    # the semaphore bounds how many agent runs are in flight
+    async with get_chat_semaphore():
+        agent_response_content = await aget_analytics_response(request.message)
     
-    agent_message = ChatMessage(
-        id=str(len(chat_history) + 1),
-        role="agent",
-        content=agent_response_content,
-        timestamp=datetime.now().isoformat()
-    )
-    chat_history.append(agent_message)
+    agent_message = await arecord_message("agent", agent_response_content, request.session_id)
     
-    # Broadcast to WebSocket connections
-    for connection in active_connections:
-        try:
-            await connection.send_json(agent_message.dict())
-        except:
-            pass
+    # Broadcast to WebSocket connections except the sender's
+    broadcast_message(
+        agent_message,
+        exclude=chat_hub.find(request.connection_id),
+        session_id=request.session_id
+    )
     
     return ChatMessageResponse(
         message=agent_response_content,
         timestamp=agent_message.timestamp
     )
 
-@app.get("/api/chat/history")
-def get_chat_history():
-    """Get chat message history"""
-    return {"messages": chat_history}
+@app.post("/api/chat/stream")
+async def stream_chat_message(request: ChatMessageRequest):
+    """Send a message to the analytics agent and stream the answer (SSE)"""
+    async def event_source():
+        async for event in stream_chat_events(
+            request.message,
+            exclude=chat_hub.find(request.connection_id),
+            session_id=request.session_id
+        ):
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/chat/history", response_model=ChatHistoryResponse)
+def get_chat_history(session_id: str = DEFAULT_SESSION, since: int = 0, limit: int = 500):
+    """Get the chat messages after a cursor (the id of the last message seen)"""
+    messages, has_more = get_chat_store().history(session_id, since, max(1, min(limit, 1000)))
+    cursor = messages[-1]["id"] if messages else str(since)
+    return ChatHistoryResponse(messages=messages, cursor=cursor, has_more=has_more)
 
 # Dashboard endpoints
-@app.get("/api/dashboard/metrics", response_model=DashboardData)
-def get_dashboard_metrics():
-    """Get dashboard metrics and data from real CSV analysis"""
+def build_dashboard_data(df) -> DashboardData:
+    """Compute dashboard metrics and data from the dataset"""
     import pandas as pd
-    import os
     from datetime import datetime, timedelta
     
-    # Load CSV
-    data_path = '../data/train.csv'
-    if not os.path.exists(data_path):
+    if df.empty:
         # Fallback to mock data if CSV not found
         return get_mock_dashboard_data()
     
+    # Calculate real metrics
+    total_sales = df['Sales'].sum()
+    total_orders = df['Order ID'].nunique()
+    total_customers = df['Customer ID'].nunique()
+    avg_order_value = df.groupby('Order ID')['Sales'].sum().mean()
+    
+    # Calculate growth (compare last 6 months vs previous 6 months)
+    cutoff_date = df['Order Date'].max() - timedelta(days=180)
+    is_recent = df['Order Date'] >= cutoff_date
+    is_old = df['Order Date'] < cutoff_date
+    recent_sales = df.loc[is_recent, 'Sales'].sum()
+    old_sales = df.loc[is_old, 'Sales'].sum()
+    sales_growth = ((recent_sales - old_sales) / old_sales * 100) if old_sales > 0 else 0
+    
+    # Customer growth
+    recent_customers = df.loc[is_recent, 'Customer ID'].nunique()
+    old_customers = df.loc[is_old, 'Customer ID'].nunique()
+    customer_growth = ((recent_customers - old_customers) / old_customers * 100) if old_customers > 0 else 0
+    
+    # Monthly sales trend
+    year_month = df['Order Date'].dt.to_period('M').rename('YearMonth')
+    monthly_sales = df.groupby(year_month).agg({
+        'Sales': 'sum',
+        'Customer ID': 'nunique'
+    }).reset_index()
+    monthly_sales = monthly_sales.tail(12)  # Last 12 months for better visualization
+    
+    # Month names in Portuguese
+    month_names = {
+        1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
+        7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
+    }
+    
+    chart_data = [
+        ChartDataPoint(
+            name=f"{month_names[period.month]}/{str(period.year)[-2:]}",  # e.g., "Jan/17"
+            value=int(sales),
+            usuarios=int(customers)
+        )
+        for period, sales, customers in zip(
+            monthly_sales['YearMonth'],
+            monthly_sales['Sales'],
+            monthly_sales['Customer ID']
+        )
+    ]
+    
+    # Recent activity (based on recent orders)
+    recent_orders = df.nlargest(3, 'Order Date')
+    activities = []
+    for idx, row in recent_orders.iterrows():
+        activities.append(ActivityItem(
+            id=str(idx),
+            title=f"Order #{row['Order ID'][:8]}",
+            description=f"{row['Category']} - {row['Sub-Category']} (R$ {row['Sales']:.2f})",
+            timestamp=row['Order Date'].isoformat() if pd.notna(row['Order Date']) else datetime.now().isoformat(),
+            type="success"
+        ))
+    
+    return DashboardData(
+        metrics=[
+            MetricData(
+                id="1",
+                label="Total Sales",
+                value=f"R$ {total_sales/1000:.1f}K",
+                change=round(sales_growth, 1),
+                trend="up" if sales_growth > 0 else "down",
+                color="primary"
+            ),
+            MetricData(
+                id="2",
+                label="Total of Customers",
+                value=total_customers,
+                change=round(customer_growth, 1),
+                trend="up" if customer_growth > 0 else "down",
+                color="success"
+            ),
+            MetricData(
+                id="3",
+                label="Average Order Value",
+                value=f"R$ {avg_order_value:.2f}",
+                change=0,
+                trend="up",
+                color="warning"
+            ),
+            MetricData(
+                id="4",
+                label="Total of Orders",
+                value=total_orders,
+                change=0,
+                trend="up",
+                color="secondary"
+            ),
+        ],
+        chartData=chart_data,
+        recentActivity=activities
+    )
+
+# Dashboard metrics are rebuilt off the request path whenever the dataset changes
+dashboard_cache = refresh_scheduler.register(
+    VersionedCache("dashboard_metrics", build_dashboard_data)
+)
+
+@app.get("/api/dashboard/metrics", response_model=DashboardData)
+def get_dashboard_metrics(request: Request, response: Response):
+    """Get dashboard metrics and data from real CSV analysis (cached per dataset version)"""
     try:
-        df = pd.read_csv(data_path)
-        
-        # Parse dates
-        df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
-        df['Ship Date'] = pd.to_datetime(df['Ship Date'], errors='coerce')
+        version, dashboard = dashboard_cache.get_versioned()
         
-        # Calculate real metrics
-        total_sales = df['Sales'].sum()
-        total_orders = df['Order ID'].nunique()
-        total_customers = df['Customer ID'].nunique()
-        avg_order_value = df.groupby('Order ID')['Sales'].sum().mean()
-        
-        # Calculate growth (compare last 6 months vs previous 6 months)
-        df_sorted = df.sort_values('Order Date')
-        cutoff_date = df_sorted['Order Date'].max() - timedelta(days=180)
-        recent_sales = df[df['Order Date'] >= cutoff_date]['Sales'].sum()
-        old_sales = df[df['Order Date'] < cutoff_date]['Sales'].sum()
-        sales_growth = ((recent_sales - old_sales) / old_sales * 100) if old_sales > 0 else 0
-        
-        # Customer growth
-        recent_customers = df[df['Order Date'] >= cutoff_date]['Customer ID'].nunique()
-        old_customers = df[df['Order Date'] < cutoff_date]['Customer ID'].nunique()
-        customer_growth = ((recent_customers - old_customers) / old_customers * 100) if old_customers > 0 else 0
-        
-        # Monthly sales trend
-        df['YearMonth'] = df['Order Date'].dt.to_period('M')
-        monthly_sales = df.groupby('YearMonth').agg({
-            'Sales': 'sum',
-            'Customer ID': 'nunique'
-        }).reset_index()
-        monthly_sales = monthly_sales.tail(12)  # Last 12 months for better visualization
-        
-        # Month names in Portuguese
-        month_names = {
-            1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
-            7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
-        }
-        
-        chart_data = []
-        for _, row in monthly_sales.iterrows():
-            period = row['YearMonth']
-            month_num = period.month
-            year = period.year
-            month_label = f"{month_names[month_num]}/{str(year)[-2:]}"  # e.g., "Jan/17"
-            
-            chart_data.append(ChartDataPoint(
-                name=month_label,
-                value=int(row['Sales']),
-                usuarios=int(row['Customer ID'])
-            ))
-        
-        # Top categories
-        category_sales = df.groupby('Category')['Sales'].sum().sort_values(ascending=False)
-        top_category = category_sales.index[0] if len(category_sales) > 0 else "N/A"
-        
-        # Recent activity (based on recent orders)
-        recent_orders = df.nlargest(3, 'Order Date')
-        activities = []
-        for idx, row in recent_orders.iterrows():
-            activities.append(ActivityItem(
-                id=str(idx),
-                title=f"Order #{row['Order ID'][:8]}",
-                description=f"{row['Category']} - {row['Sub-Category']} (R$ {row['Sales']:.2f})",
-                timestamp=row['Order Date'].isoformat() if pd.notna(row['Order Date']) else datetime.now().isoformat(),
-                type="success"
-            ))
-        
-        return DashboardData(
-            metrics=[
-                MetricData(
-                    id="1",
-                    label="Total Sales",
-                    value=f"R$ {total_sales/1000:.1f}K",
-                    change=round(sales_growth, 1),
-                    trend="up" if sales_growth > 0 else "down",
-                    color="primary"
-                ),
-                MetricData(
-                    id="2",
-                    label="Total of Customers",
-                    value=total_customers,
-                    change=round(customer_growth, 1),
-                    trend="up" if customer_growth > 0 else "down",
-                    color="success"
-                ),
-                MetricData(
-                    id="3",
-                    label="Average Order Value",
-                    value=f"R$ {avg_order_value:.2f}",
-                    change=0,
-                    trend="up",
-                    color="warning"
-                ),
-                MetricData(
-                    id="4",
-                    label="Total of Orders",
-                    value=total_orders,
-                    change=0,
-                    trend="up",
-                    color="secondary"
-                ),
-            ],
-            chartData=chart_data,
-            recentActivity=activities
-        )
+        # Unchanged since the client's copy: 304 straight from the cached version
+        etag = make_etag(version, "dashboard_metrics")
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        response.headers.update(cache_headers(etag))
+        return dashboard
     
     except Exception as e:
         import traceback
@@ -237,6 +351,7 @@ def get_dashboard_metrics():
         print(f"Traceback:")
         traceback.print_exc()
         print(f"="*80)
+        response.headers["Cache-Control"] = "no-store"
         return get_mock_dashboard_data()
 
 def get_mock_dashboard_data():
@@ -310,15 +425,31 @@ def get_mock_dashboard_data():
         ]
     )
 
+# Dashboard subscribers get a snapshot, then only the sections that changed
+dashboard_feed = DashboardFeed(dashboard_hub, dashboard_cache, fallback=get_mock_dashboard_data)
+
 @app.get("/api/dashboard/preview")
-def get_data_preview(skip: int = 0, limit: int = 10):
-    """Get paginated preview of the dataset"""
+def get_data_preview(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    format: str = "records",
+    columns: Optional[str] = None
+):
+    """Get paginated preview of the dataset
+    
+    format=records returns one object per row; format=columns returns one
+    array per column (converted vectorized, much smaller for large pages).
+    columns is an optional comma-separated projection.
+    """
     import pandas as pd
-    import os
     
-    # Load CSV
-    data_path = '../data/train.csv'
-    if not os.path.exists(data_path):
+    # Shared dataset
+    registry = get_registry()
+    version = registry.version
+    response.headers["Cache-Control"] = "no-store"
+    if version == DatasetRegistry.EMPTY_VERSION:
         return {
             "error": "Dataset not found",
             "data": [],
@@ -326,12 +457,46 @@ def get_data_preview(skip: int = 0, limit: int = 10):
             "columns": [],
             "dtypes": {}
         }
+    if format not in ("records", "columns"):
+        return {
+            "error": f"Unknown format '{format}' (expected 'records' or 'columns')",
+            "data": [],
+            "total": 0,
+            "columns": [],
+            "dtypes": {}
+        }
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    
+    # The page only depends on the dataset version and the query
+    etag = make_etag(version, "preview", skip, limit, format, ",".join(selected or []))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
     
     try:
-        df = pd.read_csv(data_path)
+        # Get paginated slice (seeks via the snapshot row index)
+        df_preview, total = registry.read_rows(skip, limit, selected)
         
-        # Get paginated slice
-        df_preview = df.iloc[skip:skip+limit]
+        # Only cacheable if the dataset did not change while reading
+        if registry.version == version:
+            response.headers.update(cache_headers(etag))
+        
+        if format == "columns":
+            body = {
+                "format": "columns",
+                "data": encode_columns(df_preview),
+                "rows": len(df_preview),
+                "total": total,
+                "columns": [str(col) for col in df_preview.columns],
+                "dtypes": {str(col): str(dtype) for col, dtype in df_preview.dtypes.items()},
+                "skip": skip,
+                "limit": limit
+            }
+            return Response(
+                content=dumps(body),
+                media_type="application/json",
+                headers={key: response.headers[key] for key in ("ETag", "Cache-Control") if key in response.headers}
+            )
         
         # Convert to records (list of dicts)
         records = df_preview.to_dict('records')
@@ -346,14 +511,17 @@ def get_data_preview(skip: int = 0, limit: int = 10):
         
         return {
             "data": records,
-            "total": len(df),
-            "columns": list(df.columns),
-            "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+            "total": total,
+            "columns": list(df_preview.columns),
+            "dtypes": {col: str(dtype) for col, dtype in df_preview.dtypes.items()},
             "skip": skip,
             "limit": limit
         }
     
     except Exception as e:
+        response.headers["Cache-Control"] = "no-store"
+        if "ETag" in response.headers:
+            del response.headers["ETag"]
         return {
             "error": str(e),
             "data": [],
@@ -362,18 +530,180 @@ def get_data_preview(skip: int = 0, limit: int = 10):
             "dtypes": {}
         }
 
+def _export_response(chunks, fmt: str, filename: str) -> StreamingResponse:
+    """Stream encoded export chunks as a file download"""
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
+
+def _parse_columns(columns: Optional[str], available) -> Optional[List[str]]:
+    """Parse a comma-separated projection, rejecting unknown columns"""
+    if not columns:
+        return None
+    selected = [c.strip() for c in columns.split(",") if c.strip()]
+    unknown = [c for c in selected if c not in available]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+    return selected
+
+@app.get("/api/export/dataset")
+def export_dataset(
+    format: str = "csv",
+    columns: Optional[str] = None,
+    filter: List[str] = Query(default=[])
+):
+    """Stream the dataset, or a filtered/projected subset, as CSV, NDJSON or Arrow IPC
+    
+    filter takes Column=value expressions (repeat it: values of the same
+    column are alternatives, different columns must all match).
+    """
+    if get_registry().version == DatasetRegistry.EMPTY_VERSION:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    # One dataset version for the whole download, even if it reloads meanwhile
+    index = get_value_index()
+    df = index.df
+    selected = _parse_columns(columns, df.columns)
+    try:
+        positions = filter_positions(index, parse_filters(filter))
+        chunks = stream_table(df[selected] if selected else df, format, positions)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown filter column: {e.args[0]}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _export_response(chunks, format, "dataset")
+
+@app.get("/api/export/results/{handle}")
+def export_result(handle: str, format: str = "csv", columns: Optional[str] = None):
+    """Stream a complete analysis result referenced by a chat answer (e.g. r1)"""
+    import pandas as pd
+    
+    table = get_result_store().get(handle)
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"Result '{handle}' is not available anymore")
+    
+    # Keep a meaningful index (e.g. group keys) as a column
+    if not isinstance(table.index, pd.RangeIndex):
+        table = table.reset_index()
+    selected = _parse_columns(columns, table.columns)
+    try:
+        chunks = stream_table(table[selected] if selected else table, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _export_response(chunks, format, handle)
+
+# The sales cube is rebuilt with the dataset, off the request path
+cube_cache = refresh_scheduler.register(get_cube_cache())
+
+@app.get("/api/cube")
+def query_sales_cube(
+    request: Request,
+    response: Response,
+    by: List[str] = Query(default=[]),
+    time: Optional[str] = None,
+    filter: List[str] = Query(default=[]),
+    agg: str = "sum",
+    measure: str = "Sales"
+):
+    """Aggregate Sales by period (year/quarter/month) and columns from the pre-aggregated cube
+    
+    Queries outside the cube (other columns or measures) are computed on the
+    full dataset; "source" tells which one answered.
+    """
+    version, cube = cube_cache.get_versioned()
+    etag = make_etag(version, "cube", ",".join(by), time, ",".join(sorted(filter)), agg, measure)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    
+    try:
+        result = cube.query(by, time, parse_filters(filter), agg, measure)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {e.args[0]}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response.headers.update(cache_headers(etag))
+    return {
+        "source": result.source,
+        "columns": [str(col) for col in result.table.columns],
+        "data": encode_columns(result.table),
+        "rows": len(result.table)
+    }
+
 # WebSocket endpoint for real-time chat
 @app.websocket("/ws/chat")
-async def websocket_chat(websocket: WebSocket):
+async def websocket_chat(websocket: WebSocket, session_id: str = DEFAULT_SESSION):
     """WebSocket endpoint for real-time chat updates"""
     await websocket.accept()
-    active_connections.append(websocket)
+    connection = chat_hub.connect(websocket, session_id)
+    # Sent back as connection_id by HTTP chat requests of this client
+    chat_hub.send(websocket, {"type": "connected", "connection_id": connection.id})
+    
+    try:
+        while True:
+            data = await websocket.receive_text()
+            
+            # {"type": "chat", "message": "..."} streams the agent's answer
+            # back over this socket; anything else is echoed as before
+            try:
+                payload = json.loads(data)
+            except ValueError:
+                payload = None
+            
+            if isinstance(payload, dict) and payload.get("type") == "chat":
+                async for event in stream_chat_events(
+                    payload.get("message", ""),
+                    exclude=websocket,
+                    session_id=payload.get("session_id") or session_id
+                ):
+                    chat_hub.send(websocket, event)
+            else:
+                chat_hub.send_text(websocket, f"Received: {data}")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        chat_hub.disconnect(websocket)
+
+# WebSocket endpoint for push-based dashboard updates
+@app.websocket("/ws/dashboard")
+async def websocket_dashboard(websocket: WebSocket):
+    """Send the dashboard snapshot, then diffs whenever the dataset changes"""
+    await websocket.accept()
+    try:
+        await run_in_threadpool(dashboard_feed.warm)
+    except Exception as e:
+        print(f"ERROR generating dashboard data: {str(e)}")
+    dashboard_feed.subscribe(websocket)
     
     try:
         while True:
-            # Keep connection alive
             data = await websocket.receive_text()
-            # Echo back or process as needed
-            await websocket.send_text(f"Received: {data}")
+            
+            # {"type": "resync"} asks for a new snapshot (e.g. after a missed diff)
+            try:
+                payload = json.loads(data)
+            except ValueError:
+                payload = None
+            
+            if isinstance(payload, dict) and payload.get("type") == "resync":
+                dashboard_hub.send(websocket, dashboard_feed.snapshot())
     except WebSocketDisconnect:
-        active_connections.remove(websocket)
+        pass
+    finally:
+        dashboard_hub.disconnect(websocket)
+
+@app.get("/api/ws/metrics")
+def get_websocket_metrics(hub: str = "chat"):
+    """Get the WebSocket fan-out metrics (queues, sent and dropped messages)"""
+    hubs = {"chat": chat_hub, "dashboard": dashboard_hub}
+    if hub not in hubs:
+        raise HTTPException(status_code=404, detail=f"Unknown hub '{hub}'")
+    return hubs[hub].get_stats()
+
+@app.get("/api/cache/metrics")
+def get_execution_cache_metrics():
+    """Get the generated-code result cache metrics (hits, misses, evictions, bytes)"""
+    return get_execution_cache().get_stats()
@@ -0,0 +1,265 @@
+"""Pre-aggregated sales cube.
+
+This module provides the SalesCube class, which materializes once per
+dataset version the rollups of Sales by order period (year, quarter,
+month) crossed with every combination of the cube dimensions (Category,
+Sub-Category, Region, Segment, Ship Mode). Each rollup (cuboid) keeps the
+sum and the row count of the measure, so sums, counts and means of any
+coarser grouping are exact.
+
+A query is answered from the smallest cuboid covering its grouping and
+filters: a dictionary lookup, plus a regroup of a few hundred cells when it
+filters. Queries outside the cube (other columns or measures) fall back to
+a groupby on the raw frame with the same semantics.
+
+Period keys are strings: ``2017`` (year), ``2017Q4`` (quarter) and
+``2017-11`` (month).
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from itertools import combinations
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from tool_output import format_result
+from versioned_cache import VersionedCache
+
+
+DIMENSIONS = ("Category", "Sub-Category", "Region", "Segment", "Ship Mode")
+TIME_LEVELS = ("year", "quarter", "month")
+TIME_COLUMN = "Order Date"
+MEASURE = "Sales"
+AGGREGATIONS = ("sum", "count", "mean")
+
+_PERIOD_FREQ = {"quarter": "Q", "month": "M"}
+
+# Answers memoized per cube; repeated questions skip even the regroup
+_MAX_ANSWERS = 256
+
+
+class CubeResult(NamedTuple):
+    """Answer to a cube query.
+
+    Attributes:
+        table: Grouping columns followed by the aggregated value.
+        source: ``cube`` if served from a cuboid, ``raw`` if from the frame.
+    """
+    table: pd.DataFrame
+    source: str
+
+
+def time_keys(dates: pd.Series, level: str) -> pd.Series:
+    """Period keys of a datetime column (null where the date is missing).
+
+    Args:
+        dates: Datetime column.
+        level: One of TIME_LEVELS.
+
+    Returns:
+        String keys such as ``2017``, ``2017Q4`` or ``2017-11``.
+    """
+    if level == "year":
+        keys = dates.dt.year.astype("Int64").astype(str)
+    else:
+        keys = dates.dt.to_period(_PERIOD_FREQ[level]).astype(str)
+    return keys.where(dates.notna())
+
+
+def _time_columns(level: Optional[str]) -> List[str]:
+    """Period columns present at a level (the level and all coarser ones)."""
+    if level is None:
+        return []
+    return list(TIME_LEVELS[:TIME_LEVELS.index(level) + 1])
+
+
+def _finest(levels: Iterable[Optional[str]]) -> Optional[str]:
+    """Finest of some time levels (None if there is none)."""
+    present = [level for level in levels if level is not None]
+    return max(present, key=TIME_LEVELS.index) if present else None
+
+
+def _regroup(table: pd.DataFrame, keys: Sequence[str]) -> pd.DataFrame:
+    """Add up the sums and counts of a rollup by coarser keys."""
+    if not keys:
+        return pd.DataFrame({"sum": [table["sum"].sum()], "count": [table["count"].sum()]})
+    return table.groupby(list(keys), sort=True, dropna=False)[["sum", "count"]].sum().reset_index()
+
+
+class SalesCube:
+    """Rollups of the sales measure over time and the cube dimensions.
+
+    Attributes:
+        df: The aggregated DataFrame (used by fallback queries).
+        dimensions: Cube dimensions present in ``df``.
+        cuboids: Rollups keyed by (time level, dimensions).
+        logger: Logger instance for the cube.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        """Materialize every cuboid.
+
+        Args:
+            df: The dataset.
+        """
+        self.df = df
+        self.dimensions = tuple(d for d in DIMENSIONS if d in df.columns)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.cuboids: Dict[Tuple[Optional[str], Tuple[str, ...]], pd.DataFrame] = {}
+        self._answers: "OrderedDict[Tuple, CubeResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if MEASURE not in df.columns or TIME_COLUMN not in df.columns:
+            self.logger.warning(f"⚠️ No '{MEASURE}'/'{TIME_COLUMN}' columns, every query uses the raw data")
+            return
+
+        base = self._rollup(self.dimensions, "month", MEASURE)
+        for level in (None,) + TIME_LEVELS:
+            for size in range(len(self.dimensions) + 1):
+                for dims in combinations(self.dimensions, size):
+                    self.cuboids[(level, dims)] = _regroup(base, _time_columns(level) + list(dims))
+
+        cells = sum(len(cuboid) for cuboid in self.cuboids.values())
+        self.logger.info(f"🧊 Built sales cube: {len(self.cuboids)} cuboids, {cells} cells")
+
+    def query(
+        self,
+        by: Sequence[str] = (),
+        time: Optional[str] = None,
+        filters: Optional[Dict[str, List[str]]] = None,
+        agg: str = "sum",
+        measure: str = MEASURE
+    ) -> CubeResult:
+        """Aggregate the measure by period and columns.
+
+        Args:
+            by: Columns to group by.
+            time: Period to group by (year, quarter, month) or None.
+            filters: Accepted values per column or period level (values of a
+                column are alternatives, different columns must all match).
+            agg: One of AGGREGATIONS.
+            measure: Numeric column to aggregate.
+
+        Returns:
+            The aggregated table (shared between identical queries, do not
+            modify it) and where it was computed from.
+
+        Raises:
+            ValueError: If the aggregation or time level is unknown.
+            KeyError: If a column does not exist.
+        """
+        filters = filters or {}
+        key = (
+            tuple(by), time, agg, measure,
+            tuple(sorted((column, tuple(sorted(map(str, values)))) for column, values in filters.items()))
+        )
+        with self._lock:
+            answer = self._answers.get(key)
+            if answer is not None:
+                self._answers.move_to_end(key)
+                return answer
+
+        answer = self._answer(by, time, filters, agg, measure)
+        with self._lock:
+            self._answers[key] = answer
+            while len(self._answers) > _MAX_ANSWERS:
+                self._answers.popitem(last=False)
+        return answer
+
+    def _answer(
+        self,
+        by: Sequence[str],
+        time: Optional[str],
+        filters: Dict[str, List[str]],
+        agg: str,
+        measure: str
+    ) -> CubeResult:
+        """Compute a query from the smallest covering cuboid, or the raw data."""
+        if agg not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{agg}' (expected one of {', '.join(AGGREGATIONS)})")
+        if time is not None and time not in TIME_LEVELS:
+            raise ValueError(f"Unknown time level '{time}' (expected one of {', '.join(TIME_LEVELS)})")
+        by = list(dict.fromkeys(by))
+
+        level = _finest([time] + [key for key in filters if key in TIME_LEVELS])
+        columns = list(dict.fromkeys(by + [key for key in filters if key not in TIME_LEVELS]))
+        dims = tuple(d for d in self.dimensions if d in columns)
+
+        if measure == MEASURE and len(dims) == len(columns) and (level, dims) in self.cuboids:
+            table, source = self.cuboids[(level, dims)], "cube"
+        else:
+            missing = [c for c in columns + [measure] if c not in self.df.columns]
+            if missing:
+                raise KeyError(", ".join(missing))
+            table, source = self._rollup(columns, level, measure), "raw"
+
+        for key, values in filters.items():
+            table = table[table[key].astype(str).isin([str(v) for v in values])]
+
+        keys = ([time] if time else []) + by
+        if filters or len(keys) != len(table.columns) - 2:
+            table = _regroup(table, keys)
+
+        if agg == "sum":
+            name, values = measure, table["sum"]
+        elif agg == "count":
+            name, values = "count", table["count"]
+        else:
+            name, values = f"{measure} (mean)", table["sum"] / table["count"]
+        result = table[keys].assign(**{name: values})
+        if not time:
+            result = result.sort_values(name, ascending=False)
+        return CubeResult(result.reset_index(drop=True), source)
+
+    def _rollup(self, columns: Sequence[str], level: Optional[str], measure: str) -> pd.DataFrame:
+        """Group the raw frame by period and columns, keeping sums and counts."""
+        frame = self.df[list(columns) + [measure]]
+        time_columns = _time_columns(level)
+        if time_columns:
+            dates = self.df[TIME_COLUMN]
+            frame = frame.assign(**{lvl: time_keys(dates, lvl) for lvl in time_columns})
+        keys = time_columns + list(columns)
+        if not keys:
+            values = frame[measure]
+            return pd.DataFrame({"sum": [values.sum()], "count": [values.count()]})
+        grouped = frame.groupby(keys, sort=True, observed=True, dropna=False)[measure].agg(["sum", "count"])
+        return grouped.reset_index()
+
+
+def format_answer(result: CubeResult) -> str:
+    """Render a cube answer for the LLM.
+
+    Returns:
+        The table within the tool output budgets, with its source.
+    """
+    source = "pre-aggregated sales cube" if result.source == "cube" else "full dataset"
+    return f"Result (from the {source}):\n{format_result(result.table)}"
+
+
+_cube_cache: Optional[VersionedCache] = None
+_cube_cache_lock = threading.Lock()
+
+
+def get_cube_cache() -> VersionedCache:
+    """Get the process-wide cache of the sales cube.
+
+    Returns:
+        The shared VersionedCache building a SalesCube per dataset version.
+    """
+    global _cube_cache
+    if _cube_cache is None:
+        with _cube_cache_lock:
+            if _cube_cache is None:
+                _cube_cache = VersionedCache("sales_cube", SalesCube)
+    return _cube_cache
+
+
+def get_sales_cube() -> SalesCube:
+    """Get the sales cube of the current dataset version.
+
+    Returns:
+        The shared SalesCube (the previous one while a new version builds).
+    """
+    return get_cube_cache().get()
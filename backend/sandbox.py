@@ -0,0 +1,561 @@
+"""Process sandbox for generated analysis code.
+
+This module provides the SandboxPool class, a pool of pre-forked worker
+processes that execute the code written by the analysis agents. Workers
+share the DataFrame's memory copy-on-write instead of receiving a copy.
+
+The API process forks only once: a zygote process, started with the
+dataset before the API starts any thread. Every worker (the initial ones,
+replacements of killed workers, workers for a new dataset version) is
+forked by the single-threaded zygote, so no child inherits locks held by
+the API's other threads. A new dataset version is sent to the zygote
+once, and each worker's pipe is passed back over a Unix socket.
+
+Every execution gets:
+    - a wall-clock deadline: a worker that does not answer in time is
+      killed and replaced;
+    - CPU-time and address-space limits (``resource.setrlimit``);
+    - a cap on the size of the returned result.
+
+A runaway cross join or ``apply`` loop therefore only costs one worker,
+and independent analyses run in parallel on separate cores.
+
+Configuration through environment variables:
+    SANDBOX_WORKERS: Worker processes (default TOOL_MAX_WORKERS; 0 runs
+        code in-process without limits).
+    SANDBOX_TIMEOUT: Wall-clock seconds per execution (default 30).
+    SANDBOX_CPU_SECONDS: CPU seconds per execution (default SANDBOX_TIMEOUT).
+    SANDBOX_MEMORY_MB: Extra address space a worker may allocate (default 2048).
+    SANDBOX_MAX_RESULT_BYTES: Largest result sent back (default 8 MiB).
+"""
+
+import os
+import queue
+import types
+import signal
+import socket
+import marshal
+import builtins
+import logging
+import threading
+import multiprocessing
+from multiprocessing import reduction
+from multiprocessing.connection import Connection
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from code_cache import NO_RESULT, estimate_size
+from concurrency import TOOL_MAX_WORKERS
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+SANDBOX_WORKERS = int(os.environ.get("SANDBOX_WORKERS", str(TOOL_MAX_WORKERS)))
+SANDBOX_TIMEOUT = float(os.environ.get("SANDBOX_TIMEOUT", "30"))
+SANDBOX_CPU_SECONDS = int(float(os.environ.get("SANDBOX_CPU_SECONDS", str(SANDBOX_TIMEOUT))))
+SANDBOX_MEMORY_MB = int(os.environ.get("SANDBOX_MEMORY_MB", "2048"))
+SANDBOX_MAX_RESULT_BYTES = int(os.environ.get("SANDBOX_MAX_RESULT_BYTES", str(8 * 1024 * 1024)))
+
+# Names that callers can make available to the executed code
+NAMESPACE = {
+    'pd': pd,
+    'np': np,
+    'datetime': datetime,
+}
+
+
+class SandboxError(Exception):
+    """Raised when a worker dies or returns an unusable result."""
+
+
+class SandboxTimeout(SandboxError):
+    """Raised when an execution exceeds its wall-clock deadline."""
+
+
+def run_code(
+    code: Union[str, types.CodeType],
+    df: pd.DataFrame,
+    names: Sequence[str] = ('pd',)
+) -> Any:
+    """Execute analysis code and return its ``result``.
+
+    Args:
+        code: Code (source or compiled) that stores its output in ``result``.
+        df: DataFrame exposed to the code as ``df`` (as a shallow copy, so
+            the code cannot modify it).
+        names: Names from NAMESPACE to expose as well.
+
+    Returns:
+        The value of ``result``, or NO_RESULT if it was not assigned.
+    """
+    namespace = {'__builtins__': builtins, 'df': df.copy(deep=False)}
+    namespace.update({name: NAMESPACE[name] for name in names})
+    exec(code, namespace)
+    return namespace.get('result', NO_RESULT)
+
+
+def _set_limits(cpu_seconds: int, memory_bytes: Optional[int]) -> None:
+    """Limit the CPU time of the next task and the worker's address space."""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + cpu_seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    if memory_bytes is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, hard))
+
+
+def _address_space_limit(memory_mb: int) -> Optional[int]:
+    """Current virtual memory of the process plus ``memory_mb``."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[0])
+    except (OSError, ValueError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') + memory_mb * 1024 * 1024
+
+
+def _worker_main(conn, df: pd.DataFrame, limits: Dict[str, int]) -> None:
+    """Worker loop: run requests from the pipe until it closes.
+
+    Requests are ``(code, names, frame)``, the code being source text or a
+    marshalled code object; it runs on ``frame`` when one is sent and on
+    the forked dataset otherwise. Replies are
+    ``("ok", result)``, ``("no_result", None)`` or ``("error", message)``. After a MemoryError the worker replies and
+    exits, so the pool replaces it with a clean process.
+    """
+    memory_bytes = _address_space_limit(limits["memory_mb"])
+    while True:
+        try:
+            code, names, frame = conn.recv()
+        except (EOFError, OSError):
+            return
+
+        fatal = False
+        try:
+            _set_limits(limits["cpu_seconds"], memory_bytes)
+            if isinstance(code, bytes):
+                code = marshal.loads(code)
+            result = run_code(code, df if frame is None else frame, names)
+            if result is NO_RESULT:
+                reply = ("no_result", None)
+            else:
+                size = estimate_size(result)
+                if size > limits["max_result_bytes"]:
+                    reply = ("error", (
+                        f"Result too large ({size / 1024 / 1024:.1f} MB). "
+                        "Aggregate the data or return only the first rows."
+                    ))
+                else:
+                    reply = ("ok", result)
+        except MemoryError:
+            reply = ("error", "Memory limit exceeded while executing the code.")
+            fatal = True
+        except BaseException as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+
+        try:
+            conn.send(reply)
+        except Exception:
+            # Unpicklable result: send its text, which is all callers use
+            conn.send(("ok", str(reply[1])[:limits["max_result_bytes"]]))
+        if fatal:
+            return
+
+
+def _zygote_main(
+    control,
+    fds: socket.socket,
+    parent_ends: Sequence[Any],
+    df: pd.DataFrame,
+    limits: Dict[str, int]
+) -> None:
+    """Zygote loop: fork workers on request until the control pipe closes.
+
+    Requests are ``("spawn", None)``, answered by passing the parent's end
+    of the new worker's socket over ``fds`` and then sending its pid, and
+    ``("rebind", df)``, which replaces the dataset of later workers.
+    """
+    # Copies inherited through the fork; closing them lets EOF reach the loop
+    for end in parent_ends:
+        end.close()
+    # Exited workers are reaped by the kernel, the zygote never waits
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    while True:
+        try:
+            command, payload = control.recv()
+        except (EOFError, OSError):
+            return
+
+        if command == "rebind":
+            df = payload
+            control.send(None)
+            continue
+
+        parent_end, child_end = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                control.close()
+                fds.close()
+                parent_end.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                _worker_main(Connection(child_end.detach()), df, limits)
+            except BaseException:
+                status = 1
+            finally:
+                os._exit(status)
+        child_end.close()
+        reduction.sendfds(fds, [parent_end.fileno()])
+        parent_end.close()
+        control.send(pid)
+
+
+class _Zygote:
+    """The zygote process and the parent's ends of its channels."""
+
+    def __init__(self, context, df: pd.DataFrame, limits: Dict[str, int]) -> None:
+        """Fork the zygote with a dataset."""
+        self.control, child_control = context.Pipe()
+        self.fds, child_fds = socket.socketpair()
+        self.process = context.Process(
+            target=_zygote_main,
+            args=(child_control, child_fds, (self.control, self.fds), df, limits),
+            name="sandbox-zygote",
+            daemon=True
+        )
+        self.process.start()
+        child_control.close()
+        child_fds.close()
+
+    def rebind(self, df: pd.DataFrame) -> None:
+        """Send a new dataset (pickled once) for the workers forked next."""
+        self.control.send(("rebind", df))
+        self.control.recv()
+
+    def spawn(self) -> Tuple[int, Connection]:
+        """Have the zygote fork a worker.
+
+        Returns:
+            Tuple of (worker pid, parent's end of the worker's pipe).
+        """
+        self.control.send(("spawn", None))
+        fd = reduction.recvfds(self.fds, 1)[0]
+        return self.control.recv(), Connection(fd)
+
+    def stop(self) -> None:
+        """Close the channels, letting the zygote exit."""
+        self.control.close()
+        self.fds.close()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+
+
+class _Worker:
+    """A worker process (a child of the zygote) and the parent's end of its pipe."""
+
+    def __init__(self, pid: int, conn: Connection, generation: int) -> None:
+        self.pid = pid
+        self.conn = conn
+        self.generation = generation
+
+    def is_alive(self) -> bool:
+        """Whether the process still exists."""
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def stop(self) -> None:
+        """Kill the process and close the pipe."""
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.conn.close()
+
+
+class SandboxPool:
+    """Pool of pre-forked processes executing generated code.
+
+    The pool is bound to one DataFrame at a time (identified by its dataset
+    version, or by identity when unversioned). Binding moves forward only:
+    executing against a version not seen before re-forks the workers
+    (workers busy with the old dataset finish their task and are then
+    retired), while executing against a version the pool already moved
+    past raises SandboxError instead of re-forking the pool back.
+    ``start`` binds any version explicitly (e.g. when the dataset file is
+    restored to an earlier content).
+
+    Attributes:
+        workers: Number of worker processes.
+        timeout: Wall-clock seconds per execution.
+        limits: CPU, memory and result-size limits passed to workers.
+        logger: Logger instance for the pool.
+    """
+
+    def __init__(
+        self,
+        workers: int = SANDBOX_WORKERS,
+        timeout: float = SANDBOX_TIMEOUT,
+        cpu_seconds: int = SANDBOX_CPU_SECONDS,
+        memory_mb: int = SANDBOX_MEMORY_MB,
+        max_result_bytes: int = SANDBOX_MAX_RESULT_BYTES
+    ) -> None:
+        """Initialize the pool without starting workers.
+
+        Args:
+            workers: Number of worker processes; 0 runs code in-process.
+            timeout: Wall-clock seconds per execution.
+            cpu_seconds: CPU seconds per execution.
+            memory_mb: Extra address space a worker may allocate.
+            max_result_bytes: Largest result sent back.
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.limits = {
+            "cpu_seconds": cpu_seconds,
+            "memory_mb": memory_mb,
+            "max_result_bytes": max_result_bytes,
+        }
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._context = (
+            multiprocessing.get_context('fork')
+            if 'fork' in multiprocessing.get_all_start_methods() else None
+        )
+        self._lock = threading.Lock()
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._generation = 0
+        self._df: Optional[pd.DataFrame] = None
+        self._version: Optional[str] = None
+        self._retired: Set[str] = set()
+        self._zygote: Optional[_Zygote] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether code runs in worker processes."""
+        return self.workers > 0 and self._context is not None
+
+    def start(self, df: pd.DataFrame, version: Optional[str] = None) -> None:
+        """Fork the workers for a dataset ahead of the first execution.
+
+        The first call forks the zygote, so it should happen before the
+        process starts any other thread.
+
+        Args:
+            df: Dataset exposed to the code.
+            version: Dataset version.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self._matches(df, version):
+                self._rebind(df, version)
+
+    def execute(
+        self,
+        code: Union[str, types.CodeType],
+        df: pd.DataFrame,
+        version: Optional[str] = None,
+        names: Sequence[str] = ('pd',),
+        frame: Optional[pd.DataFrame] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Execute code in a worker and return its ``result``.
+
+        Args:
+            code: Code that stores its output in ``result``, as source or
+                as a code object compiled once for several executions
+                (marshalled to the worker, which shares the interpreter).
+            df: Dataset exposed to the code as ``df``.
+            version: Dataset version (workers are re-forked when it changes).
+            names: Names from NAMESPACE to expose as well.
+            frame: Small frame to expose as ``df`` instead of the dataset
+                (e.g. a robustness fixture). It is pickled to the worker
+                with the request; the workers stay bound to ``df``.
+            timeout: Wall-clock deadline for this execution (default the
+                pool's timeout).
+
+        Returns:
+            The value of ``result``, or NO_RESULT if it was not assigned.
+
+        Raises:
+            SandboxTimeout: The deadline passed; the worker was replaced.
+            SandboxError: The worker died or the result was rejected.
+            SandboxError: ``version`` is older than the pool's dataset.
+            Exception: Errors raised by the code itself (as SandboxError
+                carrying the original message).
+        """
+        if not self.enabled:
+            return run_code(code, df if frame is None else frame, names)
+
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._acquire(df, version)
+        try:
+            request = marshal.dumps(code) if isinstance(code, types.CodeType) else code
+            worker.conn.send((request, tuple(names), frame))
+            if not worker.conn.poll(timeout):
+                self._replace(worker)
+                worker = None
+                raise SandboxTimeout(
+                    f"Execution timed out after {timeout:.0f}s. "
+                    "Simplify the code or reduce the data it processes."
+                )
+            status, payload = worker.conn.recv()
+        except (EOFError, OSError):
+            self._replace(worker)
+            worker = None
+            raise SandboxError(
+                "The execution was stopped (CPU or memory limit exceeded)."
+            )
+        finally:
+            if worker is not None:
+                self._release(worker)
+
+        if status == "ok":
+            return payload
+        if status == "no_result":
+            return NO_RESULT
+        raise SandboxError(payload)
+
+    def shutdown(self) -> None:
+        """Stop every idle worker and retire busy ones when they finish."""
+        with self._lock:
+            self._generation += 1
+            self._df = None
+            self._version = None
+            self._retired.clear()
+            self._drain()
+            if self._zygote is not None:
+                self._zygote.stop()
+                self._zygote = None
+
+    def _matches(self, df: pd.DataFrame, version: Optional[str]) -> bool:
+        """Whether the workers were forked for this dataset."""
+        if self._df is None:
+            return False
+        if version is not None or self._version is not None:
+            return version == self._version
+        return df is self._df
+
+    def _rebind(self, df: pd.DataFrame, version: Optional[str]) -> None:
+        """Retire the current workers and fork new ones for ``df``."""
+        self._generation += 1
+        if self._version is not None:
+            self._retired.add(self._version)
+        self._retired.discard(version)
+        self._df = df
+        self._version = version
+        self._drain()
+        if self._zygote is None:
+            if threading.active_count() > 1:
+                self.logger.warning(
+                    "⚠️  Forking the sandbox zygote from a multi-threaded process; "
+                    "start the pool before starting threads"
+                )
+            self._zygote = _Zygote(self._context, df, self.limits)
+        else:
+            self._zygote.rebind(df)
+        self.logger.info(
+            f"🔒 Forking {self.workers} sandbox workers"
+            f"{f' for dataset version {version}' if version else ''}"
+        )
+        for _ in range(self.workers):
+            self._idle.put(self._spawn())
+
+    def _drain(self) -> None:
+        """Stop all idle workers."""
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+    def _spawn(self) -> _Worker:
+        """Have the zygote fork a worker for the current dataset."""
+        try:
+            pid, conn = self._zygote.spawn()
+        except (EOFError, OSError):
+            self.logger.warning("⚠️  Sandbox zygote is gone, forking a new one")
+            self._zygote.stop()
+            self._zygote = _Zygote(self._context, self._df, self.limits)
+            pid, conn = self._zygote.spawn()
+        return _Worker(pid, conn, self._generation)
+
+    def _acquire(self, df: pd.DataFrame, version: Optional[str]) -> _Worker:
+        """Take an idle worker forked for ``df``, re-forking if needed."""
+        while True:
+            with self._lock:
+                if not self._matches(df, version):
+                    if version is not None and version in self._retired:
+                        raise SandboxError(
+                            f"The dataset was reloaded (version {version} is no longer "
+                            "current) while this analysis ran. Run it again."
+                        )
+                    self._rebind(df, version)
+                generation = self._generation
+            worker = self._idle.get()
+            if worker.generation == generation:
+                return worker
+            # Forked for a dataset another caller switched to meanwhile
+            self._release(worker)
+
+    def _release(self, worker: _Worker) -> None:
+        """Return a worker to the pool, or retire it if it is outdated."""
+        with self._lock:
+            if worker.generation != self._generation:
+                worker.stop()
+                return
+            if not worker.is_alive():
+                worker.stop()
+                worker = self._spawn()
+            self._idle.put(worker)
+
+    def _replace(self, worker: _Worker) -> None:
+        """Kill a hung or dead worker and fork a replacement."""
+        self.logger.warning("⚠️  Killing sandbox worker and forking a replacement")
+        worker.stop()
+        with self._lock:
+            if worker.generation == self._generation:
+                self._idle.put(self._spawn())
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """Get the process-wide sandbox pool.
+
+    Returns:
+        The shared SandboxPool, created on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SandboxPool()
+    return _pool
+
+
+def shutdown_sandbox_pool() -> None:
+    """Stop the sandbox workers."""
+    if _pool is not None:
+        _pool.shutdown()
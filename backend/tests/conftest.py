@@ -35,6 +35,33 @@ def empty_dataframe():
     return pd.DataFrame()
 
 
+@pytest.fixture
+def csv_path(tmp_path):
+    """Write a small CSV in the train.csv layout.
+
+    Returns:
+        str: Path to the CSV file.
+    """
+    path = tmp_path / "train.csv"
+    path.write_text(
+        "Row ID,Order ID,Order Date,Ship Date,Category,Postal Code,Sales\n"
+        "1,A001,08/11/2017,11/11/2017,Furniture,42420,261.96\n"
+        "2,A002,12/06/2017,16/06/2017,Technology,,14.62\n"
+    )
+    return str(path)
+
+
+@pytest.fixture
+def registry(csv_path):
+    """Create a dataset registry over the sample CSV.
+    
+    Returns:
+        DatasetRegistry: Registry reading ``csv_path``.
+    """
+    from dataset_registry import DatasetRegistry
+    return DatasetRegistry(csv_path)
+
+
 @pytest.fixture
 def mock_llm():
     """Create a mock LLM for testing.
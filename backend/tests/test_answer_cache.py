@@ -0,0 +1,157 @@
+"""Unit tests for AnswerCache class.
+
+This module tests normalization, TTL and LRU eviction, near-duplicate
+matching, warming queries and the pipeline integration.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from answer_cache import AnswerCache, load_warm_queries, normalize_question
+from agent_pipeline import AgentPipeline
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Answer cache in a temporary database."""
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"))
+    yield cache
+    cache.close()
+
+
+class TestAnswerCache:
+    """Test suite for AnswerCache class."""
+
+    def test_normalize_question(self):
+        """Test that case, accents and punctuation are ignored."""
+        assert normalize_question("  Total de VENDAS, por categoria?") == \
+            normalize_question("total de vendas por categoria")
+        assert normalize_question("Qual a média?") == "qual a media"
+
+    def test_exact_hit(self, cache):
+        """Test that a normalized question hits the stored answer."""
+        cache.put("Total sales by category", "v1", "Furniture: 10")
+
+        assert cache.get("total sales by category?", "v1") == "Furniture: 10"
+        assert cache.stats["hits"] == 1
+
+    def test_version_is_part_of_key(self, cache):
+        """Test that a new dataset version misses."""
+        cache.put("Total sales by category", "v1", "Furniture: 10")
+
+        assert cache.get("Total sales by category", "v2") is None
+
+    def test_persists_on_disk(self, tmp_path):
+        """Test that answers survive reopening the cache."""
+        path = str(tmp_path / "answers.sqlite3")
+        first = AnswerCache(path)
+        first.put("Top 10 customers", "v1", "Alice, Bob")
+        first.close()
+
+        second = AnswerCache(path)
+        assert second.get("Top 10 customers", "v1") == "Alice, Bob"
+        second.close()
+
+    def test_ttl_expiry(self, tmp_path, monkeypatch):
+        """Test that expired answers are not returned."""
+        cache = AnswerCache(str(tmp_path / "answers.sqlite3"), ttl=60)
+        monkeypatch.setattr("answer_cache.time.time", lambda: 1000.0)
+        cache.put("Top 10 customers", "v1", "Alice, Bob")
+
+        monkeypatch.setattr("answer_cache.time.time", lambda: 1061.0)
+        assert cache.get("Top 10 customers", "v1") is None
+        cache.close()
+
+    def test_lru_eviction(self, tmp_path, monkeypatch):
+        """Test that the least recently used answer is evicted."""
+        cache = AnswerCache(str(tmp_path / "answers.sqlite3"), max_entries=2)
+        clock = iter(range(1000, 2000))
+        monkeypatch.setattr("answer_cache.time.time", lambda: float(next(clock)))
+        cache.put("question a", "v1", "A")
+        cache.put("question b", "v1", "B")
+        cache.get("question a", "v1")
+        cache.put("question c", "v1", "C")
+
+        assert cache.get("question a", "v1") == "A"
+        assert cache.get("question b", "v1") is None
+        assert cache.get("question c", "v1") == "C"
+        cache.close()
+
+    def test_failures_not_stored(self, cache):
+        """Test that error answers are not cached."""
+        cache.put("Top 10 customers", "v1", "Erro ao processar: timeout")
+
+        assert cache.get("Top 10 customers", "v1") is None
+
+    def test_near_duplicate(self, tmp_path):
+        """Test near-duplicate matching and that numbers must agree."""
+        cache = AnswerCache(str(tmp_path / "answers.sqlite3"), similarity_threshold=0.7)
+        cache.put("Quais são os 10 maiores clientes?", "v1", "Top 10")
+
+        assert cache.get("quais os 10 maiores clientes", "v1") == "Top 10"
+        assert cache.get("Quais são os 5 maiores clientes?", "v1") is None
+        assert cache.stats["near_hits"] == 1
+        cache.close()
+
+    def test_near_duplicate_disabled_by_default(self, cache):
+        """Test that only exact questions match without a threshold."""
+        cache.put("Quais são os 10 maiores clientes?", "v1", "Top 10")
+
+        assert cache.get("quais os 10 maiores clientes", "v1") is None
+
+    def test_load_warm_queries(self):
+        """Test that QUERIES.md documents questions to warm."""
+        queries = load_warm_queries()
+
+        assert "Total sales by category" in queries
+        assert len(queries) >= 6
+
+
+class TestPipelineAnswerCache:
+    """Test suite for the answer cache in AgentPipeline."""
+
+    @pytest.fixture
+    def pipeline(self, mock_llm, sample_dataframe, cache):
+        """Pipeline with mocked agents and an answer cache."""
+        pipeline = AgentPipeline(
+            mock_llm, sample_dataframe, answer_cache=cache, dataset_version="v1"
+        )
+        pipeline.intent_evaluator.invoke = Mock(return_value="ALLOWED")
+        pipeline.analytics_agent.invoke = Mock(return_value="Analytics response")
+        return pipeline
+
+    def test_repeated_question_skips_agents(self, pipeline):
+        """Test that the second identical question uses no agent."""
+        pipeline.process_query("Total sales by category")
+        pipeline.process_query("total sales by category?")
+
+        pipeline.intent_evaluator.invoke.assert_called_once()
+        pipeline.analytics_agent.invoke.assert_called_once()
+
+    def test_rejections_not_cached(self, pipeline):
+        """Test that rejected queries are evaluated every time."""
+        pipeline.intent_evaluator.invoke = Mock(return_value="Blocked message")
+
+        pipeline.process_query("Tell me about your weekend")
+        pipeline.process_query("Tell me about your weekend")
+
+        assert pipeline.intent_evaluator.invoke.call_count == 2
+
+    def test_async_hit(self, pipeline):
+        """Test that the async path returns cached answers."""
+        pipeline.process_query("Top 10 customers")
+        pipeline.analytics_agent.ainvoke = AsyncMock()
+
+        result = asyncio.run(pipeline.aprocess_query("Top 10 customers"))
+
+        assert result == "Analytics response"
+        pipeline.analytics_agent.ainvoke.assert_not_awaited()
+
+    def test_warm_cache(self, pipeline):
+        """Test that warming answers only uncached questions."""
+        pipeline.process_query("Top 10 customers")
+
+        warmed = pipeline.warm_cache(["Top 10 customers", "Total sales by category"])
+
+        assert warmed == 1
+        assert pipeline.analytics_agent.invoke.call_count == 2
@@ -12,3 +12,163 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+def test_chat_history_since_cursor(tmp_path, monkeypatch):
+    import main
+    from chat_store import ChatStore
+    store = ChatStore(str(tmp_path / "chat.sqlite3"))
+    monkeypatch.setattr(main, "get_chat_store", lambda: store)
+    first = main.record_message("user", "a")
+    last = main.record_message("agent", "b")
+
+    response = client.get(f"/api/chat/history?since={first.id}")
+    assert response.status_code == 200
+    assert response.json() == {
+        "messages": [last.model_dump()],
+        "cursor": last.id,
+        "has_more": False,
+    }
+    assert client.get(f"/api/chat/history?since={last.id}").json()["messages"] == []
+
+def test_chat_is_served_by_the_pipeline(tmp_path, monkeypatch):
+    import main
+    import agent_pipeline
+    from chat_store import ChatStore
+    store = ChatStore(str(tmp_path / "chat.sqlite3"))
+    monkeypatch.setattr(main, "get_chat_store", lambda: store)
+    monkeypatch.setattr(agent_pipeline, "get_pipeline", lambda: None)
+
+    response = client.post("/api/chat", json={"message": "Total de vendas"})
+    assert response.json()["message"] == agent_pipeline.MISSING_API_KEY_MESSAGE
+
+    stream = client.post("/api/chat/stream", json={"message": "Total de vendas"})
+    assert agent_pipeline.MISSING_API_KEY_MESSAGE in stream.text
+
+def test_cached_answer_makes_no_llm_call(tmp_path, monkeypatch, registry):
+    import main
+    import agent_pipeline
+    from unittest.mock import AsyncMock, patch
+    from chat_store import ChatStore
+    store = ChatStore(str(tmp_path / "chat.sqlite3"))
+    monkeypatch.setattr(main, "get_chat_store", lambda: store)
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(agent_pipeline, "ANSWER_CACHE_PATH", str(tmp_path / "answers.sqlite3"))
+    provider = agent_pipeline.PipelineProvider(registry)
+    provider._setup_done = True
+    monkeypatch.setattr(agent_pipeline, "_provider", provider)
+
+    with patch("langchain_google_genai.ChatGoogleGenerativeAI"):
+        pipeline = provider.get()
+    pipeline.answer_cache.put("Total de vendas", pipeline.dataset_version, "R$ 276,58")
+    llm_call = AsyncMock(side_effect=AssertionError("LLM called on a cache hit"))
+    monkeypatch.setattr(pipeline.intent_evaluator, "ainvoke", llm_call)
+    monkeypatch.setattr(pipeline.analytics_agent, "ainvoke", llm_call)
+    monkeypatch.setattr(pipeline.analytics_agent, "astream", llm_call)
+
+    response = client.post("/api/chat", json={"message": "Total de vendas"})
+    assert response.json()["message"] == "R$ 276,58"
+
+    stream = client.post("/api/chat/stream", json={"message": "Total de vendas"})
+    assert "R$ 276,58" in stream.text
+    llm_call.assert_not_called()
+
+def test_chat_store_writes_leave_the_event_loop(tmp_path, monkeypatch):
+    import main
+    import asyncio
+    import agent_pipeline
+    from chat_store import ChatStore
+    store = ChatStore(str(tmp_path / "chat.sqlite3"))
+    monkeypatch.setattr(main, "get_chat_store", lambda: store)
+    monkeypatch.setattr(agent_pipeline, "get_pipeline", lambda: None)
+    append = store.append
+    on_loop = []
+
+    def recording_append(*args):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return append(*args)
+
+    monkeypatch.setattr(store, "append", recording_append)
+    client.post("/api/chat", json={"message": "Total de vendas"})
+    client.post("/api/chat/stream", json={"message": "Total de vendas"})
+
+    assert on_loop == [False] * 4
+
+def test_streamed_reply_skips_the_sender_socket(tmp_path, monkeypatch):
+    import main
+    import agent_pipeline
+    from chat_store import ChatStore
+    store = ChatStore(str(tmp_path / "chat.sqlite3"))
+    monkeypatch.setattr(main, "get_chat_store", lambda: store)
+    monkeypatch.setattr(agent_pipeline, "get_pipeline", lambda: None)
+
+    with client.websocket_connect("/ws/chat") as sender, client.websocket_connect("/ws/chat") as peer:
+        hello = sender.receive_json()
+        assert hello["type"] == "connected"
+        assert peer.receive_json()["type"] == "connected"
+
+        client.post(
+            "/api/chat/stream",
+            json={"message": "Total de vendas", "connection_id": hello["connection_id"]}
+        )
+        sender.send_text("ping")
+
+        assert peer.receive_json()["content"] == agent_pipeline.MISSING_API_KEY_MESSAGE
+        assert sender.receive_text() == "Received: ping"
+
+def test_websocket_metrics():
+    response = client.get("/api/ws/metrics")
+    assert response.status_code == 200
+    assert response.json()["active_connections"] == 0
+
+def test_websocket_metrics_per_hub():
+    assert client.get("/api/ws/metrics?hub=dashboard").json()["name"] == "dashboard"
+    assert client.get("/api/ws/metrics?hub=unknown").status_code == 404
+
+def test_execution_cache_metrics():
+    response = client.get("/api/cache/metrics")
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions", "entries", "bytes", "hit_rate"} <= set(response.json())
+
+def test_conditional_get_returns_not_modified():
+    for url in ("/api/dashboard/metrics", "/api/dashboard/preview?skip=5&limit=3"):
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert "max-age" in response.headers["cache-control"]
+
+        revalidated = client.get(url, headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+        assert revalidated.content == b""
+    assert client.get("/api/dashboard/preview?skip=6&limit=3").headers["etag"] != etag
+
+def test_preview_columns_format():
+    rows = client.get("/api/dashboard/preview?skip=3&limit=4&columns=Order Date,Sales").json()
+    page = client.get("/api/dashboard/preview?skip=3&limit=4&columns=Order Date,Sales&format=columns").json()
+    assert page["format"] == "columns"
+    assert page["columns"] == rows["columns"] == ["Order Date", "Sales"]
+    assert page["total"] == rows["total"]
+    assert [dict(zip(page["columns"], values)) for values in zip(*page["data"].values())] == rows["data"]
+
+def test_export_dataset_stream():
+    response = client.get("/api/export/dataset?format=csv&columns=Region,Sales&filter=Region=West")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0] == "Region,Sales"
+    assert len(lines) > 1 and all(line.startswith("West,") for line in lines[1:])
+    assert client.get("/api/export/dataset?columns=Missing").status_code == 400
+    assert client.get("/api/export/results/r-expired").status_code == 404
+
+def test_sales_cube_query():
+    response = client.get("/api/cube?by=Region&time=year&filter=Category=Furniture")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["source"] == "cube"
+    assert body["columns"] == ["year", "Region", "Sales"]
+    assert len(body["data"]["Sales"]) == body["rows"]
+    assert client.get("/api/cube?by=Missing").status_code == 400
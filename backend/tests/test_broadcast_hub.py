@@ -0,0 +1,168 @@
+"""Unit tests for the WebSocket broadcast hub.
+
+This module tests fan-out through per-connection queues, the slow-consumer
+policies and the removal of dead connections.
+"""
+
+import asyncio
+import json
+import pytest
+from broadcast_hub import BroadcastHub
+
+
+class FakeSocket:
+    """WebSocket stand-in recording sent texts.
+
+    Attributes:
+        sent: Texts sent so far.
+        gate: Event a blocked socket waits for before sending.
+        fail: Whether sends raise.
+        closed: Close code, once closed.
+    """
+
+    def __init__(self, blocked: bool = False, fail: bool = False) -> None:
+        self.sent = []
+        self.gate = asyncio.Event()
+        if not blocked:
+            self.gate.set()
+        self.fail = fail
+        self.closed = None
+
+    async def send_text(self, text: str) -> None:
+        await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("connection reset")
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = code
+
+
+async def _drain() -> None:
+    """Let the writer tasks run."""
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+class TestBroadcastHub:
+    """Test suite for BroadcastHub."""
+
+    def test_fan_out(self):
+        """Test that a message reaches every other connection of the session."""
+        async def scenario():
+            hub = BroadcastHub("test")
+            sender, peer, other = FakeSocket(), FakeSocket(), FakeSocket()
+            hub.connect(sender, "s1")
+            hub.connect(peer, "s1")
+            hub.connect(other, "s2")
+
+            queued = hub.broadcast({"content": "olá"}, exclude=sender, session_id="s1")
+            await _drain()
+            await hub.close()
+            return queued, sender.sent, peer.sent, other.sent
+
+        queued, sender_sent, peer_sent, other_sent = asyncio.run(scenario())
+
+        assert queued == 1
+        assert sender_sent == [] and other_sent == []
+        assert [json.loads(text) for text in peer_sent] == [{"content": "olá"}]
+
+    def test_find_by_connection_id(self):
+        """Test that a connection's socket is found by its id until it closes."""
+        async def scenario():
+            hub = BroadcastHub("test")
+            socket = FakeSocket()
+            connection = hub.connect(socket, "s1")
+            found = hub.find(connection.id)
+            hub.disconnect(socket)
+            await hub.close()
+            return found is socket, hub.find(connection.id)
+
+        found, after_close = asyncio.run(scenario())
+
+        assert found and after_close is None
+
+    def test_direct_sends_keep_order(self):
+        """Test that sends to one connection interleave with broadcasts in order."""
+        async def scenario():
+            hub = BroadcastHub("test")
+            socket = FakeSocket()
+            hub.connect(socket, "s1")
+
+            hub.send(socket, {"type": "token"})
+            hub.broadcast({"type": "message"})
+            hub.send_text(socket, "Received: hi")
+            queued = hub.send_text(FakeSocket(), "unknown")
+            await _drain()
+            await hub.close()
+            return queued, socket.sent
+
+        queued, sent = asyncio.run(scenario())
+
+        assert queued is False
+        assert sent == ['{"type": "token"}', '{"type": "message"}', "Received: hi"]
+
+    def test_slow_consumer_does_not_block_others(self):
+        """Test that a stuck client drops its oldest messages only."""
+        async def scenario():
+            hub = BroadcastHub("test", queue_size=2, policy="drop_oldest")
+            slow, fast = FakeSocket(blocked=True), FakeSocket()
+            hub.connect(slow)
+            hub.connect(fast)
+
+            for i in range(5):
+                hub.broadcast({"n": i})
+                await _drain()
+            stats = hub.get_stats()
+            slow.gate.set()
+            await _drain()
+            await hub.close()
+            return stats, slow.sent, fast.sent
+
+        stats, slow_sent, fast_sent = asyncio.run(scenario())
+
+        assert [json.loads(t)["n"] for t in fast_sent] == [0, 1, 2, 3, 4]
+        # One message was in flight, the queue kept the two newest
+        assert [json.loads(t)["n"] for t in slow_sent] == [0, 3, 4]
+        assert stats["dropped"] == 2
+        assert stats["active_connections"] == 2
+
+    def test_disconnect_policy(self):
+        """Test that slow consumers are closed under the disconnect policy."""
+        async def scenario():
+            hub = BroadcastHub("test", queue_size=1, policy="disconnect")
+            slow = FakeSocket(blocked=True)
+            hub.connect(slow)
+
+            for i in range(3):
+                hub.broadcast({"n": i})
+                await _drain()
+            stats = hub.get_stats()
+            await hub.close()
+            return stats, slow.closed
+
+        stats, closed = asyncio.run(scenario())
+
+        assert stats["active_connections"] == 0
+        assert stats["disconnected_slow"] == 1
+        assert closed == 1013
+
+    def test_dead_connection_is_removed(self):
+        """Test that a failing socket is unregistered."""
+        async def scenario():
+            hub = BroadcastHub("test")
+            hub.connect(FakeSocket(fail=True))
+
+            hub.broadcast({"n": 1})
+            await _drain()
+            return hub.get_stats()
+
+        stats = asyncio.run(scenario())
+
+        assert stats["active_connections"] == 0
+        assert stats["send_errors"] == 1
+
+    def test_unknown_policy(self):
+        """Test that an unknown policy is rejected."""
+        with pytest.raises(ValueError):
+            BroadcastHub("test", policy="block")
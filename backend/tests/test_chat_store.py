@@ -0,0 +1,113 @@
+"""Unit tests for the persistent chat history.
+
+This module tests ChatStore: persistence, per-session partitioning,
+cursor-based reads and the retention limits.
+"""
+
+import time
+import pytest
+from unittest.mock import patch
+from chat_store import ChatStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Chat store over a temporary database with small limits."""
+    store = ChatStore(str(tmp_path / "chat.sqlite3"), max_messages=5, recent_size=3)
+    yield store
+    store.close()
+
+
+class TestChatStore:
+    """Test suite for ChatStore."""
+
+    def test_append_and_history(self, store):
+        """Test that messages come back in order with increasing ids."""
+        first = store.append("user", "Total de vendas?")
+        second = store.append("agent", "$ 2.297.200,86")
+
+        messages, has_more = store.history()
+
+        assert [m["content"] for m in messages] == ["Total de vendas?", "$ 2.297.200,86"]
+        assert int(second["id"]) > int(first["id"])
+        assert set(first) == {"id", "role", "content", "timestamp"}
+        assert not has_more
+
+    def test_since_cursor(self, store):
+        """Test that only messages after the cursor are returned."""
+        first = store.append("user", "a")
+        store.append("agent", "b")
+
+        messages, _ = store.history(since=int(first["id"]))
+
+        assert [m["content"] for m in messages] == ["b"]
+
+    def test_sessions_are_partitioned(self, store):
+        """Test that sessions do not see each other's messages."""
+        store.append("user", "mine", session="s1")
+        store.append("user", "theirs", session="s2")
+
+        assert [m["content"] for m in store.history("s1")[0]] == ["mine"]
+        assert [m["content"] for m in store.history("s2")[0]] == ["theirs"]
+
+    def test_reads_beyond_ring_buffer(self, store):
+        """Test that old cursors are served from the database."""
+        ids = [store.append("user", str(i))["id"] for i in range(5)]
+        store.history()
+        store.append("user", "5")
+
+        from_memory, _ = store.history(since=int(ids[3]))
+        with patch.object(store, "_conn", wraps=store._conn) as conn:
+            from_disk, _ = store.history(since=int(ids[1]))
+
+        assert [m["content"] for m in from_memory] == ["4", "5"]
+        assert [m["content"] for m in from_disk] == ["2", "3", "4", "5"]
+        assert conn.execute.called
+
+    def test_sees_other_process_messages(self, store, tmp_path):
+        """Test that a buffered session picks up messages written by another worker."""
+        other = ChatStore(str(tmp_path / "chat.sqlite3"), max_messages=5, recent_size=3)
+        store.append("user", "a")
+        store.history()
+
+        other.append("agent", "b")
+        after_read, _ = store.history()
+        other.append("agent", "c")
+        store.append("user", "d")
+        after_append, _ = store.history()
+        other.close()
+
+        assert [m["content"] for m in after_read] == ["a", "b"]
+        assert [m["content"] for m in after_append] == ["a", "b", "c", "d"]
+
+    def test_paging(self, store):
+        """Test that limit pages through the history."""
+        for i in range(4):
+            store.append("user", str(i))
+
+        page, has_more = store.history(limit=3)
+        rest, more_after = store.history(since=int(page[-1]["id"]), limit=3)
+
+        assert [m["content"] for m in page] == ["0", "1", "2"]
+        assert has_more
+        assert [m["content"] for m in rest] == ["3"]
+        assert not more_after
+
+    def test_per_session_limit(self, store):
+        """Test that only the newest messages of a session are kept."""
+        for i in range(8):
+            store.append("user", str(i))
+
+        messages, _ = store.history()
+
+        assert [m["content"] for m in messages] == ["3", "4", "5", "6", "7"]
+
+    def test_persistence_and_retention(self, tmp_path):
+        """Test that messages survive reopening until they expire."""
+        path = str(tmp_path / "chat.sqlite3")
+        ChatStore(path).append("user", "hello")
+
+        assert [m["content"] for m in ChatStore(path).history()[0]] == ["hello"]
+
+        with patch("chat_store.time.time", return_value=time.time() + 2 * 24 * 3600):
+            assert ChatStore(path, retention_days=1).history()[0] == []
@@ -0,0 +1,194 @@
+"""Unit tests for ExecutionCache class.
+
+This module tests AST fingerprints, memoization per dataset version, the
+memory budget and the DataTools integration.
+"""
+
+import threading
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from code_cache import NO_RESULT, ExecutionCache, code_fingerprint
+from agents.tools import DataTools
+
+
+class TestCodeFingerprint:
+    """Test suite for code_fingerprint."""
+
+    def test_ignores_formatting(self):
+        """Test that whitespace, comments and quotes do not change the hash."""
+        a = "result = df.groupby('Category')['Sales'].sum()"
+        b = '# total per category\nresult = df.groupby( "Category" )["Sales"].sum()\n'
+
+        assert code_fingerprint(a) == code_fingerprint(b)
+
+    def test_different_code(self):
+        """Test that different code has a different hash."""
+        assert code_fingerprint("result = df['Sales'].sum()") != \
+            code_fingerprint("result = df['Sales'].mean()")
+
+    @pytest.mark.parametrize("code", [
+        "result = df.sample(5)",
+        "import random\nresult = random.choice([1, 2])",
+        "from datetime import datetime\nresult = datetime.now()",
+        "result = (",
+    ])
+    def test_uncacheable(self, code):
+        """Test that random, time-dependent or invalid code is not cached."""
+        assert code_fingerprint(code) is None
+
+
+class TestExecutionCache:
+    """Test suite for ExecutionCache class."""
+
+    def test_memoizes_per_version(self):
+        """Test that the same code runs once per dataset version."""
+        cache = ExecutionCache()
+        calls = []
+
+        def execute():
+            calls.append(1)
+            return 42
+
+        assert cache.run("result = 42", "v1", execute) == 42
+        assert cache.run("result  =  42", "v1", execute) == 42
+        assert cache.run("result = 42", "v2", execute) == 42
+
+        assert len(calls) == 2
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+    def test_hits_return_copies(self):
+        """Test that changing a returned result does not alter later hits."""
+        cache = ExecutionCache()
+
+        def execute():
+            return pd.DataFrame({'Sales': [1.0, 2.0]})
+
+        first = cache.run("result = df", "v1", execute)
+        first.loc[0, 'Sales'] = 99.0
+        first['Extra'] = 1
+        second = cache.run("result = df", "v1", execute)
+        nested = cache.run("result = [[1], 2]", "v1", lambda: [[1], 2])
+        nested[0].append(3)
+
+        assert list(second.columns) == ['Sales']
+        assert second['Sales'].tolist() == [1.0, 2.0]
+        assert cache.run("result = [[1], 2]", "v1", lambda: [[1], 2]) == [[1], 2]
+        assert cache.get_stats()["hits"] == 2
+
+    def test_discarded_result_not_cached(self):
+        """Test that a result the caller discards is returned but not cached."""
+        cache = ExecutionCache()
+        calls = []
+
+        def execute():
+            calls.append(1)
+            return 42
+
+        assert cache.run("result = 42", "v1", execute, discard=lambda: True) == 42
+        assert cache.run("result = 42", "v1", execute) == 42
+        assert cache.run("result = 42", "v1", execute) == 42
+
+        assert len(calls) == 2
+
+    def test_no_version_disables_caching(self):
+        """Test that results are not cached without a dataset version."""
+        cache = ExecutionCache()
+        calls = []
+
+        cache.run("result = 1", None, lambda: calls.append(1))
+        cache.run("result = 1", None, lambda: calls.append(1))
+
+        assert len(calls) == 2
+        assert cache.get_stats()["uncacheable"] == 2
+
+    def test_exceptions_not_cached(self):
+        """Test that failing code runs again next time."""
+        cache = ExecutionCache()
+
+        def fail():
+            raise KeyError("Missing")
+
+        with pytest.raises(KeyError):
+            cache.run("result = df['Missing']", "v1", fail)
+        assert cache.run("result = df['Missing']", "v1", lambda: 1) == 1
+
+    def test_lru_eviction_under_budget(self):
+        """Test that the least recently used results are evicted."""
+        frame = pd.DataFrame({"x": range(100)})
+        size = int(frame.memory_usage(deep=True).sum())
+        cache = ExecutionCache(max_bytes=size * 2 + 10)
+
+        cache.run("result = 1", "v1", lambda: frame)
+        cache.run("result = 2", "v1", lambda: frame.copy())
+        cache.run("result = 1", "v1", lambda: None)
+        cache.run("result = 3", "v1", lambda: frame.copy())
+
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= cache.max_bytes
+        cached = cache.run("result = 1", "v1", lambda: "recomputed")
+        assert cached.equals(frame) and cached is not frame
+        assert cache.run("result = 2", "v1", lambda: "recomputed") == "recomputed"
+
+    def test_oversized_result_not_cached(self):
+        """Test that results larger than the budget are not kept."""
+        cache = ExecutionCache(max_bytes=10)
+
+        cache.run("result = 1", "v1", lambda: pd.DataFrame({"x": range(100)}))
+
+        assert cache.get_stats()["entries"] == 0
+
+    def test_concurrent_runs_collapse(self):
+        """Test that concurrent identical runs execute once."""
+        cache = ExecutionCache()
+        release = threading.Event()
+        calls = []
+
+        def execute():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "done"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.run("result = 1", "v1", execute)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["done"] * 4
+        assert len(calls) == 1
+
+
+class TestDataToolsMemoization:
+    """Test suite for memoized DataTools.execute_python_analysis."""
+
+    def test_repeated_code_executes_once(self, sample_dataframe):
+        """Test that identical code reuses the cached result."""
+        tools = DataTools(sample_dataframe, dataset_version="v1")
+
+        with patch("agents.tools.get_execution_cache", return_value=ExecutionCache()):
+            with patch.object(tools, "_run_code", wraps=tools._run_code) as run_code:
+                first = tools.execute_python_analysis("result = df['Sales'].sum()")
+                second = tools.execute_python_analysis("```python\nresult = df['Sales'].sum()\n```")
+
+        assert first == second
+        assert "825.0" in first
+        run_code.assert_called_once()
+
+    def test_missing_result_message(self, sample_dataframe):
+        """Test that code without ``result`` still gets the hint."""
+        tools = DataTools(sample_dataframe, dataset_version="v1")
+
+        with patch("agents.tools.get_execution_cache", return_value=ExecutionCache()):
+            output = tools.execute_python_analysis("total = df['Sales'].sum()")
+
+        assert "'result'" in output
+        assert tools._run_code("total = 1") is NO_RESULT
@@ -0,0 +1,108 @@
+"""Unit tests for the static code validator.
+
+This module tests CodeValidator and its use as a pre-flight check in
+DataTools.execute_python_analysis.
+"""
+
+import pytest
+from unittest.mock import patch
+from agents.code_validator import CodeValidator
+from agents.tools import DataTools
+
+
+@pytest.fixture
+def validator(sample_dataframe):
+    """Validator over the sample DataFrame schema."""
+    catalog = {"Sales": {"short description": "Sales amount"}}
+    return CodeValidator(sample_dataframe.columns, catalog)
+
+
+class TestCodeValidator:
+    """Test suite for CodeValidator."""
+
+    def test_valid_code_passes(self, validator):
+        """Test that well-formed code yields no issues."""
+        code = (
+            "import numpy as np\n"
+            "totals = df.groupby('Category')['Sales'].sum()\n"
+            "result = totals.sort_values(ascending=False).head(np.int64(3))"
+        )
+
+        assert validator.validate(code) == []
+
+    def test_unknown_column_suggests_match(self, validator):
+        """Test that a misspelled column gets the closest real one."""
+        issues = validator.validate("result = df['sales'].sum()")
+
+        assert len(issues) == 1
+        assert "'sales'" in issues[0]
+        assert "'Sales' (Sales amount)" in issues[0]
+
+    def test_unknown_column_in_groupby(self, validator):
+        """Test that groupby keys are checked against the schema."""
+        issues = validator.validate("result = df.groupby(['Region', 'Category']).size()")
+
+        assert len(issues) == 1
+        assert "'Region'" in issues[0]
+
+    def test_created_columns_are_allowed(self, validator):
+        """Test that columns created by the code are not reported."""
+        code = (
+            "df['Month'] = df['Order Date'].dt.month\n"
+            "result = df.groupby('Month')['Sales'].sum()"
+        )
+
+        assert validator.validate(code) == []
+
+    def test_missing_result(self, validator):
+        """Test that code without a ``result`` assignment is rejected."""
+        issues = validator.validate("total = df['Sales'].sum()")
+
+        assert issues == [
+            "The final value is never assigned to 'result' "
+            "(e.g. `result = df['Sales'].sum()`)."
+        ]
+
+    def test_syntax_error(self, validator):
+        """Test that syntax errors are reported with the line number."""
+        issues = validator.validate("result = df['Sales'].sum(")
+
+        assert len(issues) == 1
+        assert issues[0].startswith("Syntax error on line 1")
+
+    @pytest.mark.parametrize("code", [
+        "result = pd.read_csv('other.csv')",
+        "import os\nresult = os.listdir('.')",
+        "result = open('/etc/passwd').read()",
+        "df.to_csv('out.csv')\nresult = 1",
+    ])
+    def test_io_is_rejected(self, validator, code):
+        """Test that file and process I/O is rejected."""
+        assert any("not allowed" in issue for issue in validator.validate(code))
+
+    def test_undefined_name_gets_import_hint(self, validator):
+        """Test that a missing import is reported with the fix."""
+        issues = validator.validate("result = np.mean(df['Sales'])")
+
+        assert issues == ["`np` is not defined; add `import numpy as np`."]
+
+
+class TestDataToolsPreflight:
+    """Test suite for the pre-flight check in execute_python_analysis."""
+
+    def test_invalid_code_is_not_executed(self, sample_dataframe):
+        """Test that rejected code returns feedback without running."""
+        tools = DataTools(sample_dataframe)
+
+        with patch.object(tools, "_run_code") as run_code:
+            output = tools.execute_python_analysis("result = df['Revenue'].sum()")
+
+        run_code.assert_not_called()
+        assert "NÃO foi executado" in output
+        assert "'Revenue'" in output
+
+    def test_valid_code_is_executed(self, sample_dataframe):
+        """Test that code passing the checks runs normally."""
+        tools = DataTools(sample_dataframe)
+
+        assert "825.0" in tools.execute_python_analysis("result = df['Sales'].sum()")
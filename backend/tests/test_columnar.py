@@ -0,0 +1,45 @@
+"""Unit tests for column-oriented JSON encoding.
+
+This module tests the vectorized per-column conversion of nulls and
+datetimes, and that it matches the row-oriented preview values.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from columnar import dumps, encode_column, encode_columns
+
+
+class TestEncodeColumn:
+    """Test suite for encode_column."""
+
+    def test_nulls_become_none(self):
+        """Test NaN, NA and None in numeric, nullable and text columns."""
+        assert encode_column(pd.Series([1.5, np.nan])) == [1.5, None]
+        assert encode_column(pd.Series([1, None], dtype="Int64")) == [1, None]
+        assert encode_column(pd.Series(["a", None])) == ["a", None]
+        assert encode_column(pd.Series(["a", None], dtype="category")) == ["a", None]
+
+    def test_datetimes_are_iso(self):
+        """Test that datetimes render like Timestamp.isoformat()."""
+        dates = pd.Series(pd.to_datetime(["2017-11-08 00:00:00", None, "2017-06-12 10:30:00"]))
+        precise = pd.Series(pd.to_datetime(["2017-11-08 10:30:00.250"]))
+
+        assert encode_column(dates) == ["2017-11-08T00:00:00", None, "2017-06-12T10:30:00"]
+        assert encode_column(precise) == [precise[0].isoformat()]
+
+    def test_values_are_json_native(self):
+        """Test that the encoded page serializes like the records format."""
+        df = pd.DataFrame({
+            "Row ID": [1, 2],
+            "Sales": [261.96, np.nan],
+            "Order Date": pd.to_datetime(["2017-11-08", None]),
+        })
+
+        payload = json.loads(dumps({"data": encode_columns(df)}))
+
+        assert payload["data"] == {
+            "Row ID": [1, 2],
+            "Sales": [261.96, None],
+            "Order Date": ["2017-11-08T00:00:00", None],
+        }
@@ -0,0 +1,237 @@
+"""Unit tests for the concurrency helpers and async agent paths.
+
+This module tests the bounded tool pool and the ainvoke/aprocess_query
+code paths.
+"""
+
+import time
+import asyncio
+import threading
+import pytest
+from unittest.mock import AsyncMock, Mock
+from langchain_core.tools import tool
+
+from concurrency import bind_cancel_event, offload_tool, run_cancelled, run_in_tool_executor
+from agent_pipeline import AgentPipeline
+
+
+@tool
+def current_thread_tool() -> str:
+    """Return the name of the thread running the tool."""
+    return threading.current_thread().name
+
+
+class TestToolExecutor:
+    """Test suite for the bounded tool pool."""
+
+    def test_run_in_tool_executor(self):
+        """Test that blocking work runs in a tool worker thread."""
+        name = asyncio.run(run_in_tool_executor(lambda: threading.current_thread().name))
+
+        assert name.startswith("tool-worker")
+
+    def test_cancel_event_reaches_tool_pool(self):
+        """Test that tool calls see the cancellation of the task that made them."""
+        cancel = threading.Event()
+
+        async def run():
+            bind_cancel_event(cancel)
+            before = await run_in_tool_executor(run_cancelled)
+            cancel.set()
+            return before, await run_in_tool_executor(run_cancelled)
+
+        assert asyncio.run(run()) == (False, True)
+        assert run_cancelled() is False
+
+    def test_offload_tool_async_path(self):
+        """Test that the tool's async path uses the tool pool."""
+        offloaded = offload_tool(current_thread_tool)
+
+        assert asyncio.run(offloaded.ainvoke({})).startswith("tool-worker")
+
+    def test_offload_tool_keeps_sync_path(self):
+        """Test that sync invocation and metadata are unchanged."""
+        offloaded = offload_tool(current_thread_tool)
+
+        assert offloaded.name == current_thread_tool.name
+        assert offloaded.invoke({}) == threading.current_thread().name
+
+
+class TestAsyncPipeline:
+    """Test suite for AgentPipeline.aprocess_query."""
+
+    def test_aprocess_query_allowed(self, mock_llm, sample_dataframe):
+        """Test async processing when the intent is allowed."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe)
+        pipeline.intent_evaluator.ainvoke = AsyncMock(return_value="ALLOWED")
+        pipeline.analytics_agent.ainvoke = AsyncMock(return_value="Analytics response")
+
+        result = asyncio.run(pipeline.aprocess_query("What is the average sales?"))
+
+        assert result == "Analytics response"
+        pipeline.analytics_agent.ainvoke.assert_awaited_once()
+
+    def test_aprocess_query_blocked(self, mock_llm, sample_dataframe):
+        """Test async processing when the intent is rejected."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe)
+        pipeline.intent_evaluator.ainvoke = AsyncMock(return_value="Blocked message")
+        pipeline.analytics_agent.ainvoke = AsyncMock()
+
+        result = asyncio.run(pipeline.aprocess_query("Tell me a joke"))
+
+        assert result == "Blocked message"
+        pipeline.analytics_agent.ainvoke.assert_not_awaited()
+
+    def test_simple_agent_ainvoke(self, mock_llm, sample_dataframe):
+        """Test that SimpleAgent.ainvoke returns the last message content."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe)
+        agent = pipeline.analytics_agent
+        message = Mock()
+        message.content = "Async answer"
+        agent.agent = Mock()
+        agent.agent.ainvoke = AsyncMock(return_value={"messages": [message]})
+
+        assert asyncio.run(agent.ainvoke("query")) == "Async answer"
+
+
+class TestSpeculativePipeline:
+    """Test suite for speculative intent/analytics execution."""
+
+    def test_allowed_returns_analytics(self, mock_llm, sample_dataframe):
+        """Test that an allowed query returns the speculative analytics answer."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe, speculative=True)
+        pipeline.intent_evaluator.ainvoke = AsyncMock(return_value="ALLOWED")
+        pipeline.analytics_agent.ainvoke = AsyncMock(return_value="Analytics response")
+
+        result = asyncio.run(pipeline.aprocess_query("What is the average sales?"))
+
+        assert result == "Analytics response"
+
+    def test_rejection_cancels_analytics(self, mock_llm, sample_dataframe):
+        """Test that a rejected query cancels the running analytics task."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe, speculative=True)
+        started = asyncio.Event()
+        cancelled = []
+
+        async def slow_analytics(query):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(query)
+                raise
+            return "should not be returned"
+
+        async def reject(query):
+            await started.wait()
+            return "Blocked message"
+
+        async def run():
+            result = await pipeline.aprocess_query("Tell me a joke")
+            await asyncio.sleep(0)
+            return result
+
+        pipeline.intent_evaluator.ainvoke = reject
+        pipeline.analytics_agent.ainvoke = slow_analytics
+
+        assert asyncio.run(run()) == "Blocked message"
+        assert cancelled == ["Tell me a joke"]
+
+    def test_rejection_marks_tool_calls_cancelled(self, mock_llm, sample_dataframe):
+        """Test that a tool call running at rejection sees the cancellation."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe, speculative=True)
+        started = threading.Event()
+        rejected = threading.Event()
+        seen = []
+
+        def tool_call():
+            started.set()
+            rejected.wait(timeout=5)
+            seen.append(run_cancelled())
+
+        async def analytics(query):
+            await run_in_tool_executor(tool_call)
+            return "should not be returned"
+
+        async def reject(query):
+            await asyncio.to_thread(started.wait, 5)
+            return "Blocked message"
+
+        async def run():
+            result = await pipeline.aprocess_query("Tell me a joke")
+            rejected.set()
+            await asyncio.to_thread(lambda: time.sleep(0.1))
+            return result
+
+        pipeline.intent_evaluator.ainvoke = reject
+        pipeline.analytics_agent.ainvoke = analytics
+
+        assert asyncio.run(run()) == "Blocked message"
+        assert seen == [True]
+
+    def test_overlaps_stages(self, mock_llm, sample_dataframe, caplog):
+        """Test that both stages run concurrently and timings are logged."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe, speculative=True)
+
+        async def delayed(value):
+            await asyncio.sleep(0.2)
+            return value
+
+        pipeline.intent_evaluator.ainvoke = lambda query: delayed("ALLOWED")
+        pipeline.analytics_agent.ainvoke = lambda query: delayed("Answer")
+
+        with caplog.at_level("INFO", logger="AgentPipeline"):
+            start = time.monotonic()
+            result = asyncio.run(pipeline.aprocess_query("Sales by region"))
+            elapsed = time.monotonic() - start
+
+        assert result == "Answer"
+        assert elapsed < 0.35
+        assert "Saved vs serial" in caplog.text
+
+    def test_sync_rejection_stops_analytics(self, mock_llm, sample_dataframe):
+        """Test that the sync path signals cancellation to the analytics run."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe, speculative=True)
+        rejected = threading.Event()
+        finished = threading.Event()
+        seen = {}
+
+        def analytics(query, callbacks=None):
+            rejected.wait(timeout=5)
+            seen["cancelled"] = callbacks[0].event.is_set()
+            finished.set()
+            return "should not be returned"
+
+        def reject(query):
+            return "Blocked message"
+
+        pipeline.analytics_agent.invoke = analytics
+        pipeline.intent_evaluator.invoke = reject
+
+        assert pipeline.process_query("Tell me a joke") == "Blocked message"
+        rejected.set()
+        assert finished.wait(timeout=5)
+        assert seen["cancelled"] is True
+
+    def test_stream_buffers_until_allowed(self, mock_llm, sample_dataframe):
+        """Test that speculative streaming emits intent_checked first."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe, speculative=True)
+
+        async def analytics_events(query):
+            yield {"type": "token", "content": "Hi"}
+            yield {"type": "done", "content": "Hi"}
+
+        async def allow(query):
+            await asyncio.sleep(0.05)
+            return "ALLOWED"
+
+        pipeline.intent_evaluator.ainvoke = allow
+        pipeline.analytics_agent.astream = analytics_events
+
+        async def collect():
+            return [event async for event in pipeline.astream_query("Sales")]
+
+        events = asyncio.run(collect())
+
+        assert events[0] == {"type": "stage", "stage": "intent_checked", "allowed": True}
+        assert [e["type"] for e in events[1:]] == ["token", "done"]
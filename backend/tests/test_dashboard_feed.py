@@ -0,0 +1,102 @@
+"""Unit tests for push-based dashboard updates.
+
+This module tests the section diffs and the snapshot-then-diff protocol
+of the DashboardFeed.
+"""
+
+import asyncio
+import json
+import os
+from broadcast_hub import BroadcastHub
+from dashboard_feed import DashboardFeed, apply_diff, diff_dashboard
+from versioned_cache import VersionedCache
+
+
+class FakeSocket:
+    """WebSocket stand-in recording sent messages."""
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+
+def _dashboard(rows):
+    """Dashboard data derived from the number of rows."""
+    return {
+        "metrics": [
+            {"id": "1", "label": "Pedidos", "value": rows},
+            {"id": "2", "label": "Categorias", "value": 2},
+        ],
+        "chartData": [{"name": "Jan", "value": rows}],
+        "recentActivity": [],
+    }
+
+
+class TestDiffDashboard:
+    """Test suite for diff_dashboard and apply_diff."""
+
+    def test_only_changed_items_are_sent(self):
+        """Test that unchanged sections and items are left out."""
+        old, new = _dashboard(2), _dashboard(3)
+
+        changes = diff_dashboard(old, new)
+
+        assert set(changes) == {"metrics", "chartData"}
+        assert changes["metrics"] == {"order": ["1", "2"], "upsert": [new["metrics"][0]]}
+        assert apply_diff(old, changes) == new
+        assert diff_dashboard(new, new) == {}
+
+    def test_removed_and_reordered_items(self):
+        """Test that the order list drops and moves items."""
+        old = _dashboard(2)
+        new = dict(old, metrics=[old["metrics"][1]])
+
+        changes = diff_dashboard(old, new)
+
+        assert changes == {"metrics": {"order": ["2"], "upsert": []}}
+        assert apply_diff(old, changes) == new
+
+
+class TestDashboardFeed:
+    """Test suite for DashboardFeed."""
+
+    def test_snapshot_then_diff(self, registry, csv_path):
+        """Test that subscribers get the snapshot, then a diff per new version."""
+        cache = VersionedCache("dashboard", lambda df: _dashboard(len(df)), registry)
+
+        async def scenario():
+            hub = BroadcastHub("test")
+            feed = DashboardFeed(hub, cache)
+            feed.attach(asyncio.get_running_loop())
+            await asyncio.to_thread(feed.warm)
+            socket = FakeSocket()
+            feed.subscribe(socket)
+            first_version = registry.version
+
+            with open(csv_path, "a") as f:
+                f.write("3,A003,01/01/2018,02/01/2018,Furniture,10001,5.0\n")
+            os.utime(csv_path, ns=(1, 1))
+            registry.refresh()
+            await asyncio.to_thread(cache.warm)
+            for _ in range(20):
+                await asyncio.sleep(0)
+            await hub.close()
+            return first_version, socket.sent
+
+        first_version, sent = asyncio.run(scenario())
+
+        snapshot, diff = sent
+        assert snapshot == {"type": "snapshot", "version": first_version, "data": _dashboard(2)}
+        assert diff["type"] == "diff"
+        assert diff["base"] == first_version
+        assert diff["version"] == registry.version
+        assert apply_diff(snapshot["data"], diff["changes"]) == _dashboard(3)
+
+    def test_fallback_snapshot(self, registry):
+        """Test the snapshot served before the first build."""
+        cache = VersionedCache("dashboard", len, registry)
+        feed = DashboardFeed(BroadcastHub("test"), cache, fallback=lambda: _dashboard(0))
+
+        assert feed.snapshot() == {"type": "snapshot", "version": None, "data": _dashboard(0)}
@@ -0,0 +1,139 @@
+"""Unit tests for DataTools code evaluation.
+
+This module tests the robustness checks of evaluate_generated_code.
+"""
+
+import json
+import types
+import threading
+import contextvars
+import pytest
+from unittest.mock import patch
+from code_cache import ExecutionCache
+from concurrency import bind_cancel_event
+from agents.tools import FIXTURE_ROWS, DataTools
+from sandbox import get_sandbox_pool
+
+
+@pytest.fixture
+def tools(sample_dataframe):
+    """DataTools over the sample DataFrame with a private execution cache."""
+    with patch("agents.tools.get_execution_cache", return_value=ExecutionCache()):
+        yield DataTools(sample_dataframe)
+
+
+class TestEvaluateGeneratedCode:
+    """Test suite for DataTools.evaluate_generated_code."""
+
+    def test_fixtures_keep_schema(self, tools, sample_dataframe):
+        """Test that the edge-case fixtures are small and keep the schema."""
+        fixtures = tools._edge_case_fixtures()
+
+        assert list(fixtures["empty"].columns) == list(sample_dataframe.columns)
+        assert fixtures["empty"].empty
+        assert len(fixtures["nan"]) <= FIXTURE_ROWS
+        assert fixtures["nan"]["Sales"].isna().iloc[0]
+        assert len(fixtures["single_row"]) == 1
+        assert tools._edge_case_fixtures() is fixtures
+        assert not sample_dataframe["Sales"].isna().any()
+
+    def test_nan_fixture_keeps_integer_columns(self, sample_dataframe):
+        """Test that integer columns get a missing value without becoming floats."""
+        tools = DataTools(sample_dataframe.assign(Quantity=[1, 2, 3, 4, 5]))
+
+        quantity = tools._edge_case_fixtures()["nan"]["Quantity"]
+
+        assert str(quantity.dtype) == "Int64"
+        assert quantity.isna().iloc[0] and quantity.iloc[1] == 2
+
+    def test_checks_share_one_compiled_object(self, tools):
+        """Test that every fixture run receives the same code object."""
+        pool = get_sandbox_pool()
+        with patch.object(pool, "execute", wraps=pool.execute) as execute:
+            checks = tools._run_edge_case_checks("result = len(df)")
+
+        assert checks == {"empty": True, "nan": True, "single_row": True}
+        codes = {id(call.args[0]) for call in execute.call_args_list}
+        assert len(codes) == 1
+        assert isinstance(execute.call_args_list[0].args[0], types.CodeType)
+
+    def test_outcome_survives_eviction(self, tools):
+        """Test that a run evicted from the recent runs still reports its outcome."""
+        with patch("agents.tools.RECENT_RUNS", 0):
+            assert tools._full_data_outcome("result = df['Missing']")[0] == "error"
+            assert tools._full_data_outcome("result = 1") == ("ok", "")
+
+    def test_cancelled_run_is_not_recorded(self, sample_dataframe):
+        """Test that a run finishing after its agent run was cancelled leaves no trace."""
+        cache = ExecutionCache()
+        cancel = threading.Event()
+        cancel.set()
+        context = contextvars.copy_context()
+        context.run(bind_cancel_event, cancel)
+        with patch("agents.tools.get_execution_cache", return_value=cache):
+            tools = DataTools(sample_dataframe, dataset_version="cancelled-run")
+
+            assert context.run(tools._execute, "result = 1") == 1
+            assert len(tools._recent_runs) == 0
+            assert tools._execute("result = 1") == 1
+
+        assert cache.get_stats()["misses"] == 2
+        assert len(tools._recent_runs) == 1
+
+    def test_robust_code_passes(self, tools):
+        """Test that defensive code passes every check."""
+        code = "result = df['Sales'].mean() if not df.empty else 0"
+
+        evaluation = json.loads(tools.evaluate_generated_code(code, "Average sales?"))
+
+        assert evaluation["passed_execution"] is True
+        assert evaluation["passed_tests"] == "3/3"
+
+    def test_edge_case_failure(self, tools):
+        """Test that code failing on an empty frame is reported."""
+        code = "result = df['Sales'].iloc[0]"
+
+        evaluation = json.loads(tools.evaluate_generated_code(code, "First sale?"))
+
+        assert evaluation["passed_tests"] == "2/3"
+        assert "Fails with empty DataFrame" in evaluation["feedback"]["weaknesses"]
+
+    def test_hung_check_is_killed(self, tools):
+        """Test that a fixture run that never finishes fails at the deadline."""
+        code = "while df.empty:\n    pass\nresult = 1"
+
+        with patch("agents.tools.CHECK_TIMEOUT", 0.5):
+            evaluation = json.loads(tools.evaluate_generated_code(code, "Loop?"))
+
+        assert evaluation["passed_tests"] == "2/3"
+        assert "Fails with empty DataFrame" in evaluation["feedback"]["weaknesses"]
+
+    def test_reuses_preceding_full_run(self, tools):
+        """Test that the full-data run of execute_python_analysis is reused."""
+        code = "result = df['Sales'].sum()"
+
+        with patch.object(tools, "_run_code", wraps=tools._run_code) as run_code:
+            tools.execute_python_analysis(code)
+            evaluation = json.loads(tools.evaluate_generated_code(code, "Total sales?"))
+
+        run_code.assert_called_once()
+        assert evaluation["passed_execution"] is True
+
+    def test_reuses_preceding_failure(self, tools):
+        """Test that a failed full-data run is reported without re-running."""
+        code = "result = df['Missing'].sum()"
+
+        with patch.object(tools, "_run_code", wraps=tools._run_code) as run_code:
+            tools.execute_python_analysis(code)
+            evaluation = json.loads(tools.evaluate_generated_code(code, "Missing?"))
+
+        run_code.assert_called_once()
+        assert evaluation["passed_execution"] is False
+        assert any("Missing" in w for w in evaluation["feedback"]["weaknesses"])
+
+    def test_syntax_error(self, tools):
+        """Test that code that does not compile fails every check."""
+        evaluation = json.loads(tools.evaluate_generated_code("result = (", "Broken"))
+
+        assert evaluation["passed_tests"] == "0/3"
+        assert evaluation["action"] == "REWRITE"
@@ -0,0 +1,109 @@
+"""Unit tests for the dataset profile.
+
+This module tests build_profile, format_profile, ProfileCache and the
+profile served by DataTools.get_csv_metadata.
+"""
+
+import pandas as pd
+from unittest.mock import patch
+from dataset_profile import ProfileCache, build_profile, format_profile
+from agents.tools import DataTools
+
+
+class TestBuildProfile:
+    """Test suite for build_profile."""
+
+    def test_column_statistics(self, sample_dataframe):
+        """Test the statistics computed for each kind of column."""
+        catalog = {"Sales": {"short description": "Sales amount"}}
+
+        profile = build_profile(sample_dataframe, catalog)
+        columns = profile["columns"]
+
+        assert profile["rows"] == 5
+        assert columns["Sales"]["min"] == 75.0
+        assert columns["Sales"]["max"] == 300.0
+        assert columns["Sales"]["p50"] == 150.0
+        assert columns["Sales"]["description"] == "Sales amount"
+        assert columns["Order Date"]["min"] == pd.Timestamp("2024-01-01")
+        assert columns["Category"]["top"][0] == ["Electronics", 2]
+        assert columns["Category"]["distinct"] == 3
+
+    def test_identifier_columns_get_examples(self):
+        """Test that identifier-like text columns get examples, not counts."""
+        df = pd.DataFrame({"id": [f"A{i:03d}" for i in range(10)]})
+
+        stats = build_profile(df)["columns"]["id"]
+
+        assert stats["examples"] == ["A000", "A001", "A002"]
+        assert "top" not in stats
+
+    def test_null_counts(self):
+        """Test that nulls are counted and all-null columns do not fail."""
+        df = pd.DataFrame({"a": [1.0, None, 3.0], "b": [None, None, None]})
+
+        columns = build_profile(df)["columns"]
+
+        assert columns["a"]["nulls"] == 1
+        assert columns["b"]["nulls"] == 3
+        assert columns["b"]["distinct"] == 0
+
+
+class TestFormatProfile:
+    """Test suite for format_profile."""
+
+    def test_one_line_per_column(self, sample_dataframe):
+        """Test the compact rendering."""
+        text = format_profile(build_profile(sample_dataframe))
+        lines = text.splitlines()
+
+        assert lines[0] == "5 rows x 6 columns"
+        assert len(lines) == 7
+        assert "Sales | float64 | distinct=5 | min=75 " in text
+        assert "range=2024-01-01..2024-01-05" in text
+
+    def test_column_subset(self, sample_dataframe):
+        """Test that only the requested columns are rendered."""
+        text = format_profile(build_profile(sample_dataframe), ["Sales", "Profit"])
+
+        assert "Sales |" in text
+        assert "Category |" not in text
+        assert "Unknown columns: Profit." in text
+
+
+class TestProfileCache:
+    """Test suite for ProfileCache."""
+
+    def test_built_once_per_version(self, sample_dataframe):
+        """Test that a version is profiled once and old versions evicted."""
+        cache = ProfileCache(max_versions=1)
+
+        with patch("dataset_profile.build_profile", wraps=build_profile) as build:
+            first = cache.get(sample_dataframe, "v1")
+            assert cache.get(sample_dataframe, "v1") is first
+            assert build.call_count == 1
+
+            cache.get(sample_dataframe, "v2")
+            cache.get(sample_dataframe, "v1")
+            assert build.call_count == 3
+
+    def test_unversioned_is_not_cached(self, sample_dataframe):
+        """Test that profiles without a version are not stored."""
+        cache = ProfileCache()
+
+        assert cache.get(sample_dataframe, None) is not cache.get(sample_dataframe, None)
+
+
+class TestGetCsvMetadata:
+    """Test suite for DataTools.get_csv_metadata."""
+
+    def test_serves_profile_subset(self, sample_dataframe):
+        """Test that the tool serves the profile, optionally for some columns."""
+        tools = DataTools(sample_dataframe, catalog={"Sales": {"short description": "Sales amount"}})
+
+        output = tools.get_csv_metadata(["Sales"])
+
+        assert "Sales | float64" in output
+        assert "Sales amount" in output
+        assert "Category" not in output
+        assert "Category |" in tools.get_csv_metadata()
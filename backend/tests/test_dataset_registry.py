@@ -0,0 +1,62 @@
+"""Unit tests for DatasetRegistry class.
+
+This module tests loading, versioning and sharing of the dataset.
+"""
+
+import os
+import pytest
+import pandas as pd
+from dataset_registry import DatasetRegistry
+
+
+class TestDatasetRegistry:
+    """Test suite for DatasetRegistry class."""
+
+    def test_load_parses_dates_dayfirst(self, csv_path):
+        """Test that dates are parsed as DD/MM/YYYY."""
+        registry = DatasetRegistry(csv_path)
+        df = registry.get_dataframe()
+
+        assert df['Order Date'].iloc[0] == pd.Timestamp('2017-11-08')
+        assert str(df['Category'].dtype) == 'category'
+        assert df['Postal Code'].isna().iloc[1]
+
+    def test_loads_only_once(self, csv_path):
+        """Test that repeated access reuses the loaded frame."""
+        registry = DatasetRegistry(csv_path)
+        version = registry.version
+
+        assert registry.refresh() is False
+        assert registry.version == version
+
+    def test_refresh_after_file_change(self, csv_path):
+        """Test that a modified file produces a new version."""
+        registry = DatasetRegistry(csv_path)
+        version = registry.version
+
+        with open(csv_path, "a") as f:
+            f.write("3,A003,01/01/2018,02/01/2018,Furniture,10001,5.0\n")
+        os.utime(csv_path, ns=(1, 1))
+
+        assert registry.refresh() is True
+        assert registry.version != version
+        assert len(registry.get_dataframe()) == 3
+
+    def test_consumer_changes_do_not_leak(self, csv_path):
+        """Test that modifying a handed-out frame leaves the shared one intact."""
+        registry = DatasetRegistry(csv_path)
+
+        df = registry.get_dataframe()
+        df['Extra'] = 1
+        df.loc[0, 'Sales'] = 0.0
+
+        shared = registry.get_dataframe()
+        assert 'Extra' not in shared.columns
+        assert shared.loc[0, 'Sales'] == 261.96
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing file yields an empty frame."""
+        registry = DatasetRegistry(str(tmp_path / "missing.csv"))
+
+        assert registry.get_dataframe().empty
+        assert registry.version == DatasetRegistry.EMPTY_VERSION
@@ -0,0 +1,137 @@
+"""Unit tests for the columnar dataset snapshot.
+
+This module tests building, reusing and invalidating the Arrow snapshot.
+"""
+
+import os
+import json
+import pytest
+import pandas as pd
+from unittest.mock import patch
+
+pytest.importorskip("pyarrow")
+
+import dataset_snapshot
+from dataset_registry import DatasetRegistry, file_signature
+
+
+class TestDatasetSnapshot:
+    """Test suite for the dataset snapshot."""
+
+    def test_first_load_writes_snapshot(self, csv_path):
+        """Test that loading the CSV writes a snapshot next to it."""
+        DatasetRegistry(csv_path).load()
+
+        assert os.path.exists(dataset_snapshot.snapshot_path_for(csv_path))
+
+    def test_snapshot_keeps_dtypes(self, csv_path):
+        """Test that dates, categoricals and nullable ints survive."""
+        DatasetRegistry(csv_path).load()
+
+        with patch('dataset_snapshot.pd.read_csv', side_effect=AssertionError):
+            df = DatasetRegistry(csv_path).get_dataframe()
+
+        assert df['Order Date'].iloc[0] == pd.Timestamp('2017-11-08')
+        assert str(df['Category'].dtype) == 'category'
+        assert str(df['Postal Code'].dtype) == 'Int64'
+
+    def test_touch_reuses_snapshot(self, csv_path):
+        """Test that an mtime-only change keeps the version and snapshot."""
+        version = DatasetRegistry(csv_path).version
+        os.utime(csv_path, ns=(1, 1))
+
+        with patch('dataset_snapshot.pd.read_csv', side_effect=AssertionError):
+            assert DatasetRegistry(csv_path).version == version
+
+        metadata = dataset_snapshot.read_metadata(
+            dataset_snapshot.snapshot_path_for(csv_path)
+        )
+        assert metadata['source_signature'] == file_signature(csv_path)
+        with patch('dataset_snapshot.file_hash', side_effect=AssertionError):
+            assert DatasetRegistry(csv_path).version == version
+
+    def test_no_temporary_files_left(self, csv_path):
+        """Test that writing and re-signing leave only the snapshot behind."""
+        DatasetRegistry(csv_path).load()
+        os.utime(csv_path, ns=(1, 1))
+        DatasetRegistry(csv_path).load()
+
+        assert not [name for name in os.listdir(os.path.dirname(csv_path)) if name.endswith('.tmp')]
+
+    def test_content_change_rebuilds(self, csv_path):
+        """Test that changing the CSV rebuilds the snapshot."""
+        version = DatasetRegistry(csv_path).version
+        with open(csv_path, "a") as f:
+            f.write("3,A003,01/01/2018,02/01/2018,Furniture,10001,5.0\n")
+
+        registry = DatasetRegistry(csv_path)
+        assert registry.version != version
+        assert len(registry.get_dataframe()) == 3
+
+    def test_catalog_is_embedded(self, csv_path):
+        """Test that the catalog is stored in the snapshot metadata."""
+        catalog = {"Sales": {"short description": "Valor da venda."}}
+        catalog_path = dataset_snapshot.catalog_path_for(csv_path)
+        with open(catalog_path, "w") as f:
+            json.dump(catalog, f)
+
+        registry = DatasetRegistry(csv_path)
+        assert registry.catalog == catalog
+
+        metadata = dataset_snapshot.read_metadata(
+            dataset_snapshot.snapshot_path_for(csv_path)
+        )
+        assert json.loads(metadata['catalog']) == catalog
+        assert metadata['source_signature'] == file_signature(csv_path)
+
+
+class TestRowIndex:
+    """Test suite for positional reads through the snapshot row index."""
+
+    @pytest.fixture
+    def large_registry(self, tmp_path, monkeypatch):
+        """Registry over a CSV spanning several record batches."""
+        monkeypatch.setattr(dataset_snapshot, 'BATCH_SIZE', 4)
+        path = tmp_path / "train.csv"
+        rows = "".join(
+            f"{i},A{i:03d},01/01/2018,02/01/2018,Furniture,10001,{i}.5\n"
+            for i in range(1, 11)
+        )
+        path.write_text(
+            "Row ID,Order ID,Order Date,Ship Date,Category,Postal Code,Sales\n" + rows
+        )
+        return DatasetRegistry(str(path))
+
+    def test_page_across_batches(self, large_registry):
+        """Test that a page spanning batch boundaries is contiguous."""
+        page, total = large_registry.read_rows(3, 4)
+
+        assert total == 10
+        assert list(page['Row ID']) == [4, 5, 6, 7]
+        assert str(page['Order Date'].dtype).startswith('datetime64')
+
+    def test_page_past_end(self, large_registry):
+        """Test that pages are clipped at the end of the data."""
+        page, total = large_registry.read_rows(8, 10)
+
+        assert list(page['Row ID']) == [9, 10]
+        assert large_registry.read_rows(20, 5)[0].empty
+
+    def test_index_matches_frame(self, large_registry):
+        """Test that indexed reads match slicing the in-memory frame."""
+        df = large_registry.get_dataframe()
+        page, _ = large_registry.read_rows(2, 7)
+
+        pd.testing.assert_frame_equal(
+            page.reset_index(drop=True), df.iloc[2:9].reset_index(drop=True)
+        )
+
+    def test_column_projection(self, large_registry):
+        """Test that only the requested columns are read."""
+        page, total = large_registry.read_rows(2, 3, ['Sales', 'Order Date'])
+
+        assert total == 10
+        assert list(page.columns) == ['Sales', 'Order Date']
+        assert list(large_registry.read_rows(20, 5, ['Sales'])[0].columns) == ['Sales']
+        with pytest.raises(KeyError):
+            large_registry.read_rows(0, 5, ['Missing'])
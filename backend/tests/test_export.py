@@ -0,0 +1,81 @@
+"""Unit tests for streaming export.
+
+This module tests filter parsing and resolution through the value index,
+and that every format encodes the rows chunk by chunk.
+"""
+
+import io
+import json
+import pandas as pd
+import pyarrow as pa
+import pytest
+from export import filter_positions, parse_filters, stream_table
+from value_index import ValueIndex
+
+
+class TestFilters:
+    """Test suite for parse_filters and filter_positions."""
+
+    def test_parse(self):
+        """Test that values of one column are grouped."""
+        filters = parse_filters(["Category=Furniture", "Category=Clothing", "Sales=100.0"])
+
+        assert filters == {"Category": ["Furniture", "Clothing"], "Sales": ["100.0"]}
+        with pytest.raises(ValueError):
+            parse_filters(["Category"])
+
+    def test_positions(self, sample_dataframe):
+        """Test AND across columns, OR within a column and date matching."""
+        index = ValueIndex(sample_dataframe)
+
+        positions = filter_positions(index, {"Category": ["Furniture", "Clothing"], "Sales": ["300.0", "75.0"]})
+
+        assert list(positions) == [3, 4]
+        assert list(filter_positions(index, {"Order Date": ["2024-01-02"]})) == [1]
+        assert filter_positions(index, {}) is None
+        with pytest.raises(KeyError):
+            filter_positions(index, {"Missing": ["x"]})
+
+
+class TestStreamTable:
+    """Test suite for stream_table."""
+
+    def test_csv_chunks_share_one_header(self, sample_dataframe):
+        """Test that chunks are concatenated under a single header."""
+        chunks = list(stream_table(sample_dataframe[["Order ID", "Sales"]], "csv", chunk_rows=2))
+
+        assert len(chunks) == 3
+        text = b"".join(chunks).decode("utf-8")
+        assert text.splitlines() == ["Order ID,Sales", "A001,100.0", "A002,200.0",
+                                     "A003,150.0", "A004,75.0", "A005,300.0"]
+
+    def test_ndjson_filtered(self, sample_dataframe):
+        """Test that only the selected rows are written, one object per line."""
+        index = ValueIndex(sample_dataframe)
+        positions = filter_positions(index, {"Category": ["Furniture"]})
+
+        text = b"".join(stream_table(sample_dataframe, "ndjson", positions, chunk_rows=1)).decode("utf-8")
+
+        rows = [json.loads(line) for line in text.splitlines()]
+        assert [row["Order ID"] for row in rows] == ["A002", "A005"]
+        assert rows[0]["Order Date"] == "2024-01-02T00:00:00"
+
+    def test_arrow_stream(self, sample_dataframe):
+        """Test that the record batches form one readable IPC stream."""
+        data = b"".join(stream_table(sample_dataframe, "arrow", chunk_rows=2))
+
+        table = pa.ipc.open_stream(io.BytesIO(data)).read_all()
+        pd.testing.assert_frame_equal(table.to_pandas(), sample_dataframe, check_dtype=False)
+
+    def test_empty_result_keeps_header(self, sample_dataframe):
+        """Test that an empty selection still writes the header."""
+        empty = filter_positions(ValueIndex(sample_dataframe), {"Category": ["Toys"]})
+
+        text = b"".join(stream_table(sample_dataframe[["Order ID"]], "csv", empty)).decode("utf-8")
+
+        assert text.strip() == "Order ID"
+
+    def test_unknown_format(self, sample_dataframe):
+        """Test that unknown formats are rejected before streaming."""
+        with pytest.raises(ValueError):
+            stream_table(sample_dataframe, "xml")
@@ -0,0 +1,40 @@
+"""Unit tests for HTTP caching helpers.
+
+This module tests ETag construction and If-None-Match matching.
+"""
+
+from http_cache import cache_headers, etag_matches, make_etag
+
+
+class TestMakeEtag:
+    """Test suite for make_etag."""
+
+    def test_depends_on_version_and_parameters(self):
+        """Test that the tag changes with the version and the query."""
+        etag = make_etag("v1", "preview", 0, 10)
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag == make_etag("v1", "preview", 0, 10)
+        assert etag != make_etag("v2", "preview", 0, 10)
+        assert etag != make_etag("v1", "preview", 10, 10)
+
+
+class TestEtagMatches:
+    """Test suite for etag_matches."""
+
+    def test_matching(self):
+        """Test lists, wildcards and weak tags."""
+        etag = make_etag("v1", "metrics")
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches(f"W/{etag}", etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches('"other"', etag)
+
+    def test_cache_headers(self):
+        """Test the revalidation headers."""
+        headers = cache_headers('"abc"', max_age=7)
+
+        assert headers == {"ETag": '"abc"', "Cache-Control": "public, max-age=7, must-revalidate"}
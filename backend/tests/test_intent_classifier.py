@@ -0,0 +1,117 @@
+"""Unit tests for the local fast-path intent classifier.
+
+This module tests classification, hit-rate counters, the labelled
+benchmark set and the IntentEvaluator fast path.
+"""
+
+import asyncio
+import pytest
+import pandas as pd
+from unittest.mock import AsyncMock, Mock
+from agents.intent_classifier import (
+    ALLOWED, AMBIGUOUS, REJECTED, IntentClassifier, benchmark, load_labelled_set
+)
+from agents.intent_evaluator import IntentEvaluator
+
+
+@pytest.fixture
+def classifier(sample_dataframe):
+    """Classifier built from the sample DataFrame."""
+    return IntentClassifier.from_dataframe(sample_dataframe)
+
+
+class TestIntentClassifier:
+    """Test suite for IntentClassifier class."""
+
+    def test_vocabulary_from_dataset(self, classifier):
+        """Test that column names and categorical values are on-topic."""
+        assert {'sales', 'category', 'electronics', 'furniture'} <= classifier.vocabulary
+
+    @pytest.mark.parametrize("message", [
+        "Total de vendas por categoria",
+        "Qual a média de vendas?",
+        "Compare Electronics e Furniture",
+        "top 10 customers",
+    ])
+    def test_clearly_on_topic(self, classifier, message):
+        """Test that analytics questions are allowed locally."""
+        decision = classifier.classify(message)
+
+        assert decision.label == ALLOWED
+        assert decision.confidence >= classifier.threshold
+
+    @pytest.mark.parametrize("message", ["Conte uma piada", "Tell me a joke", "Oi, tudo bem?"])
+    def test_clearly_off_topic(self, classifier, message):
+        """Test that off-topic messages are rejected locally."""
+        assert classifier.classify(message).label == REJECTED
+
+    @pytest.mark.parametrize("message", ["Quem é você?", "Conte uma piada sobre vendas", ""])
+    def test_ambiguous(self, classifier, message):
+        """Test that unclear or mixed messages are left to the LLM."""
+        assert classifier.classify(message).label == AMBIGUOUS
+
+    def test_dataset_values_need_an_analytic_cue(self):
+        """Test that dataset values without a metric, aggregation or period are not allowed."""
+        classifier = IntentClassifier.from_dataframe(pd.DataFrame({
+            'Country': ['United States'],
+            'Segment': ['Home Office'],
+            'Ship Mode': ['First Class'],
+            'Sub-Category': ['Chairs'],
+            'Sales': [10.0],
+        }))
+
+        for message in ["what day is it in the united states", "first class tickets to paris",
+                        "home office chairs recommendations"]:
+            assert classifier.classify(message).label == AMBIGUOUS
+        assert classifier.classify("Chairs sold to Home Office").label == ALLOWED
+        assert classifier.classify("Home Office chairs in 2017").label == ALLOWED
+
+    def test_accents_and_case_ignored(self, classifier):
+        """Test that accents and case do not change the decision."""
+        assert classifier.classify("MÉDIA DE VENDAS").label == ALLOWED
+
+    def test_hit_rate_counters(self, classifier):
+        """Test that decisions are counted and the hit rate reported."""
+        classifier.classify("Total de vendas por categoria")
+        classifier.classify("Conte uma piada")
+        classifier.classify("Quem é você?")
+        classifier.classify("Qual o sentido da vida?")
+
+        stats = classifier.get_stats()
+
+        assert stats["total"] == 4
+        assert stats[AMBIGUOUS] == 2
+        assert stats["hit_rate"] == 0.5
+
+    def test_labelled_set_benchmark(self, classifier):
+        """Test that the shipped labelled set is decided accurately."""
+        samples = load_labelled_set()
+        report = benchmark(classifier, samples)
+
+        assert {s["label"] for s in samples} == {ALLOWED, REJECTED}
+        assert report["coverage"] >= 0.6
+        assert report["accuracy"] >= 0.95
+
+
+class TestIntentEvaluatorFastPath:
+    """Test suite for the IntentEvaluator fast path."""
+
+    def test_decided_without_llm(self, mock_llm, classifier):
+        """Test that conclusive queries never reach the LLM."""
+        evaluator = IntentEvaluator(mock_llm, classifier)
+        evaluator.agent = Mock()
+
+        assert evaluator.invoke("Total de vendas por categoria") == "ALLOWED"
+        assert evaluator.invoke("Conte uma piada") == IntentEvaluator.REJECTION_MESSAGE
+        evaluator.agent.invoke.assert_not_called()
+
+    def test_ambiguous_goes_to_llm(self, mock_llm, classifier):
+        """Test that ambiguous queries are evaluated by the LLM."""
+        evaluator = IntentEvaluator(mock_llm, classifier)
+        message = Mock()
+        message.content = "ALLOWED"
+        evaluator.agent = Mock()
+        evaluator.agent.ainvoke = AsyncMock(return_value={"messages": [message]})
+
+        assert asyncio.run(evaluator.ainvoke("Quem comprou mais?")) == "ALLOWED"
+        evaluator.agent.ainvoke.assert_awaited_once()
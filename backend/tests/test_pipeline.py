@@ -154,3 +154,58 @@ def test_get_analytics_response_with_env_var(mock_read_csv, mock_llm_class, samp
     # This will fail without full setup, but tests the function exists
     with pytest.raises(Exception):
         get_analytics_response("Test query")
+
+
+class TestPipelineProvider:
+    """Test suite for the long-lived PipelineProvider."""
+    
+    @pytest.fixture
+    def provider(self, registry, monkeypatch, tmp_path):
+        """Provider over the sample registry with a fake API key."""
+        from agent_pipeline import PipelineProvider
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        monkeypatch.delenv("GEMINI_MODEL", raising=False)
+        monkeypatch.setattr("agent_pipeline.ANSWER_CACHE_PATH", str(tmp_path / "answers.sqlite3"))
+        provider = PipelineProvider(registry)
+        provider._setup_done = True
+        return provider
+    
+    @patch('langchain_google_genai.ChatGoogleGenerativeAI')
+    def test_pipeline_is_reused(self, mock_llm_class, provider):
+        """Test that consecutive queries share one pipeline and LLM client."""
+        first = provider.get()
+        second = provider.get()
+        
+        assert first is second
+        mock_llm_class.assert_called_once()
+    
+    @patch('langchain_google_genai.ChatGoogleGenerativeAI')
+    def test_dataset_change_swaps_pipeline(self, mock_llm_class, provider, csv_path):
+        """Test that a new dataset version rebuilds the pipeline but not the LLM."""
+        first = provider.get()
+        with open(csv_path, "a") as f:
+            f.write("3,A003,01/01/2018,02/01/2018,Furniture,10001,5.0\n")
+        provider.registry.refresh()
+        
+        second = provider.get()
+        
+        assert second is not first
+        assert second.analytics_agent.data_tools.df.shape[0] == 3
+        mock_llm_class.assert_called_once()
+    
+    @patch('langchain_google_genai.ChatGoogleGenerativeAI')
+    def test_config_change_rebuilds_llm(self, mock_llm_class, provider, monkeypatch):
+        """Test that changing the model rebuilds the LLM client."""
+        provider.get()
+        monkeypatch.setenv("GEMINI_MODEL", "other-model")
+        
+        provider.get()
+        
+        assert mock_llm_class.call_count == 2
+        assert mock_llm_class.call_args.kwargs["model"] == "other-model"
+    
+    def test_missing_api_key(self, provider, monkeypatch):
+        """Test that no pipeline is built without an API key."""
+        monkeypatch.delenv("GOOGLE_API_KEY")
+        
+        assert provider.get() is None
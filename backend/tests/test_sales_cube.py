@@ -0,0 +1,104 @@
+"""Unit tests for the pre-aggregated sales cube.
+
+This module tests that cube answers match a groupby on the raw frame, the
+fallback for queries outside the cube and the DataTools tool.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from agents.tools import DataTools
+from sales_cube import SalesCube
+
+
+@pytest.fixture
+def orders():
+    """Order lines over two years with every cube dimension."""
+    rng = np.random.default_rng(0)
+    size = 400
+    return pd.DataFrame({
+        "Order Date": pd.Timestamp("2017-01-01") + pd.to_timedelta(rng.integers(0, 730, size), unit="D"),
+        "Category": rng.choice(["Furniture", "Technology"], size),
+        "Sub-Category": rng.choice(["Chairs", "Phones", "Tables"], size),
+        "Region": rng.choice(["East", "West", "South"], size),
+        "Segment": rng.choice(["Consumer", "Corporate"], size),
+        "Ship Mode": rng.choice(["First Class", "Standard Class"], size),
+        "State": rng.choice(["California", "Texas"], size),
+        "Sales": rng.uniform(1, 1000, size).round(2),
+    })
+
+
+@pytest.fixture
+def cube(orders):
+    """Cube over the orders."""
+    return SalesCube(orders)
+
+
+class TestSalesCube:
+    """Test suite for SalesCube."""
+
+    def test_rollup_matches_raw_groupby(self, cube, orders):
+        """Test a period x dimension rollup against pandas."""
+        result = cube.query(by=["Region"], time="quarter")
+
+        expected = orders.groupby(
+            [orders["Order Date"].dt.to_period("Q").astype(str), "Region"]
+        )["Sales"].sum()
+        assert result.source == "cube"
+        assert list(result.table.columns) == ["quarter", "Region", "Sales"]
+        assert result.table["quarter"].iloc[0] == "2017Q1"
+        np.testing.assert_allclose(result.table["Sales"], expected.values)
+
+    def test_filters_and_mean(self, cube, orders):
+        """Test filters on a dimension and a period with a mean."""
+        result = cube.query(
+            by=["Category"], filters={"year": ["2018"], "Region": ["East", "West"]}, agg="mean"
+        )
+
+        subset = orders[(orders["Order Date"].dt.year == 2018) & orders["Region"].isin(["East", "West"])]
+        expected = subset.groupby("Category")["Sales"].mean().sort_values(ascending=False)
+        assert result.source == "cube"
+        assert list(result.table["Category"]) == list(expected.index)
+        np.testing.assert_allclose(result.table["Sales (mean)"], expected.values)
+
+    def test_grand_total_and_count(self, cube, orders):
+        """Test queries without grouping."""
+        assert cube.query().table["Sales"].iloc[0] == pytest.approx(orders["Sales"].sum())
+        assert cube.query(agg="count").table["count"].iloc[0] == len(orders)
+
+    def test_fallback_to_raw_data(self, cube, orders):
+        """Test that columns outside the cube are aggregated from the frame."""
+        result = cube.query(by=["State"], filters={"Segment": ["Consumer"]})
+
+        expected = orders[orders["Segment"] == "Consumer"].groupby("State")["Sales"].sum()
+        assert result.source == "raw"
+        assert dict(zip(result.table["State"], result.table["Sales"])) == pytest.approx(expected.to_dict())
+
+    def test_answers_are_memoized(self, cube):
+        """Test that identical queries share their answer."""
+        first = cube.query(by=["Segment"], filters={"Region": ["West", "East"]})
+
+        assert cube.query(by=["Segment"], filters={"Region": ["East", "West"]}) is first
+
+    def test_invalid_queries(self, cube):
+        """Test unknown aggregations, periods and columns."""
+        with pytest.raises(ValueError):
+            cube.query(agg="max")
+        with pytest.raises(ValueError):
+            cube.query(time="week")
+        with pytest.raises(KeyError):
+            cube.query(by=["Missing"])
+
+
+class TestDataToolsCube:
+    """Test suite for DataTools.query_sales_cube."""
+
+    def test_cube_tool(self, orders):
+        """Test the cube query through DataTools."""
+        tools = DataTools(orders)
+
+        text = tools.query_sales_cube(by=["Segment"], time="year", filters=["Category=Furniture"])
+
+        assert text.startswith("Result (from the pre-aggregated sales cube):")
+        assert "year,Segment,Sales" in text
+        assert "Erro" in tools.query_sales_cube(by=["Missing"])
@@ -0,0 +1,125 @@
+"""Unit tests for SandboxPool class.
+
+This module tests execution in pre-forked workers, deadlines, memory and
+result-size limits, and worker replacement.
+"""
+
+import pytest
+import pandas as pd
+from code_cache import NO_RESULT
+from sandbox import SandboxError, SandboxPool, SandboxTimeout
+
+
+@pytest.fixture
+def pool(sample_dataframe):
+    """Two-worker pool bound to the sample DataFrame."""
+    pool = SandboxPool(workers=2, timeout=2, cpu_seconds=2, memory_mb=256,
+                       max_result_bytes=1024 * 1024)
+    pool.start(sample_dataframe, "v1")
+    yield pool
+    pool.shutdown()
+
+
+class TestSandboxPool:
+    """Test suite for SandboxPool class."""
+
+    def test_executes_in_worker(self, pool, sample_dataframe):
+        """Test that code runs in another process and returns its result."""
+        result = pool.execute(
+            "import os\nresult = (os.getpid(), df['Sales'].sum())",
+            sample_dataframe, "v1"
+        )
+
+        assert result[0] != __import__('os').getpid()
+        assert result[1] == 825.0
+
+    def test_no_result(self, pool, sample_dataframe):
+        """Test that code without ``result`` returns NO_RESULT."""
+        assert pool.execute("total = 1", sample_dataframe, "v1") is NO_RESULT
+
+    def test_code_errors(self, pool, sample_dataframe):
+        """Test that exceptions raised by the code are reported."""
+        with pytest.raises(SandboxError, match="KeyError"):
+            pool.execute("result = df['Missing']", sample_dataframe, "v1")
+
+    def test_mutations_do_not_persist(self, pool, sample_dataframe):
+        """Test that a worker's frame is unchanged by previous code."""
+        for _ in range(3):
+            pool.execute("df['Sales'] = 0\ndf['Extra'] = 1", sample_dataframe, "v1")
+
+        assert pool.execute("result = list(df.columns)", sample_dataframe, "v1") == \
+            list(sample_dataframe.columns)
+        assert pool.execute("result = df['Sales'].sum()", sample_dataframe, "v1") == 825.0
+
+    def test_timeout_replaces_worker(self, pool, sample_dataframe):
+        """Test that a hung worker is killed and the pool keeps working."""
+        with pytest.raises(SandboxTimeout):
+            pool.execute("while True:\n    pass", sample_dataframe, "v1")
+
+        assert pool.execute("result = 1", sample_dataframe, "v1") == 1
+        assert pool._idle.qsize() == 2
+
+    def test_memory_limit(self, pool, sample_dataframe):
+        """Test that exceeding the memory limit fails without killing the pool."""
+        with pytest.raises(SandboxError, match="[Mm]emory"):
+            pool.execute("import numpy as np\nresult = np.ones(2 * 10**9)", sample_dataframe, "v1")
+
+        assert pool.execute("result = 2", sample_dataframe, "v1") == 2
+
+    def test_result_size_cap(self, pool, sample_dataframe):
+        """Test that oversized results are rejected."""
+        with pytest.raises(SandboxError, match="too large"):
+            pool.execute("result = 'x' * (2 * 1024 * 1024)", sample_dataframe, "v1")
+
+    def test_workers_are_forked_by_the_zygote(self, pool, sample_dataframe):
+        """Test that workers, including replacements, are not children of this process."""
+        code = "import os\nresult = os.getppid()"
+
+        assert pool.execute(code, sample_dataframe, "v1") == pool._zygote.process.pid
+        with pytest.raises(SandboxTimeout):
+            pool.execute("while True:\n    pass", sample_dataframe, "v1")
+        assert pool.execute(code, sample_dataframe, "v1") == pool._zygote.process.pid
+
+    def test_rebinds_on_new_version(self, pool):
+        """Test that a new dataset version re-forks workers with its data."""
+        other = pd.DataFrame({'Sales': [1.0, 2.0]})
+
+        assert pool.execute("result = df['Sales'].sum()", other, "v2") == 3.0
+
+    def test_older_version_does_not_rebind(self, pool, sample_dataframe):
+        """Test that a request on a replaced version fails instead of re-forking."""
+        other = pd.DataFrame({'Sales': [1.0, 2.0]})
+        pool.execute("result = 1", other, "v2")
+        workers = sorted(w.pid for w in list(pool._idle.queue))
+
+        with pytest.raises(SandboxError, match="reloaded"):
+            pool.execute("result = 1", sample_dataframe, "v1")
+        assert sorted(w.pid for w in list(pool._idle.queue)) == workers
+        assert pool.execute("result = len(df)", other, "v2") == 2
+
+        pool.start(sample_dataframe, "v1")
+        assert pool.execute("result = len(df)", sample_dataframe, "v1") == 5
+
+    def test_frame_and_timeout_per_request(self, pool, sample_dataframe):
+        """Test running on a sent frame without re-forking, with its own deadline."""
+        fixture = sample_dataframe.head(2)
+        workers = [w.pid for w in list(pool._idle.queue)]
+
+        assert pool.execute("result = len(df)", sample_dataframe, "v1", frame=fixture) == 2
+        assert sorted(w.pid for w in list(pool._idle.queue)) == sorted(workers)
+        with pytest.raises(SandboxTimeout, match="0s"):
+            pool.execute("while True:\n    pass", sample_dataframe, "v1", frame=fixture, timeout=0.2)
+        assert pool.execute("result = len(df)", sample_dataframe, "v1") == 5
+
+    def test_compiled_code(self, pool, sample_dataframe):
+        """Test that a code object is executed without the source."""
+        compiled = compile("result = df['Sales'].sum()", "<generated>", "exec")
+
+        assert pool.execute(compiled, sample_dataframe, "v1") == 825.0
+        assert pool.execute(compiled, sample_dataframe, "v1", frame=sample_dataframe.head(1)) == 100.0
+
+    def test_in_process_when_disabled(self, sample_dataframe):
+        """Test that zero workers runs code in-process."""
+        pool = SandboxPool(workers=0)
+
+        assert pool.execute("result = df.shape[0]", sample_dataframe) == 5
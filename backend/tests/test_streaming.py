@@ -0,0 +1,106 @@
+"""Unit tests for agent event streaming.
+
+This module tests the translation of LangGraph events into client events.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from agents.streaming import stream_agent_events, chunk_text
+from agent_pipeline import AgentPipeline
+
+
+class FakeGraph:
+    """Graph stub whose astream_events replays a fixed event list."""
+
+    def __init__(self, events):
+        self.events = events
+
+    async def astream_events(self, inputs, config=None, version=None):
+        for event in self.events:
+            yield event
+
+
+def _collect(async_iterator):
+    """Drain an async iterator into a list."""
+    async def run():
+        return [event async for event in async_iterator]
+    return asyncio.run(run())
+
+
+def _final_message(content):
+    message = Mock()
+    message.content = content
+    return message
+
+
+class TestStreamAgentEvents:
+    """Test suite for stream_agent_events."""
+
+    def test_translates_events(self):
+        """Test tool stages, tokens and the final answer."""
+        graph = FakeGraph([
+            {"event": "on_tool_start", "name": "get_csv_metadata", "data": {}, "parent_ids": ["r"]},
+            {"event": "on_tool_end", "name": "execute_python_analysis", "data": {}, "parent_ids": ["r"]},
+            {"event": "on_chat_model_stream", "name": "llm", "parent_ids": ["r"],
+             "data": {"chunk": Mock(content="Total ")}},
+            {"event": "on_chat_model_stream", "name": "llm", "parent_ids": ["r"],
+             "data": {"chunk": Mock(content=[{"type": "text", "text": "is 10"}])}},
+            {"event": "on_chain_end", "name": "LangGraph", "parent_ids": [],
+             "data": {"output": {"messages": [_final_message("Total is 10")]}}},
+        ])
+
+        events = _collect(stream_agent_events(graph, [], lambda msgs: msgs[-1].content))
+
+        assert events == [
+            {"type": "stage", "stage": "tool_called", "tool": "get_csv_metadata"},
+            {"type": "stage", "stage": "code_executed", "tool": "execute_python_analysis"},
+            {"type": "token", "content": "Total "},
+            {"type": "token", "content": "is 10"},
+            {"type": "done", "content": "Total is 10"},
+        ]
+
+    def test_error_event(self):
+        """Test that failures are reported as an error event."""
+        graph = Mock()
+        graph.astream_events = Mock(side_effect=RuntimeError("boom"))
+
+        events = _collect(stream_agent_events(graph, [], lambda msgs: ""))
+
+        assert events[-1]["type"] == "error"
+        assert "boom" in events[-1]["content"]
+
+    def test_chunk_text_ignores_non_text_blocks(self):
+        """Test that tool-call blocks are not streamed as text."""
+        assert chunk_text([{"type": "tool_use", "id": "1"}, "a"]) == "a"
+
+
+class TestPipelineStream:
+    """Test suite for AgentPipeline.astream_query."""
+
+    def test_blocked_query_streams_rejection(self, mock_llm, sample_dataframe):
+        """Test that a rejected query ends after the intent stage."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe)
+        pipeline.intent_evaluator.ainvoke = AsyncMock(return_value="Blocked message")
+
+        events = _collect(pipeline.astream_query("Tell me a joke"))
+
+        assert events == [
+            {"type": "stage", "stage": "intent_checked", "allowed": False},
+            {"type": "done", "content": "Blocked message"},
+        ]
+
+    def test_allowed_query_streams_agent_events(self, mock_llm, sample_dataframe):
+        """Test that an allowed query forwards the analytics agent events."""
+        pipeline = AgentPipeline(mock_llm, sample_dataframe)
+        pipeline.intent_evaluator.ainvoke = AsyncMock(return_value="ALLOWED")
+        pipeline.analytics_agent.agent = FakeGraph([
+            {"event": "on_chain_end", "name": "LangGraph", "parent_ids": [],
+             "data": {"output": {"messages": [_final_message("Answer")]}}},
+        ])
+
+        events = _collect(pipeline.astream_query("Average sales?"))
+
+        assert events[0]["allowed"] is True
+        assert events[-1] == {"type": "done", "content": "Answer"}
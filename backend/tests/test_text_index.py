@@ -0,0 +1,94 @@
+"""Unit tests for the text search index.
+
+This module tests TextIndex, format_matches and the search tool exposed
+by DataTools.
+"""
+
+import pandas as pd
+import pytest
+from agents.tools import DataTools
+from text_index import TextIndex, format_matches
+from value_index import ValueIndex
+
+
+@pytest.fixture
+def products():
+    """Small order table with product and customer names."""
+    return pd.DataFrame({
+        "Product ID": ["FUR-1", "FUR-2", "FUR-1", "OFF-3", "FUR-4"],
+        "Product Name": [
+            "Bush Somerset Collection Bookcase",
+            "Bush Westfield Collection Bookcases, Fully Assembled",
+            "Bush Somerset Collection Bookcase",
+            "Staple envelope",
+            "Sauder Camden County Barrister Bookcase",
+        ],
+        "Customer ID": ["C1", "C2", "C3", "C1", "C2"],
+        "Customer Name": ["William Brown", "Rob Williams", "Jane Doe", "William Brown", "Rob Williams"],
+        "Sales": [10.0, 20.0, 30.0, 40.0, 50.0],
+    })
+
+
+@pytest.fixture
+def index(products):
+    """Text index over the product table."""
+    return TextIndex(ValueIndex(products, "v1"))
+
+
+class TestTextIndex:
+    """Test suite for TextIndex."""
+
+    def test_ranks_closest_value_first(self, index):
+        """Test that plurals and partial names find the right product."""
+        matches = index.search("Product Name", "bush somerset bookcases")
+
+        assert matches[0].value == "Bush Somerset Collection Bookcase"
+        assert matches[0].keys == ["FUR-1"]
+        assert matches[0].rows == 2
+        assert all(a.score >= b.score for a, b in zip(matches, matches[1:]))
+        assert "Staple envelope" not in [match.value for match in matches]
+
+    def test_tolerates_typos(self, index):
+        """Test that a misspelled name still matches."""
+        matches = index.search("Customer Name", "wiliam brwn", limit=1)
+
+        assert [(match.value, match.keys) for match in matches] == [("William Brown", ["C1"])]
+
+    def test_no_match(self, index):
+        """Test that unrelated or empty queries return nothing."""
+        assert index.search("Product Name", "xyzzy") == []
+        assert index.search("Product Name", "  ") == []
+
+    def test_only_existing_columns_are_indexed(self, index):
+        """Test that missing columns are skipped and unknown ones rejected."""
+        assert index.columns == {"Product Name": "Product ID", "Customer Name": "Customer ID"}
+        with pytest.raises(KeyError):
+            index.search("City", "seattle")
+
+
+class TestFormatMatches:
+    """Test suite for format_matches."""
+
+    def test_filter_hint_uses_keys(self, index):
+        """Test that the rendered matches suggest an exact-key filter."""
+        matches = index.search("Product Name", "somerset bookcase", limit=2)
+
+        text = format_matches("Product Name", "somerset bookcase", matches, "Product ID")
+
+        assert "'Bush Somerset Collection Bookcase' [Product ID: FUR-1] (2 rows" in text
+        assert "df[df['Product ID'].isin(['FUR-1'])]" in text
+
+    def test_no_matches(self):
+        """Test the message when nothing matches."""
+        assert format_matches("City", "xyzzy", []) == "No values of 'City' match 'xyzzy'."
+
+
+class TestDataToolsSearch:
+    """Test suite for DataTools.search_text_values."""
+
+    def test_search_tool(self, products):
+        """Test the search through DataTools."""
+        tools = DataTools(products)
+
+        assert "FUR-1" in tools.search_text_values("Product Name", "bush somerset")
+        assert "não está indexada" in tools.search_text_values("Sales", "10")
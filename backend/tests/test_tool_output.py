@@ -0,0 +1,115 @@
+"""Unit tests for bounded tool outputs.
+
+This module tests result rendering within budgets, paging through
+truncated results by handle and the compaction of earlier tool outputs.
+"""
+
+import pandas as pd
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from tool_output import (
+    ResultStore,
+    compact_tool_messages,
+    fetch_rows,
+    format_result,
+    prune_tool_outputs,
+)
+
+
+@pytest.fixture
+def store():
+    """Private store of truncated results."""
+    return ResultStore(max_entries=2)
+
+
+@pytest.fixture
+def large_table():
+    """Table larger than the row budget."""
+    return pd.DataFrame({"city": [f"City {i}" for i in range(100)], "sales": range(100)})
+
+
+class TestFormatResult:
+    """Test suite for format_result."""
+
+    def test_small_results_are_complete(self, store):
+        """Test that scalars and small tables are rendered whole."""
+        series = pd.Series([1.5, 2.5], index=["East", "West"], name="Sales")
+
+        assert format_result(825.0, store) == "825.0"
+        assert format_result(series, store) == ",Sales\nEast,1.5\nWest,2.5"
+
+    def test_large_table_is_truncated_with_handle(self, store, large_table):
+        """Test that large tables are cut and stored for paging."""
+        text = format_result(large_table, store, max_rows=5)
+
+        assert text.splitlines()[:2] == ["city,sales", "City 0,0"]
+        assert "[showing rows 1-5 of 100 (2 columns); call fetch_result_rows('r1', offset=5) for more]" in text
+        assert store.get("r1") is large_table
+
+    def test_char_budget_drops_rows(self, store, large_table):
+        """Test that the character budget is respected on whole rows."""
+        text = format_result(large_table, store, max_rows=50, max_chars=40)
+
+        assert text.startswith("city,sales\nCity 0,0\nCity 1,1\nCity 2,2\n")
+        assert "showing rows 1-3 of 100" in text
+
+    def test_long_text_is_truncated(self, store):
+        """Test that long non-tabular results are cut."""
+        text = format_result("x" * 100, store, max_chars=10)
+
+        assert text == "xxxxxxxxxx... [truncated, 100 chars in total]"
+
+
+class TestFetchRows:
+    """Test suite for fetch_rows and ResultStore."""
+
+    def test_pages_through_result(self, store, large_table):
+        """Test fetching later rows by handle."""
+        handle = store.put(large_table)
+
+        page = fetch_rows(handle, offset=95, limit=10, store=store)
+
+        assert page.splitlines()[1] == "City 95,95"
+        assert page.endswith("[rows 96-100 of 100]")
+        assert "past the end" in fetch_rows(handle, offset=100, store=store)
+
+    def test_expired_handle(self, store, large_table):
+        """Test that the oldest results are dropped from the store."""
+        first = store.put(large_table)
+        store.put(large_table)
+        store.put(large_table)
+
+        assert store.get(first) is None
+        assert fetch_rows(first, store=store).startswith("ERROR")
+
+
+class TestCompactToolMessages:
+    """Test suite for the ReAct state pruning."""
+
+    def _messages(self, outputs):
+        """Conversation with one tool call per output."""
+        messages = [HumanMessage("question")]
+        for i, output in enumerate(outputs):
+            messages.append(AIMessage("", tool_calls=[{"name": "t", "args": {}, "id": f"c{i}"}]))
+            messages.append(ToolMessage(output, tool_call_id=f"c{i}"))
+        return messages
+
+    def test_older_outputs_are_compacted(self):
+        """Test that only the most recent tool outputs stay whole."""
+        messages = self._messages(["a" * 1000, "b" * 1000, "c" * 1000])
+
+        compacted = compact_tool_messages(messages, keep=2, max_chars=100)
+
+        assert compacted[2].content.startswith("a" * 100 + "... [earlier output compacted")
+        assert compacted[2].tool_call_id == "c0"
+        assert compacted[4].content == "b" * 1000
+        assert compacted[6].content == "c" * 1000
+        assert messages[2].content == "a" * 1000
+
+    def test_hook_returns_llm_input(self):
+        """Test the pre_model_hook update."""
+        messages = self._messages(["short"])
+
+        update = prune_tool_outputs({"messages": messages})
+
+        assert [m.content for m in update["llm_input_messages"]] == [m.content for m in messages]
@@ -0,0 +1,79 @@
+"""Unit tests for the dictionary-encoded value index.
+
+This module tests encode_column and the ValueIndex lookups.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from value_index import ValueIndex, encode_column
+
+
+@pytest.fixture
+def index(sample_dataframe):
+    """Value index over the sample DataFrame."""
+    return ValueIndex(sample_dataframe, "v1")
+
+
+class TestEncodeColumn:
+    """Test suite for encode_column."""
+
+    def test_codes_in_frequency_order(self):
+        """Test that code 0 is the most frequent value."""
+        series = pd.Series(["b", "a", "a", None, "c", "a", "b"])
+
+        encoding = encode_column(series)
+
+        assert encoding.values == ["a", "b", "c"]
+        assert encoding.counts.tolist() == [3, 2, 1]
+        assert encoding.codes.tolist() == [1, 0, 0, -1, 2, 0, 1]
+        assert encoding.lookup == {"a": 0, "b": 1, "c": 2}
+        assert encoding.nulls == 1
+
+    def test_categorical_column(self):
+        """Test that categorical columns are encoded by value."""
+        series = pd.Series(["x", "y", "y"], dtype="category")
+
+        assert encode_column(series).values == ["y", "x"]
+
+
+class TestValueIndex:
+    """Test suite for ValueIndex."""
+
+    def test_values_with_counts(self, index):
+        """Test listing values most frequent first."""
+        page, total = index.values("Category")
+
+        assert total == 3
+        assert page[0][1] == 2
+        assert page[-1] == ("Clothing", 1)
+
+    def test_paging(self, index):
+        """Test paging through the distinct values."""
+        first, total = index.values("Customer Name", offset=0, limit=2)
+        rest, _ = index.values("Customer Name", offset=2, limit=10)
+
+        assert total == 5
+        assert len(first) == 2
+        assert len(rest) == 3
+        assert not {value for value, _ in first} & {value for value, _ in rest}
+
+    def test_count_and_mask(self, index, sample_dataframe):
+        """Test counting and filtering through the codes."""
+        mask = index.mask("Category", ["Furniture", "Clothing", "Unknown"])
+
+        assert index.count("Category", "Furniture") == 2
+        assert index.count("Category", "Unknown") == 0
+        assert np.array_equal(
+            mask, sample_dataframe["Category"].isin(["Furniture", "Clothing"]).to_numpy()
+        )
+        assert not index.mask("Category", ["Unknown"]).any()
+
+    def test_encodings_are_built_once(self, index):
+        """Test that a column is encoded once per index."""
+        assert index.encoding("Category") is index.encoding("Category")
+
+    def test_unknown_column(self, index):
+        """Test that unknown columns raise KeyError."""
+        with pytest.raises(KeyError):
+            index.encoding("Profit")
@@ -0,0 +1,119 @@
+"""Unit tests for VersionedCache and RefreshScheduler classes.
+
+This module tests version-keyed caching, single-flight rebuilds and
+stale-while-revalidate behavior.
+"""
+
+import os
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from versioned_cache import VersionedCache, RefreshScheduler
+
+
+def _touch(csv_path):
+    """Append a row so the registry sees a new file version."""
+    with open(csv_path, "a") as f:
+        f.write("3,A003,01/01/2018,02/01/2018,Furniture,10001,5.0\n")
+    os.utime(csv_path, ns=(1, 1))
+
+
+class TestVersionedCache:
+    """Test suite for VersionedCache class."""
+
+    def test_computes_once_per_version(self, registry):
+        """Test that repeated reads hit the cache."""
+        compute = Mock(side_effect=lambda df: len(df))
+        cache = VersionedCache("rows", compute, registry)
+
+        assert cache.get() == 2
+        assert cache.get() == 2
+        compute.assert_called_once()
+        assert cache.version == registry.version
+
+    def test_single_flight(self, registry):
+        """Test that concurrent misses share one computation."""
+        calls = []
+
+        def slow_compute(df):
+            calls.append(1)
+            time.sleep(0.1)
+            return len(df)
+
+        cache = VersionedCache("rows", slow_compute, registry)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get()))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == [2] * 5
+        assert len(calls) == 1
+
+    def test_serves_stale_while_rebuilding(self, registry, csv_path):
+        """Test that a version change returns the old value immediately."""
+        release = threading.Event()
+
+        def compute(df):
+            if len(df) == 3:
+                release.wait(timeout=5)
+            return len(df)
+
+        cache = VersionedCache("rows", compute, registry)
+        assert cache.get() == 2
+
+        _touch(csv_path)
+        registry.refresh()
+
+        assert cache.get() == 2  # stale value, rebuild runs in background
+        release.set()
+        for _ in range(50):
+            if cache.version == registry.version:
+                break
+            time.sleep(0.02)
+        assert cache.get() == 3
+
+    def test_compute_error_propagates(self, registry):
+        """Test that a failing first build raises."""
+        cache = VersionedCache("broken", Mock(side_effect=ValueError("boom")), registry)
+
+        with pytest.raises(ValueError):
+            cache.get()
+        assert cache.version is None
+
+    def test_listeners_see_each_rebuild(self, registry, csv_path):
+        """Test that subscribers are called once per new version."""
+        cache = VersionedCache("rows", len, registry)
+        updates = []
+        cache.subscribe(lambda version, value: updates.append((version, value)))
+
+        cache.warm()
+        cache.warm()
+        _touch(csv_path)
+        registry.refresh()
+        cache.warm()
+
+        assert [value for _, value in updates] == [2, 3]
+        assert updates[-1][0] == registry.version
+
+
+class TestRefreshScheduler:
+    """Test suite for RefreshScheduler class."""
+
+    def test_tick_warms_caches_after_change(self, registry, csv_path):
+        """Test that a tick reloads the dataset and rebuilds caches."""
+        scheduler = RefreshScheduler(interval=60, registry=registry)
+        cache = scheduler.register(VersionedCache("rows", len, registry))
+
+        scheduler.tick()
+        assert cache.get() == 2
+
+        _touch(csv_path)
+        scheduler.tick()
+        assert cache.version == registry.version
+        assert cache.get() == 3
@@ -0,0 +1,270 @@
+"""Inverted trigram index over the high-cardinality text columns.
+
+This module provides the TextIndex class, which indexes the distinct
+values of free-text columns (product names, customer names, cities) by
+word token and character trigram. A search returns the closest values,
+ranked by trigram similarity with a bonus for whole-word matches, together
+with their IDs and row counts, so generated code can filter on exact keys
+instead of running ``str.contains`` scans over the whole column.
+
+The index is built from the value index of the same dataset version.
+"""
+
+import heapq
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from text_utils import tokenize
+from value_index import ValueIndex, get_value_index
+
+
+# Indexed text columns and the ID column identifying their values
+TEXT_INDEX_COLUMNS: Dict[str, Optional[str]] = {
+    "Product Name": "Product ID",
+    "Customer Name": "Customer ID",
+    "City": None,
+}
+
+# Weight of the share of query words found whole in a value
+WORD_MATCH_WEIGHT = 0.5
+
+# Matches scoring below this are dropped
+MIN_SCORE = 0.2
+
+
+class TextMatch(NamedTuple):
+    """A value matching a text search.
+
+    Attributes:
+        value: The exact column value.
+        keys: IDs of the rows holding the value (empty if the column has none).
+        rows: Number of rows holding the value.
+        score: Similarity to the query, higher is closer.
+    """
+    value: str
+    keys: List[str]
+    rows: int
+    score: float
+
+
+def _trigrams(tokens: List[str]) -> FrozenSet[str]:
+    """Character trigrams of word tokens, padded at word boundaries."""
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def format_matches(
+    column: str,
+    query: str,
+    matches: List[TextMatch],
+    id_column: Optional[str] = None
+) -> str:
+    """Render search matches for the agents.
+
+    Args:
+        column: Searched column.
+        query: The query.
+        matches: Result of a search.
+        id_column: ID column of ``column``, if any.
+
+    Returns:
+        One line per match and a hint on filtering by exact keys.
+    """
+    if not matches:
+        return f"No values of '{column}' match '{query}'."
+
+    lines = [f"Values of '{column}' matching '{query}' (best first):"]
+    for match in matches:
+        keys = f" [{id_column}: {', '.join(match.keys)}]" if id_column and match.keys else ""
+        lines.append(f"- {match.value!r}{keys} ({match.rows} rows, score {match.score})")
+
+    best = matches[0]
+    if id_column and best.keys:
+        example = f"df[df['{id_column}'].isin({best.keys!r})]"
+    else:
+        example = f"df[df['{column}'] == {best.value!r}]"
+    lines.append(f"(Filter on these EXACT keys, e.g. {example})")
+    return "\n".join(lines)
+
+
+class ColumnTextIndex:
+    """Inverted trigram index over the distinct values of one column.
+
+    Attributes:
+        values: Distinct values; a value's id is its position in this list.
+        rows: Row count of each value.
+        keys: IDs of each value.
+    """
+
+    def __init__(self, values: List[Any], rows: np.ndarray, keys: List[List[str]]) -> None:
+        """Index the distinct values of a column.
+
+        Args:
+            values: Distinct values, most frequent first.
+            rows: Row count of each value.
+            keys: IDs of each value.
+        """
+        self.values = [str(value) for value in values]
+        self.rows = rows
+        self.keys = keys
+        self._tokens = [frozenset(tokenize(value)) for value in self.values]
+        self._sizes = []
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for value_id, tokens in enumerate(self._tokens):
+            grams = _trigrams(sorted(tokens))
+            self._sizes.append(len(grams))
+            for gram in grams:
+                postings[gram].append(value_id)
+        self._postings = dict(postings)
+
+    def search(self, query: str, limit: int = 10) -> List[TextMatch]:
+        """Find the values closest to a query.
+
+        Args:
+            query: Free text, e.g. ``"bush somerset bookcases"``.
+            limit: Maximum number of matches.
+
+        Returns:
+            Matches, best first; ties go to the most frequent value.
+        """
+        tokens = tokenize(query)
+        grams = _trigrams(tokens)
+        if not grams:
+            return []
+
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        query_words = set(tokens)
+        scored = []
+        for value_id, common in shared.items():
+            jaccard = common / (len(grams) + self._sizes[value_id] - common)
+            words = len(query_words & self._tokens[value_id]) / len(query_words)
+            score = jaccard + WORD_MATCH_WEIGHT * words
+            if score >= MIN_SCORE:
+                scored.append((score, int(self.rows[value_id]), value_id))
+
+        best = heapq.nlargest(limit, scored)
+        return [
+            TextMatch(
+                value=self.values[value_id],
+                keys=self.keys[value_id],
+                rows=rows,
+                score=round(score, 3)
+            )
+            for score, rows, value_id in best
+        ]
+
+
+class TextIndex:
+    """Text search over the indexed columns of one dataset version.
+
+    Attributes:
+        value_index: Value index the distinct values are read from.
+        columns: Indexed columns and their ID columns.
+        logger: Logger instance for the index.
+    """
+
+    def __init__(
+        self,
+        value_index: ValueIndex,
+        columns: Optional[Dict[str, Optional[str]]] = None
+    ) -> None:
+        """Initialize the index; columns are indexed on first search.
+
+        Args:
+            value_index: Value index of the dataset version to search.
+            columns: Indexed columns and their ID columns (defaults to
+                TEXT_INDEX_COLUMNS, restricted to existing columns).
+        """
+        self.value_index = value_index
+        df = value_index.df
+        columns = TEXT_INDEX_COLUMNS if columns is None else columns
+        self.columns = {
+            column: id_column if id_column in df.columns else None
+            for column, id_column in columns.items()
+            if column in df.columns
+        }
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._indexes: Dict[str, ColumnTextIndex] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        """Dataset version of the index."""
+        return self.value_index.version
+
+    def search(self, column: str, query: str, limit: int = 10) -> List[TextMatch]:
+        """Find the values of a column closest to a query.
+
+        Args:
+            column: One of the indexed columns.
+            query: Free text.
+            limit: Maximum number of matches.
+
+        Returns:
+            Matches, best first.
+
+        Raises:
+            KeyError: If the column is not indexed.
+        """
+        return self._column_index(column).search(query, limit)
+
+    def _column_index(self, column: str) -> ColumnTextIndex:
+        """Get the index of a column, building it on first use."""
+        index = self._indexes.get(column)
+        if index is None:
+            if column not in self.columns:
+                raise KeyError(column)
+            with self._lock:
+                index = self._indexes.get(column)
+                if index is None:
+                    self.logger.info(f"🔎 Building text index for '{column}'")
+                    index = self._build(column)
+                    self._indexes[column] = index
+        return index
+
+    def _build(self, column: str) -> ColumnTextIndex:
+        """Index the distinct values of a column with their IDs."""
+        encoding = self.value_index.encoding(column)
+        keys: List[List[str]] = [[] for _ in encoding.values]
+        id_column = self.columns[column]
+        if id_column is not None:
+            pairs = pd.DataFrame({
+                "code": encoding.codes,
+                "key": self.value_index.df[id_column].to_numpy(),
+            })
+            pairs = pairs[pairs["code"] >= 0].drop_duplicates()
+            for code, key in zip(pairs["code"].tolist(), pairs["key"].tolist()):
+                keys[code].append(str(key))
+        return ColumnTextIndex(encoding.values, encoding.counts, keys)
+
+
+_text_index: Optional[TextIndex] = None
+_text_index_lock = threading.Lock()
+
+
+def get_text_index() -> TextIndex:
+    """Get the text index of the current dataset version.
+
+    Returns:
+        The shared TextIndex, rebuilt when the value index changes.
+    """
+    global _text_index
+    value_index = get_value_index()
+    index = _text_index
+    if index is None or index.value_index is not value_index:
+        with _text_index_lock:
+            if _text_index is None or _text_index.value_index is not value_index:
+                _text_index = TextIndex(value_index)
+            index = _text_index
+    return index
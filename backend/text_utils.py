@@ -0,0 +1,31 @@
+"""Text normalization shared by the classifiers and indexes.
+
+This module provides the accent-insensitive normalization and word
+tokenization used by the intent classifier, the answer cache and the text
+index, so that all of them agree on what a token is.
+"""
+
+import re
+import unicodedata
+from typing import List
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase a text and strip accents.
+
+    Args:
+        text: Input text.
+
+    Returns:
+        Normalized text.
+    """
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split a text into normalized word tokens."""
+    return _TOKEN_RE.findall(normalize_text(text))
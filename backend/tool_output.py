@@ -0,0 +1,249 @@
+"""Bounded serialization of tool outputs and pruning of the ReAct state.
+
+This module keeps the prompt sent to the LLM from growing with result size:
+
+    - format_result renders analysis results within a row and character
+      budget, as CSV for tables, with a summary of what was left out;
+    - truncated tables are kept in a ResultStore under a short handle, so
+      the agent can page through them explicitly with fetch_rows;
+    - compact_tool_messages shortens tool outputs from earlier ReAct steps,
+      and prune_tool_outputs applies it as a ``pre_model_hook`` of
+      ``create_react_agent`` (the stored message history is untouched).
+
+Budgets are configured through environment variables:
+    RESULT_MAX_ROWS: Rows of a table rendered per call (default 20).
+    RESULT_MAX_CHARS: Characters of a rendered result (default 4000).
+    RESULT_STORE_SIZE: Truncated results kept for paging (default 32).
+    TOOL_OUTPUT_KEEP: Most recent tool outputs kept whole (default 2).
+    TOOL_OUTPUT_COMPACT_CHARS: Length older tool outputs are cut to (default 500).
+"""
+
+import os
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from langchain_core.messages import BaseMessage, ToolMessage
+
+
+RESULT_MAX_ROWS = int(os.environ.get("RESULT_MAX_ROWS", "20"))
+RESULT_MAX_CHARS = int(os.environ.get("RESULT_MAX_CHARS", "4000"))
+RESULT_STORE_SIZE = int(os.environ.get("RESULT_STORE_SIZE", "32"))
+TOOL_OUTPUT_KEEP = int(os.environ.get("TOOL_OUTPUT_KEEP", "2"))
+TOOL_OUTPUT_COMPACT_CHARS = int(os.environ.get("TOOL_OUTPUT_COMPACT_CHARS", "500"))
+
+
+class ResultStore:
+    """Bounded store of truncated results, addressed by short handles.
+
+    Attributes:
+        max_entries: Number of results kept; the oldest are dropped first.
+    """
+
+    def __init__(self, max_entries: int = RESULT_STORE_SIZE) -> None:
+        """Initialize an empty store.
+
+        Args:
+            max_entries: Number of results kept.
+        """
+        self.max_entries = max_entries
+        self._results: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def put(self, table: pd.DataFrame) -> str:
+        """Store a table and return its handle."""
+        with self._lock:
+            handle = f"r{next(self._ids)}"
+            self._results[handle] = table
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+            return handle
+
+    def get(self, handle: str) -> Optional[pd.DataFrame]:
+        """Get a stored table, or None if the handle expired."""
+        with self._lock:
+            table = self._results.get(handle)
+            if table is not None:
+                self._results.move_to_end(handle)
+            return table
+
+
+def as_table(value: Any) -> Optional[pd.DataFrame]:
+    """Convert tabular results (DataFrame, Series, arrays) to a DataFrame.
+
+    Returns:
+        The DataFrame, or None for scalars and other objects.
+    """
+    if isinstance(value, pd.DataFrame):
+        return value
+    if isinstance(value, pd.Series):
+        return value.to_frame(name=value.name if value.name is not None else "value")
+    if isinstance(value, pd.Index):
+        return value.to_frame(index=False)
+    if isinstance(value, np.ndarray) and value.ndim in (1, 2):
+        return pd.DataFrame(value)
+    return None
+
+
+def render_rows(
+    table: pd.DataFrame,
+    offset: int = 0,
+    max_rows: int = RESULT_MAX_ROWS,
+    max_chars: int = RESULT_MAX_CHARS
+) -> Tuple[str, int]:
+    """Render a slice of a table as CSV within the budgets.
+
+    Args:
+        table: The table.
+        offset: First row to render.
+        max_rows: Maximum number of rows.
+        max_chars: Maximum number of characters.
+
+    Returns:
+        Tuple of (CSV text with a header line, number of rows rendered).
+    """
+    page = table.iloc[offset:offset + max_rows]
+    keep_index = not isinstance(table.index, pd.RangeIndex)
+    lines = page.to_csv(index=keep_index).splitlines()
+
+    # Drop whole rows until the text fits (the header is always kept)
+    size = sum(len(line) + 1 for line in lines)
+    while len(lines) > 1 and size > max_chars:
+        size -= len(lines.pop()) + 1
+    return "\n".join(lines), len(lines) - 1
+
+
+def format_result(
+    value: Any,
+    store: Optional[ResultStore] = None,
+    max_rows: int = RESULT_MAX_ROWS,
+    max_chars: int = RESULT_MAX_CHARS
+) -> str:
+    """Render an analysis result for the LLM within the budgets.
+
+    Tables (DataFrame, Series, arrays) are rendered as CSV. When rows are
+    left out, the table is stored and the summary line gives the handle to
+    page through it with fetch_rows.
+
+    Args:
+        value: The result.
+        store: Store for truncated tables (defaults to the shared one).
+        max_rows: Maximum number of rows rendered.
+        max_chars: Maximum number of characters rendered.
+
+    Returns:
+        The rendered result.
+    """
+    table = as_table(value)
+    if table is None:
+        text = str(value)
+        if len(text) <= max_chars:
+            return text
+        return f"{text[:max_chars]}... [truncated, {len(text)} chars in total]"
+
+    text, shown = render_rows(table, 0, max_rows, max_chars)
+    total = len(table)
+    if shown >= total:
+        return text
+
+    handle = (store or get_result_store()).put(table)
+    return (
+        f"{text}\n[showing rows 1-{shown} of {total} ({len(table.columns)} columns); "
+        f"call fetch_result_rows('{handle}', offset={shown}) for more]"
+    )
+
+
+def fetch_rows(
+    handle: str,
+    offset: int = 0,
+    limit: int = RESULT_MAX_ROWS,
+    store: Optional[ResultStore] = None,
+    max_chars: int = RESULT_MAX_CHARS
+) -> str:
+    """Render more rows of a truncated result.
+
+    Args:
+        handle: Handle given by format_result.
+        offset: First row to render.
+        limit: Maximum number of rows.
+        store: Store holding the result (defaults to the shared one).
+        max_chars: Maximum number of characters rendered.
+
+    Returns:
+        The rows, with a summary line, or an error message.
+    """
+    table = (store or get_result_store()).get(handle)
+    if table is None:
+        return f"ERROR: Result '{handle}' is not available anymore. Run the analysis again."
+
+    total = len(table)
+    offset = max(offset, 0)
+    if offset >= total:
+        return f"Result '{handle}' has {total} rows; offset {offset} is past the end."
+
+    text, shown = render_rows(table, offset, max(limit, 1), max_chars)
+    end = offset + shown
+    more = f"; call fetch_result_rows('{handle}', offset={end}) for more" if end < total else ""
+    return f"{text}\n[rows {offset + 1}-{end} of {total}{more}]"
+
+
+def compact_tool_messages(
+    messages: List[BaseMessage],
+    keep: int = TOOL_OUTPUT_KEEP,
+    max_chars: int = TOOL_OUTPUT_COMPACT_CHARS
+) -> List[BaseMessage]:
+    """Shorten the outputs of all but the most recent tool calls.
+
+    Args:
+        messages: Conversation messages.
+        keep: Number of most recent tool outputs left whole.
+        max_chars: Length older tool outputs are cut to.
+
+    Returns:
+        New message list; the input messages are not modified.
+    """
+    tool_positions = [i for i, m in enumerate(messages) if isinstance(m, ToolMessage)]
+    older = tool_positions[:-keep] if keep > 0 else tool_positions
+
+    compacted = list(messages)
+    for i in older:
+        content = compacted[i].content
+        if isinstance(content, str) and len(content) > max_chars:
+            compacted[i] = compacted[i].model_copy(update={
+                "content": f"{content[:max_chars]}... [earlier output compacted, {len(content)} chars]"
+            })
+    return compacted
+
+
+def prune_tool_outputs(state: Dict[str, Any]) -> Dict[str, Any]:
+    """``pre_model_hook`` sending compacted tool outputs to the LLM.
+
+    Args:
+        state: Agent state with the ``messages`` list.
+
+    Returns:
+        Update with the ``llm_input_messages`` used for the next LLM call.
+    """
+    return {"llm_input_messages": compact_tool_messages(state["messages"])}
+
+
+_result_store: Optional[ResultStore] = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Get the process-wide store of truncated results.
+
+    Returns:
+        The shared ResultStore, created on first use.
+    """
+    global _result_store
+    if _result_store is None:
+        with _result_store_lock:
+            if _result_store is None:
+                _result_store = ResultStore()
+    return _result_store
@@ -0,0 +1,191 @@
+"""Dictionary-encoded value index over the dataset columns.
+
+This module provides the ValueIndex class, which dictionary-encodes the
+columns of one dataset version: every distinct value gets an integer code,
+codes are ordered by frequency (code 0 is the most common value) and the
+counts are kept alongside. Listing the values of a column, counting a value
+or building a filter mask then works on the small dictionary and the code
+array instead of scanning and hashing the raw column on every call.
+
+Encodings are built lazily, once per column, and live as long as the
+dataset version they were built from.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dataset_registry import get_registry
+
+
+class ColumnEncoding(NamedTuple):
+    """Dictionary encoding of one column.
+
+    Attributes:
+        codes: Code of each row (-1 for nulls), aligned with the DataFrame.
+        values: Distinct values, most frequent first; a value's code is its
+            position in this list.
+        counts: Occurrences of each value, aligned with ``values``.
+        lookup: Value to code mapping.
+        nulls: Number of null rows.
+    """
+    codes: np.ndarray
+    values: List[Any]
+    counts: np.ndarray
+    lookup: Dict[Any, int]
+    nulls: int
+
+
+def encode_column(series: pd.Series) -> ColumnEncoding:
+    """Dictionary-encode a column with codes in frequency order.
+
+    Args:
+        series: The column to encode.
+
+    Returns:
+        The column encoding.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    present = codes >= 0
+    counts = np.bincount(codes[present], minlength=len(uniques))
+
+    # Re-number the codes so that code 0 is the most frequent value
+    order = np.argsort(-counts, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    codes = np.where(present, rank[codes], -1).astype(np.int32)
+
+    values = pd.Index(uniques).take(order).tolist()
+    return ColumnEncoding(
+        codes=codes,
+        values=values,
+        counts=counts[order],
+        lookup={value: code for code, value in enumerate(values)},
+        nulls=int((~present).sum())
+    )
+
+
+class ValueIndex:
+    """Per-column dictionary encodings of one dataset version.
+
+    Attributes:
+        df: The indexed DataFrame.
+        version: Dataset version of ``df``.
+        logger: Logger instance for the index.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: Optional[str] = None) -> None:
+        """Initialize an index; columns are encoded on first use.
+
+        Args:
+            df: The DataFrame to index.
+            version: Dataset version of ``df``.
+        """
+        self.df = df
+        self.version = version
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._encodings: Dict[str, ColumnEncoding] = {}
+        self._lock = threading.Lock()
+
+    def encoding(self, column: str) -> ColumnEncoding:
+        """Get the encoding of a column, building it on first use.
+
+        Args:
+            column: Column name.
+
+        Returns:
+            The column encoding.
+
+        Raises:
+            KeyError: If the column does not exist.
+        """
+        encoding = self._encodings.get(column)
+        if encoding is None:
+            if column not in self.df.columns:
+                raise KeyError(column)
+            with self._lock:
+                encoding = self._encodings.get(column)
+                if encoding is None:
+                    self.logger.debug(f"Encoding column '{column}'")
+                    encoding = encode_column(self.df[column])
+                    self._encodings[column] = encoding
+        return encoding
+
+    def values(
+        self,
+        column: str,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[Any, int]], int]:
+        """List the distinct values of a column, most frequent first.
+
+        Args:
+            column: Column name.
+            offset: Number of values to skip.
+            limit: Maximum number of values to return (all when None).
+
+        Returns:
+            Tuple of ((value, count) pairs for the page, total distinct values).
+        """
+        encoding = self.encoding(column)
+        end = None if limit is None else offset + limit
+        page = encoding.values[offset:end]
+        counts = encoding.counts[offset:end].tolist()
+        return list(zip(page, counts)), len(encoding.values)
+
+    def count(self, column: str, value: Any) -> int:
+        """Count the rows where a column equals a value.
+
+        Args:
+            column: Column name.
+            value: Value to count.
+
+        Returns:
+            Number of matching rows.
+        """
+        encoding = self.encoding(column)
+        code = encoding.lookup.get(value)
+        return 0 if code is None else int(encoding.counts[code])
+
+    def mask(self, column: str, values: Iterable[Any]) -> np.ndarray:
+        """Build a boolean row mask for ``column in values``.
+
+        Args:
+            column: Column name.
+            values: Accepted values; unknown values match nothing.
+
+        Returns:
+            Boolean array aligned with the DataFrame rows.
+        """
+        encoding = self.encoding(column)
+        codes = [encoding.lookup[value] for value in values if value in encoding.lookup]
+        if not codes:
+            return np.zeros(len(encoding.codes), dtype=bool)
+        if len(codes) == 1:
+            return encoding.codes == codes[0]
+        return np.isin(encoding.codes, codes)
+
+
+_value_index: Optional[ValueIndex] = None
+_value_index_lock = threading.Lock()
+
+
+def get_value_index() -> ValueIndex:
+    """Get the value index of the current dataset version.
+
+    Returns:
+        The shared ValueIndex, rebuilt when the dataset version changes.
+    """
+    global _value_index
+    registry = get_registry()
+    index = _value_index
+    if index is None or index.version != registry.version:
+        with _value_index_lock:
+            version, df = registry.get_versioned()
+            if _value_index is None or _value_index.version != version:
+                _value_index = ValueIndex(df, version)
+            index = _value_index
+    return index
@@ -0,0 +1,244 @@
+"""Dataset-version keyed caches with background refresh.
+
+This module provides the VersionedCache class, which memoizes a value
+derived from the shared dataset for the current dataset version, and the
+RefreshScheduler, which watches the dataset for changes and rebuilds the
+registered caches off the request path.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from dataset_registry import DatasetRegistry, get_registry
+
+
+class VersionedCache:
+    """Caches a value computed from the dataset, keyed by dataset version.
+
+    Reads are a version comparison plus an attribute lookup. When the
+    dataset version changes, the previous value keeps being served while a
+    rebuild runs in the background (stale-while-revalidate). Concurrent
+    rebuilds of the same version are collapsed into a single computation
+    (single-flight).
+
+    Attributes:
+        name: Name used in log messages.
+        compute: Function building the value from a DataFrame.
+        registry: Dataset registry providing the data and its version.
+        logger: Logger instance for the cache.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        compute: Callable[[pd.DataFrame], Any],
+        registry: Optional[DatasetRegistry] = None
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            name: Name used in log messages.
+            compute: Function building the value from a DataFrame.
+            registry: Dataset registry (defaults to the process-wide one).
+        """
+        self.name = name
+        self.compute = compute
+        self.registry = registry or get_registry()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._entry: Optional[Tuple[str, Any]] = None
+        self._inflight: Dict[str, Future] = {}
+        self._listeners: List[Callable[[str, Any], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        """Dataset version of the cached value, if any."""
+        entry = self._entry
+        return entry[0] if entry else None
+
+    def get(self) -> Any:
+        """Get the value for the current dataset version.
+
+        Returns:
+            The cached value. If it belongs to an older version it is still
+            returned, and a background rebuild is started.
+        """
+        return self.get_versioned()[1]
+
+    def get_versioned(self) -> Tuple[str, Any]:
+        """Get the cached value together with the dataset version it was built from.
+
+        Returns:
+            Tuple of (dataset version, value), served like ``get``.
+        """
+        version = self.registry.version
+        entry = self._entry
+        if entry is not None:
+            if entry[0] != version:
+                self._rebuild(version, wait=False)
+            return entry
+        return self._rebuild(version, wait=True)
+
+    def warm(self) -> None:
+        """Build the value for the current dataset version if missing."""
+        version = self.registry.version
+        if self.version != version:
+            self._rebuild(version, wait=True)
+
+    def subscribe(self, listener: Callable[[str, Any], None]) -> None:
+        """Call a function with (version, value) after every rebuild.
+
+        Listeners run on the rebuilding thread, after waiters got the value.
+
+        Args:
+            listener: Function called with the new version and value.
+        """
+        self._listeners.append(listener)
+
+    def invalidate(self) -> None:
+        """Drop the cached value."""
+        self._entry = None
+
+    def _rebuild(self, version: str, wait: bool) -> Optional[Tuple[str, Any]]:
+        """Rebuild the value, joining an in-flight rebuild if there is one.
+
+        Args:
+            version: Dataset version to build.
+            wait: Whether to block until the value is available.
+
+        Returns:
+            The rebuilt (version, value) entry when waiting, otherwise None.
+        """
+        with self._lock:
+            future = self._inflight.get(version)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[version] = future
+
+        if leader:
+            if wait:
+                self._run(version, future)
+            else:
+                threading.Thread(
+                    target=self._run,
+                    args=(version, future),
+                    name=f"{self.name}-rebuild",
+                    daemon=True
+                ).start()
+
+        return future.result() if wait else None
+
+    def _run(self, version: str, future: Future) -> None:
+        """Compute the value and publish it to waiters."""
+        try:
+            version, df = self.registry.get_versioned()
+            self.logger.info(f"Rebuilding {self.name} for dataset version {version}")
+            value = self.compute(df)
+            self._entry = (version, value)
+            future.set_result(self._entry)
+        except Exception as e:
+            self.logger.error(f"Error rebuilding {self.name}: {str(e)}")
+            future.set_exception(e)
+            return
+        finally:
+            with self._lock:
+                for key, pending in list(self._inflight.items()):
+                    if pending is future:
+                        del self._inflight[key]
+
+        for listener in list(self._listeners):
+            try:
+                listener(version, value)
+            except Exception as e:
+                self.logger.error(f"Error notifying {self.name} listener: {str(e)}")
+
+
+class RefreshScheduler:
+    """Background thread that keeps versioned caches up to date.
+
+    Every ``interval`` seconds the scheduler checks the dataset file for
+    changes and rebuilds every registered cache, so requests never pay for
+    the recomputation.
+
+    Attributes:
+        interval: Seconds between refresh checks.
+        registry: Dataset registry to watch.
+        caches: Caches rebuilt on each tick.
+        logger: Logger instance for the scheduler.
+    """
+
+    def __init__(
+        self,
+        interval: float = 30.0,
+        registry: Optional[DatasetRegistry] = None
+    ) -> None:
+        """Initialize the scheduler without starting it.
+
+        Args:
+            interval: Seconds between refresh checks.
+            registry: Dataset registry (defaults to the process-wide one).
+        """
+        self.interval = interval
+        self.registry = registry or get_registry()
+        self.caches: List[VersionedCache] = []
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, cache: VersionedCache) -> VersionedCache:
+        """Add a cache to be rebuilt on each tick.
+
+        Args:
+            cache: The cache to keep warm.
+
+        Returns:
+            The same cache, for chaining.
+        """
+        self.caches.append(cache)
+        return cache
+
+    def tick(self) -> None:
+        """Check for a new dataset version and warm all caches."""
+        try:
+            if self.registry.refresh():
+                self.logger.info(
+                    f"🔄 Dataset changed, new version {self.registry.version}"
+                )
+        except Exception as e:
+            self.logger.error(f"Error refreshing dataset: {str(e)}")
+            return
+
+        for cache in self.caches:
+            try:
+                cache.warm()
+            except Exception:
+                # Already logged by the cache; keep serving the stale value
+                pass
+
+    def start(self) -> None:
+        """Warm the caches once and start the background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self.tick()
+        self._thread = threading.Thread(
+            target=self._loop, name="refresh-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def _loop(self) -> None:
+        """Run ticks until stopped."""
+        while not self._stop.wait(self.interval):
+            self.tick()
@@ -5,7 +5,8 @@ import { ChevronLeft, ChevronRight, Database } from 'lucide-react';
 import { motion } from 'framer-motion';
 
 interface DataTableProps {
-    data: any[];
+    // Rows as objects, or one array per column (preview format=columns)
+    data: any[] | Record<string, unknown[]>;
     columns: string[];
     total: number;
     currentPage: number;
@@ -27,6 +28,15 @@ export function DataTable({
     const startRow = (currentPage - 1) * pageSize + 1;
     const endRow = Math.min(currentPage * pageSize, total);
 
+    // Columnar pages are read in place, without building row objects
+    const rows = Array.isArray(data) ? data : null;
+    const columnData = Array.isArray(data) ? null : data;
+    const rowCount = rows
+        ? rows.length
+        : (columns.length ? (columnData?.[columns[0]]?.length ?? 0) : 0);
+    const cell = (rowIdx: number, col: string): unknown =>
+        rows ? rows[rowIdx][col] : columnData?.[col]?.[rowIdx];
+
     if (loading) {
         return (
             <Card className="border-slate-200/60 shadow-lg bg-white/80 backdrop-blur-sm">
@@ -75,7 +85,7 @@ export function DataTable({
                             </tr>
                         </thead>
                         <tbody className="divide-y divide-slate-100">
-                            {data.map((row, rowIdx) => (
+                            {Array.from({ length: rowCount }, (_, rowIdx) => (
                                 <motion.tr
                                     key={rowIdx}
                                     initial={{ opacity: 0 }}
@@ -88,8 +98,8 @@ export function DataTable({
                                             key={colIdx}
                                             className="px-4 py-3 text-slate-600 whitespace-nowrap"
                                         >
-                                            {row[col] !== null && row[col] !== undefined
-                                                ? String(row[col])
+                                            {cell(rowIdx, col) !== null && cell(rowIdx, col) !== undefined
+                                                ? String(cell(rowIdx, col))
                                                 : <span className="text-slate-400 italic">null</span>
                                             }
                                         </td>
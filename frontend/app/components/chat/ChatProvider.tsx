@@ -5,7 +5,7 @@ import { ChatWindow } from './ChatWindow';
 import { useChat } from '@/lib/hooks/useChat';
 
 export function ChatProvider() {
-    const { messages, isOpen, isTyping, hasUnread, sendMessage, toggleChat, closeChat } = useChat();
+    const { messages, isOpen, isTyping, status, hasUnread, sendMessage, toggleChat, closeChat } = useChat();
 
     return (
         <>
@@ -13,6 +13,7 @@ export function ChatProvider() {
                 isOpen={isOpen}
                 messages={messages}
                 isTyping={isTyping}
+                status={status}
                 onClose={closeChat}
                 onSendMessage={sendMessage}
             />
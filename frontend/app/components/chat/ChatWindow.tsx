@@ -11,11 +11,12 @@ interface ChatWindowProps {
     isOpen: boolean;
     messages: ChatMessage[];
     isTyping: boolean;
+    status?: string;
     onClose: () => void;
     onSendMessage: (message: string) => void;
 }
 
-export function ChatWindow({ isOpen, messages, isTyping, onClose, onSendMessage }: ChatWindowProps) {
+export function ChatWindow({ isOpen, messages, isTyping, status, onClose, onSendMessage }: ChatWindowProps) {
     const messagesEndRef = useRef<HTMLDivElement>(null);
 
     // Auto-scroll to bottom when new messages arrive
@@ -138,6 +139,9 @@ export function ChatWindow({ isOpen, messages, isTyping, onClose, onSendMessage
                                                 <div className="w-2 h-2 bg-slate-400 rounded-full animate-bounce" style={{ animationDelay: '0ms' }} />
                                                 <div className="w-2 h-2 bg-slate-400 rounded-full animate-bounce" style={{ animationDelay: '150ms' }} />
                                                 <div className="w-2 h-2 bg-slate-400 rounded-full animate-bounce" style={{ animationDelay: '300ms' }} />
+                                                {status && (
+                                                    <span className="ml-2 text-xs text-slate-500">{status}</span>
+                                                )}
                                             </div>
                                         </motion.div>
                                     )}
@@ -18,7 +18,7 @@ export default function DashboardPage() {
     const [data, setData] = useState<any>(null);
 
     // Data preview state
-    const [previewData, setPreviewData] = useState<any[]>([]);
+    const [previewData, setPreviewData] = useState<Record<string, unknown[]>>({});
     const [previewColumns, setPreviewColumns] = useState<string[]>([]);
     const [previewTotal, setPreviewTotal] = useState(0);
     const [previewPage, setPreviewPage] = useState(1);
@@ -48,7 +48,7 @@ export default function DashboardPage() {
         try {
             setPreviewLoading(true);
             const skip = (page - 1) * pageSize;
-            const response = await fetch(`${API_BASE_URL}/api/dashboard/preview?skip=${skip}&limit=${pageSize}`);
+            const response = await fetch(`${API_BASE_URL}/api/dashboard/preview?skip=${skip}&limit=${pageSize}&format=columns`);
             const result = await response.json();
 
             if (!result.error) {
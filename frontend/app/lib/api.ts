@@ -1,4 +1,11 @@
-import type { ChatMessage, ChatResponse, DashboardData } from '@/types';
+import type {
+    ChatHistoryPage,
+    ChatMessage,
+    ChatResponse,
+    ChatStreamEvent,
+    DashboardData,
+    DashboardFeedMessage,
+} from '@/types';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -43,9 +50,53 @@ class ApiClient {
         });
     }
 
-    async getChatHistory(): Promise<ChatMessage[]> {
-        const response = await this.request<{ messages: ChatMessage[] }>('/api/chat/history');
-        return response.messages;
+    // Streams the agent's answer as server-sent events; `connectionId` keeps
+    // the reply broadcast off this client's own chat WebSocket
+    async streamMessage(
+        message: string,
+        onEvent: (event: ChatStreamEvent) => void,
+        connectionId?: string
+    ): Promise<void> {
+        const response = await fetch(`${this.baseUrl}/api/chat/stream`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ message, connection_id: connectionId }),
+        });
+
+        if (!response.ok || !response.body) {
+            throw new Error(`API Error: ${response.statusText}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            const frames = buffer.split('\n\n');
+            buffer = frames.pop() ?? '';
+
+            for (const frame of frames) {
+                const data = frame
+                    .split('\n')
+                    .filter((line) => line.startsWith('data:'))
+                    .map((line) => line.slice(5).trimStart())
+                    .join('\n');
+                if (data) {
+                    onEvent(JSON.parse(data) as ChatStreamEvent);
+                }
+            }
+        }
+    }
+
+    // Messages after `since` (the id of the last message already loaded)
+    async getChatHistory(since = '0'): Promise<ChatHistoryPage> {
+        return this.request<ChatHistoryPage>(
+            `/api/chat/history?since=${encodeURIComponent(since)}`
+        );
     }
 
     // Dashboard endpoints
@@ -53,18 +104,48 @@ class ApiClient {
         return this.request<DashboardData>('/api/dashboard/metrics');
     }
 
+    // WebSocket with the dashboard snapshot followed by diffs
+    createDashboardWebSocket(
+        onMessage: (message: DashboardFeedMessage) => void,
+        onError?: (error: Event) => void
+    ): WebSocket {
+        const wsUrl = this.baseUrl.replace('http', 'ws');
+        const ws = new WebSocket(`${wsUrl}/ws/dashboard`);
+
+        ws.onmessage = (event) => {
+            try {
+                onMessage(JSON.parse(event.data) as DashboardFeedMessage);
+            } catch (error) {
+                console.error('Failed to parse WebSocket message:', error);
+            }
+        };
+
+        ws.onerror = (error) => {
+            console.error('WebSocket error:', error);
+            onError?.(error);
+        };
+
+        return ws;
+    }
+
     // WebSocket connection for real-time chat
     createChatWebSocket(
         onMessage: (message: ChatMessage) => void,
-        onError?: (error: Event) => void
+        onError?: (error: Event) => void,
+        onConnected?: (connectionId: string) => void
     ): WebSocket {
         const wsUrl = this.baseUrl.replace('http', 'ws');
         const ws = new WebSocket(`${wsUrl}/ws/chat`);
 
         ws.onmessage = (event) => {
             try {
-                const message = JSON.parse(event.data) as ChatMessage;
-                onMessage(message);
+                const data = JSON.parse(event.data);
+                // Stream events (with a `type`) are handled by streamMessage
+                if (data.type === 'connected') {
+                    onConnected?.(data.connection_id);
+                } else if (!('type' in data)) {
+                    onMessage(data as ChatMessage);
+                }
             } catch (error) {
                 console.error('Failed to parse WebSocket message:', error);
             }
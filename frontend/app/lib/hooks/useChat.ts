@@ -1,9 +1,22 @@
 'use client';
 
 import { useState, useEffect, useCallback, useRef } from 'react';
-import type { ChatMessage, ChatState } from '@/types';
+import type { ChatMessage, ChatState, ChatStreamEvent } from '@/types';
 import { apiClient } from '@/lib/api';
 
+function describeStage(event: Extract<ChatStreamEvent, { type: 'stage' }>): string {
+    switch (event.stage) {
+        case 'intent_checked':
+            return event.allowed ? 'Question accepted' : 'Question rejected';
+        case 'tool_called':
+            return `Running ${event.tool}...`;
+        case 'code_executed':
+            return 'Analysis code executed';
+        default:
+            return 'Thinking...';
+    }
+}
+
 export function useChat() {
     const [state, setState] = useState<ChatState>({
         messages: [],
@@ -14,12 +27,22 @@ export function useChat() {
 
     const wsRef = useRef<WebSocket | null>(null);
 
-    // Load chat history on mount
+    // Id of our chat WebSocket, so replies we stream are not broadcast back to it
+    const connectionIdRef = useRef<string | undefined>(undefined);
+
+    const cursorRef = useRef('0');
+
+    // Load the chat history on mount, page by page from the last cursor
     useEffect(() => {
         const loadHistory = async () => {
             try {
-                const messages = await apiClient.getChatHistory();
-                setState((prev) => ({ ...prev, messages }));
+                let page;
+                do {
+                    page = await apiClient.getChatHistory(cursorRef.current);
+                    const { messages } = page;
+                    cursorRef.current = page.cursor;
+                    setState((prev) => ({ ...prev, messages: [...prev.messages, ...messages] }));
+                } while (page.has_more);
             } catch (error) {
                 console.error('Failed to load chat history:', error);
             }
@@ -39,7 +62,9 @@ export function useChat() {
             }));
         };
 
-        wsRef.current = apiClient.createChatWebSocket(handleMessage);
+        wsRef.current = apiClient.createChatWebSocket(handleMessage, undefined, (connectionId) => {
+            connectionIdRef.current = connectionId;
+        });
 
         return () => {
             wsRef.current?.close();
@@ -53,31 +78,63 @@ export function useChat() {
             content,
             timestamp: new Date(),
         };
+        const agentId = (Date.now() + 1).toString();
 
         setState((prev) => ({
             ...prev,
             messages: [...prev.messages, userMessage],
             isTyping: true,
+            status: undefined,
         }));
 
-        try {
-            const response = await apiClient.sendMessage(content);
+        // Create the agent bubble on the first token, then grow it in place
+        const setAgentContent = (update: (current: string) => string, final: boolean) => {
+            setState((prev) => {
+                const exists = prev.messages.some((m) => m.id === agentId);
+                const messages = exists
+                    ? prev.messages.map((m) =>
+                        m.id === agentId ? { ...m, content: update(m.content), isTyping: !final } : m
+                    )
+                    : [
+                        ...prev.messages,
+                        {
+                            id: agentId,
+                            role: 'agent' as const,
+                            content: update(''),
+                            timestamp: new Date(),
+                            isTyping: !final,
+                        },
+                    ];
+                return {
+                    ...prev,
+                    messages,
+                    isTyping: false,
+                    status: final ? undefined : prev.status,
+                };
+            });
+        };
 
-            const agentMessage: ChatMessage = {
-                id: (Date.now() + 1).toString(),
-                role: 'agent',
-                content: response.message,
-                timestamp: new Date(response.timestamp),
-            };
+        const handleEvent = (event: ChatStreamEvent) => {
+            switch (event.type) {
+                case 'stage':
+                    setState((prev) => ({ ...prev, status: describeStage(event) }));
+                    break;
+                case 'token':
+                    setAgentContent((current) => current + event.content, false);
+                    break;
+                case 'done':
+                case 'error':
+                    setAgentContent(() => event.content, true);
+                    break;
+            }
+        };
 
-            setState((prev) => ({
-                ...prev,
-                messages: [...prev.messages, agentMessage],
-                isTyping: false,
-            }));
+        try {
+            await apiClient.streamMessage(content, handleEvent, connectionIdRef.current);
         } catch (error) {
             console.error('Failed to send message:', error);
-            setState((prev) => ({ ...prev, isTyping: false }));
+        } finally {
+            setState((prev) => ({ ...prev, isTyping: false, status: undefined }));
         }
     }, []);
 
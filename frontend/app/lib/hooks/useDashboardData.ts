@@ -1,49 +1,110 @@
 'use client';
 
-import { useState, useEffect } from 'react';
-import type { DashboardData } from '@/types';
+import { useState, useEffect, useRef, useCallback } from 'react';
+import type { DashboardData, DashboardFeedMessage, DashboardSectionChange } from '@/types';
 import { apiClient } from '@/lib/api';
 
+// Delay before reopening a closed dashboard socket
+const RECONNECT_DELAY = 5000;
+
+const SECTION_KEYS: Record<keyof DashboardData, string> = {
+    metrics: 'id',
+    chartData: 'name',
+    recentActivity: 'id',
+};
+
+// Apply the changed sections of a diff on top of the current data
+function applyDiff(
+    data: DashboardData,
+    changes: Partial<Record<keyof DashboardData, DashboardSectionChange>>
+): DashboardData {
+    const next = { ...data } as Record<keyof DashboardData, unknown[]>;
+    for (const [section, change] of Object.entries(changes) as Array<
+        [keyof DashboardData, DashboardSectionChange]
+    >) {
+        const key = SECTION_KEYS[section];
+        const items = new Map<string, unknown>();
+        for (const item of data[section] as unknown as Array<Record<string, unknown>>) {
+            items.set(String(item[key]), item);
+        }
+        for (const item of change.upsert) {
+            items.set(String(item[key]), item);
+        }
+        next[section] = change.order.map((id) => items.get(id));
+    }
+    return next as unknown as DashboardData;
+}
+
 export function useDashboardData() {
     const [data, setData] = useState<DashboardData | null>(null);
     const [isLoading, setIsLoading] = useState(true);
     const [error, setError] = useState<Error | null>(null);
+    const versionRef = useRef<string | null>(null);
+    const loadedRef = useRef(false);
 
-    useEffect(() => {
-        const fetchData = async () => {
-            try {
-                setIsLoading(true);
-                const dashboardData = await apiClient.getDashboardData();
-                setData(dashboardData);
-                setError(null);
-            } catch (err) {
-                setError(err as Error);
-                console.error('Failed to fetch dashboard data:', err);
-            } finally {
-                setIsLoading(false);
-            }
-        };
-
-        fetchData();
-
-        // Refresh data every 30 seconds
-        const interval = setInterval(fetchData, 30000);
-
-        return () => clearInterval(interval);
-    }, []);
-
-    const refetch = async () => {
+    const refetch = useCallback(async () => {
         try {
             setIsLoading(true);
             const dashboardData = await apiClient.getDashboardData();
             setData(dashboardData);
             setError(null);
+            loadedRef.current = true;
         } catch (err) {
             setError(err as Error);
+            console.error('Failed to fetch dashboard data:', err);
         } finally {
             setIsLoading(false);
         }
-    };
+    }, []);
+
+    useEffect(() => {
+        let ws: WebSocket | null = null;
+        let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+        let closed = false;
+
+        // The server pushes a snapshot on connect, then diffs when the data changes
+        const connect = () => {
+            ws = apiClient.createDashboardWebSocket(
+                (message: DashboardFeedMessage) => {
+                    if (message.type === 'snapshot') {
+                        versionRef.current = message.version;
+                        loadedRef.current = true;
+                        setData(message.data);
+                        setError(null);
+                        setIsLoading(false);
+                    } else if (message.base === versionRef.current) {
+                        versionRef.current = message.version;
+                        setData((current) => (current ? applyDiff(current, message.changes) : current));
+                    } else if (message.version !== versionRef.current) {
+                        // Missed a version: ask for a fresh snapshot
+                        ws?.send(JSON.stringify({ type: 'resync' }));
+                    }
+                },
+                () => {
+                    // Without a socket, show the data over HTTP until it reconnects
+                    if (!loadedRef.current) {
+                        refetch();
+                    }
+                }
+            );
+
+            ws.onclose = () => {
+                if (!closed) {
+                    reconnectTimer = setTimeout(connect, RECONNECT_DELAY);
+                }
+            };
+        };
+
+        connect();
+
+        return () => {
+            closed = true;
+            if (reconnectTimer) {
+                clearTimeout(reconnectTimer);
+            }
+            ws?.close();
+        };
+    }, [refetch]);
 
     return { data, isLoading, error, refetch };
 }
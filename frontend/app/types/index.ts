@@ -12,6 +12,7 @@ export interface ChatState {
     isOpen: boolean;
     isTyping: boolean;
     hasUnread: boolean;
+    status?: string;
 }
 
 // Dashboard Types
@@ -57,6 +58,33 @@ export interface ChatResponse {
     timestamp: string;
 }
 
+export interface ChatHistoryPage {
+    messages: ChatMessage[];
+    cursor: string;
+    has_more: boolean;
+}
+
+export type ChatStreamEvent =
+    | { type: 'stage'; stage: 'intent_checked'; allowed: boolean }
+    | { type: 'stage'; stage: 'tool_called' | 'tool_finished' | 'code_executed'; tool: string }
+    | { type: 'token'; content: string }
+    | { type: 'done'; content: string }
+    | { type: 'error'; content: string };
+
+export interface DashboardSectionChange {
+    order: string[];
+    upsert: Array<Record<string, unknown>>;
+}
+
+export type DashboardFeedMessage =
+    | { type: 'snapshot'; version: string | null; data: DashboardData }
+    | {
+        type: 'diff';
+        base: string;
+        version: string;
+        changes: Partial<Record<keyof DashboardData, DashboardSectionChange>>;
+    };
+
 export interface ChatHistoryResponse {
     messages: ChatMessage[];
 }